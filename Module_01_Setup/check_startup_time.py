@@ -0,0 +1,105 @@
+"""
+Startup Time Budget Check
+
+Runs common entry points in a fresh Python process and checks that
+(1) they finish within a time budget and (2) heavy libraries they do not need
+are never imported. Run it after adding imports to any module:
+
+    python Module_01_Setup/check_startup_time.py
+
+Exit code is 1 if any budget is exceeded, so it can gate CI.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+COURSE_ROOT = Path(__file__).resolve().parent.parent
+
+# Libraries that cost 100ms - 1s+ to import
+HEAVY_MODULES = ['pandas', 'matplotlib', 'yfinance', 'scipy', 'sklearn']
+
+DCF_VALUATION = """
+from dcf_model import DCFModel
+model = DCFModel('TechCo Inc.', 'TECH')
+model.set_historical_data([2022, 2023, 2024], [800, 920, 1050], [160, 200, 250])
+model.set_revenue_assumptions([0.18, 0.15, 0.12, 0.10, 0.08])
+model.set_operating_assumptions(ebitda_margin=0.25, tax_rate=0.25, da_pct_revenue=0.03,
+                                capex_pct_revenue=0.04, nwc_pct_revenue=0.10)
+model.set_wacc_assumptions(risk_free_rate=0.04, equity_risk_premium=0.06, beta=1.2,
+                           cost_of_debt=0.05, mv_equity=5000, mv_debt=1000)
+model.set_terminal_assumptions(growth_rate=0.03, ebitda_multiple=12.0)
+model.calculate_dcf()
+model.calculate_equity_value(cash=200, debt=1000, shares_outstanding=100)
+"""
+
+# (name, working folder, code, budget in ms, modules that must NOT be loaded)
+CHECKS = [
+    ('DCFModel valuation', 'Module_04_DCF_Modeling', DCF_VALUATION, 150,
+     HEAVY_MODULES),
+    ('Module 03 solutions import', 'Module_03_Data_Analysis', 'import solutions', 1_500,
+     ['matplotlib', 'yfinance', 'scipy', 'sklearn']),
+    ('Module 04 solutions import', 'Module_04_DCF_Modeling', 'import solutions', 1_500,
+     ['matplotlib', 'yfinance', 'scipy', 'sklearn']),
+    ('Module 08 solutions import', 'Module_08_Advanced_Topics', 'import solutions', 1_500,
+     ['matplotlib', 'yfinance', 'scipy', 'sklearn']),
+]
+
+TIMER = """
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(f'{{elapsed:.1f}}|{{",".join(loaded)}}')
+"""
+
+
+def time_entry_point(folder: str, code: str, repeats: int = 3) -> tuple:
+    """
+    Best-of-N wall time (ms) of running `code` in a fresh interpreter.
+
+    Returns:
+    --------
+    tuple
+        (milliseconds, list of heavy modules that ended up imported)
+    """
+    script = TIMER.format(code=code, heavy=HEAVY_MODULES)
+    best, loaded = float('inf'), []
+
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, '-c', script], cwd=COURSE_ROOT / folder,
+                                capture_output=True, text=True, check=True)
+        elapsed, modules = result.stdout.strip().splitlines()[-1].split('|')
+        if float(elapsed) < best:
+            best, loaded = float(elapsed), [m for m in modules.split(',') if m]
+
+    return best, loaded
+
+
+def check_startup_budgets() -> bool:
+    """Run every check, print a report and return True if all pass."""
+    print("\n" + "="*80)
+    print("STARTUP TIME BUDGETS")
+    print("="*80)
+    print(f"\n{'Entry Point':<30} {'Time':>9} {'Budget':>9}  Result")
+    print("-" * 80)
+
+    all_passed = True
+    for name, folder, code, budget_ms, forbidden in CHECKS:
+        elapsed, loaded = time_entry_point(folder, code)
+        unexpected = [m for m in loaded if m in forbidden]
+        passed = elapsed <= budget_ms and not unexpected
+        all_passed &= passed
+
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"{name:<30} {elapsed:>7.0f}ms {budget_ms:>7.0f}ms  {status}")
+        if unexpected:
+            print(f"{'':<30} imported eagerly: {', '.join(unexpected)}")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_startup_budgets() else 1)
@@ -258,6 +258,21 @@ print("\n")
 # Exercise 4: Comparable Companies Table
 # =======================================
 
+def median(values):
+    """
+    Median of a list of numbers.
+    
+    With an even count there is no single middle element, so the median is
+    the average of the two middle values (e.g., [1, 2, 3, 4] -> 2.5).
+    """
+    ordered = sorted(values)
+    n = len(ordered)
+    mid = n // 2
+    if n % 2 == 1:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2
+
+
 def create_comps_table(companies):
     """
     Create a comparable companies analysis table.
@@ -307,17 +322,12 @@ def create_comps_table(companies):
               f"{ev_rev:<7.1f}x {ev_ebitda:<9.1f}x {ebitda_margin:<14.1%}")
     
     # Calculate medians
-    ev_rev_multiples.sort()
-    ev_ebitda_multiples.sort()
-    ebitda_margins.sort()
-    
-    n = len(companies)
-    median_ev_rev = ev_rev_multiples[n // 2]
-    median_ev_ebitda = ev_ebitda_multiples[n // 2]
-    median_ebitda_margin = ebitda_margins[n // 2]
-    median_revenue = sorted([c['revenue'] for c in companies])[n // 2]
-    median_ebitda = sorted([c['ebitda'] for c in companies])[n // 2]
-    median_ev = sorted([c['market_cap'] + c['net_debt'] for c in companies])[n // 2]
+    median_ev_rev = median(ev_rev_multiples)
+    median_ev_ebitda = median(ev_ebitda_multiples)
+    median_ebitda_margin = median(ebitda_margins)
+    median_revenue = median([c['revenue'] for c in companies])
+    median_ebitda = median([c['ebitda'] for c in companies])
+    median_ev = median([c['market_cap'] + c['net_debt'] for c in companies])
     
     # Print median row
     print("-" * 80)
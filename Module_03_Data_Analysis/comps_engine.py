@@ -0,0 +1,425 @@
+"""
+Comparable Companies Engine - Grouped Multiples for Large Universes
+
+Exercise 2 (Module 03) and Exercise 3 (Module 08) build comp tables for a
+handful of names. Screening a full universe (50,000+ companies) needs the
+same statistics for every sector / size peer group at once:
+
+- EV/Revenue, EV/EBITDA and P/E are computed column-wise (a multiple is NaN
+  when its denominator is not positive - negative P/Es are not meaningful)
+- Each multiple is sorted ONCE by (peer group, value). Every peer group is
+  then a contiguous sorted segment, so exact medians, quartiles and trimmed
+  means for all groups come from index arithmetic on that single array
+- The sorted segments are kept as the peer index: the peer-set median of any
+  target, with the target itself left out, is an O(1) lookup
+
+Universe columns:
+    ticker, sector, market_cap, net_debt, revenue, ebitda, net_income
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+MULTIPLES = ['ev_revenue', 'ev_ebitda', 'pe']
+
+# Peer group for companies with a missing sector / size bucket (e.g. no market cap)
+UNCLASSIFIED = 'Unclassified'
+
+# Market cap thresholds ($M) for size buckets
+SIZE_BUCKETS = {
+    'Micro': 300,
+    'Small': 2_000,
+    'Mid': 10_000,
+    'Large': 200_000,
+    'Mega': np.inf
+}
+
+
+def compute_multiples(universe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Enterprise value and trading multiples for every company.
+
+    Parameters:
+    -----------
+    universe : pd.DataFrame
+        market_cap, net_debt, revenue, ebitda, net_income columns
+
+    Returns:
+    --------
+    pd.DataFrame
+        enterprise_value, ev_revenue, ev_ebitda, pe (NaN where undefined)
+    """
+    market_cap = universe['market_cap'].to_numpy(dtype=np.float64)
+    ev = market_cap + universe['net_debt'].to_numpy(dtype=np.float64)
+
+    def ratio(numerator, denominator):
+        denominator = denominator.astype(np.float64)
+        valid = denominator > 0
+        return np.divide(numerator, denominator, out=np.full(len(numerator), np.nan),
+                         where=valid)
+
+    return pd.DataFrame({
+        'enterprise_value': ev,
+        'ev_revenue': ratio(ev, universe['revenue'].to_numpy()),
+        'ev_ebitda': ratio(ev, universe['ebitda'].to_numpy()),
+        'pe': ratio(market_cap, universe['net_income'].to_numpy())
+    }, index=universe.index)
+
+
+def size_bucket(market_cap: pd.Series) -> pd.Series:
+    """Label each company Micro / Small / Mid / Large / Mega by market cap."""
+    edges = [-np.inf] + list(SIZE_BUCKETS.values())
+    return pd.cut(market_cap, bins=edges, labels=list(SIZE_BUCKETS), right=False)
+
+
+def _fill_unclassified(keys: pd.Series) -> pd.Series:
+    """Replace missing group keys with UNCLASSIFIED (categoricals gain the category)."""
+    if not keys.isna().any():
+        return keys
+    if isinstance(keys.dtype, pd.CategoricalDtype) and UNCLASSIFIED not in keys.cat.categories:
+        keys = keys.cat.add_categories(UNCLASSIFIED)
+    return keys.fillna(UNCLASSIFIED)
+
+
+class _SortedGroups:
+    """
+    One multiple sorted by (group, value), NaNs dropped.
+
+    Group g occupies values[start[g] : start[g] + count[g]], in ascending order;
+    rank[i] is company i's position inside its group's segment (-1 if NaN).
+    """
+
+    def __init__(self, codes: np.ndarray, values: np.ndarray, n_groups: int):
+        # Sort by value, then stable-sort by group (an integer radix sort)
+        order = np.argsort(values)
+        order = order[~np.isnan(values[order])]
+        order = order[np.argsort(codes[order], kind='stable')]
+
+        self.values = values[order]
+        self.count = np.bincount(codes[order], minlength=n_groups)
+        self.start = np.concatenate(([0], np.cumsum(self.count)[:-1]))
+        self.cumsum = np.concatenate(([0.0], np.cumsum(self.values)))
+
+        self.rank = np.full(len(values), -1, dtype=np.int64)
+        self.rank[order] = np.arange(len(order)) - self.start[codes[order]]
+
+    def quantile(self, q: float, start=None, count=None) -> np.ndarray:
+        """Linearly interpolated quantile per group (pandas' default method)."""
+        start = self.start if start is None else start
+        count = self.count if count is None else count
+
+        pos = (count - 1) * q
+        lo = np.floor(pos).astype(np.int64)
+        frac = pos - lo
+        hi = np.minimum(lo + 1, count - 1)
+
+        out = np.full(len(count), np.nan)
+        ok = count > 0
+        v_lo = self.values[start[ok] + lo[ok]]
+        v_hi = self.values[start[ok] + hi[ok]]
+        out[ok] = v_lo + (v_hi - v_lo) * frac[ok]
+        return out
+
+    def trimmed_mean(self, proportion: float) -> np.ndarray:
+        """Mean after cutting int(proportion * n) values from each end."""
+        cut = np.floor(self.count * proportion).astype(np.int64)
+        kept = self.count - 2 * cut
+        total = self.cumsum[self.start + self.count - cut] - self.cumsum[self.start + cut]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(kept > 0, total / kept, np.nan)
+
+    def median_excluding(self, group: np.ndarray, rank: np.ndarray) -> np.ndarray:
+        """
+        Median of each group with one member (at `rank`) left out.
+
+        rank = -1 means the member is not in the segment, so nothing is removed.
+        """
+        start, count = self.start[group], self.count[group]
+        inside = rank >= 0
+        m = count - inside
+
+        out = np.full(len(group), np.nan)
+        ok = m > 0
+        lo = (m[ok] - 1) // 2
+        hi = m[ok] // 2
+        # Positions at or after the removed member shift up by one
+        r = np.where(inside[ok], rank[ok], np.iinfo(np.int64).max)
+        lo = lo + (lo >= r)
+        hi = hi + (hi >= r)
+        s = start[ok]
+        out[ok] = (self.values[s + lo] + self.values[s + hi]) / 2
+        return out
+
+
+class ComparableCompaniesEngine:
+    """
+    Grouped comps statistics and a precomputed peer-median index.
+
+    Usage:
+        engine = ComparableCompaniesEngine(universe)
+        stats = engine.group_stats()                 # sector x size bucket
+        peers = engine.peer_medians(['TGT1', 'TGT2'])
+    """
+
+    def __init__(
+        self,
+        universe: pd.DataFrame,
+        group_by: Sequence[str] = ('sector', 'size_bucket'),
+        trim: float = 0.10
+    ):
+        """
+        Compute multiples and build the peer index.
+
+        Parameters:
+        -----------
+        universe : pd.DataFrame
+            One row per company (see module docstring for columns)
+        group_by : sequence of str
+            Peer group definition; 'size_bucket' is derived from market_cap.
+            Companies missing a key (no sector, no market cap) are grouped
+            as 'Unclassified'
+        trim : float
+            Share cut from EACH end for trimmed means (0.10 = 10% / 10%)
+        """
+        self.group_by = list(group_by)
+        self.trim = trim
+
+        companies = universe.reset_index(drop=True)
+        companies = companies.assign(size_bucket=size_bucket(companies['market_cap']))
+        self.companies = pd.concat([companies, compute_multiples(companies)], axis=1)
+        self._row = pd.Series(np.arange(len(self.companies)), index=self.companies['ticker'])
+
+        self.codes, self.groups, self.index = self._build(self.group_by)
+
+    def _build(self, group_by):
+        # ngroup() gives NaN codes for missing keys, so those rows get their own
+        # group; fill a copy of the keys so self.companies keeps the raw values
+        keys = pd.DataFrame({column: _fill_unclassified(self.companies[column])
+                             for column in group_by})
+        grouped = keys.groupby(group_by, observed=True, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        groups = pd.MultiIndex.from_frame(grouped.size().reset_index()[group_by]) \
+            if len(group_by) > 1 else pd.Index(grouped.size().index, name=group_by[0])
+        index = {
+            multiple: _SortedGroups(codes, self.companies[multiple].to_numpy(), len(groups))
+            for multiple in MULTIPLES
+        }
+        return codes, groups, index
+
+    def group_stats(self, by: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Exact grouped statistics for every multiple.
+
+        Parameters:
+        -----------
+        by : sequence of str, optional
+            Grouping columns (defaults to the index grouping), e.g. ['sector']
+
+        Returns:
+        --------
+        pd.DataFrame
+            One row per group with at least one valid multiple; columns
+            (multiple, statistic) with statistic in count, q1, median, q3,
+            trimmed_mean
+        """
+        if by is None or list(by) == self.group_by:
+            groups, index = self.groups, self.index
+        else:
+            _, groups, index = self._build(list(by))
+
+        columns = {}
+        for multiple, sorted_groups in index.items():
+            columns[(multiple, 'count')] = sorted_groups.count
+            columns[(multiple, 'q1')] = sorted_groups.quantile(0.25)
+            columns[(multiple, 'median')] = sorted_groups.quantile(0.50)
+            columns[(multiple, 'q3')] = sorted_groups.quantile(0.75)
+            columns[(multiple, 'trimmed_mean')] = sorted_groups.trimmed_mean(self.trim)
+
+        stats = pd.DataFrame(columns, index=groups)
+        counts = stats.xs('count', axis=1, level=1)
+        return stats[(counts > 0).any(axis=1)]
+
+    def peer_medians(self, tickers: Sequence[str], exclude_self: bool = True) -> pd.DataFrame:
+        """
+        Peer-group median multiples and implied values for target companies.
+
+        Parameters:
+        -----------
+        tickers : sequence of str
+            Companies in the universe
+        exclude_self : bool
+            Leave each target out of its own peer median
+
+        Returns:
+        --------
+        pd.DataFrame
+            Peer count, median multiples and implied enterprise / equity values
+        """
+        rows = self._row.reindex(list(tickers))
+        unknown = rows.index[rows.isna()].tolist()
+        if unknown:
+            raise KeyError(f"Not in the universe: {unknown}")
+
+        rows = rows.to_numpy(dtype=np.int64)
+        group = self.codes[rows]
+        targets = self.companies.iloc[rows]
+
+        result = pd.DataFrame({'ticker': targets['ticker'].to_numpy()})
+        labels = self.groups[group]
+        for column in self.group_by:
+            result[column] = labels.get_level_values(column)
+
+        for multiple, sorted_groups in self.index.items():
+            rank = sorted_groups.rank[rows] if exclude_self else np.full(len(rows), -1)
+            result[f'peers_{multiple}'] = sorted_groups.count[group] - (rank >= 0)
+            result[f'median_{multiple}'] = sorted_groups.median_excluding(group, rank)
+
+        net_debt = targets['net_debt'].to_numpy(dtype=np.float64)
+        result['implied_ev_revenue'] = result['median_ev_revenue'] * targets['revenue'].to_numpy()
+        result['implied_ev_ebitda'] = result['median_ev_ebitda'] * targets['ebitda'].to_numpy()
+        result['implied_equity_pe'] = result['median_pe'] * targets['net_income'].to_numpy()
+        result['implied_equity_ebitda'] = result['implied_ev_ebitda'] - net_debt
+        result['market_cap'] = targets['market_cap'].to_numpy()
+
+        return result
+
+    def summary(self) -> Dict:
+        """Universe-wide medians and coverage for each multiple."""
+        return {
+            multiple: {
+                'coverage': float(self.companies[multiple].notna().mean()),
+                'median': float(self.companies[multiple].median())
+            }
+            for multiple in MULTIPLES
+        }
+
+
+def synthetic_universe(n: int = 50_000, seed: int = 42) -> pd.DataFrame:
+    """
+    Random but plausible company universe for demonstrations.
+
+    Sectors differ in margin, growth and valuation level; a share of
+    companies is loss-making, so P/E (and sometimes EV/EBITDA) is undefined.
+    """
+    rng = np.random.default_rng(seed)
+    sectors = {
+        # sector: (EBITDA margin, EV/EBITDA level, revenue growth)
+        'Technology': (0.28, 18.0, 0.18),
+        'Healthcare': (0.22, 15.0, 0.10),
+        'Industrials': (0.16, 11.0, 0.05),
+        'Consumer': (0.14, 10.0, 0.04),
+        'Energy': (0.30, 6.0, 0.02),
+        'Financials': (0.35, 9.0, 0.06),
+        'Utilities': (0.38, 10.5, 0.03),
+        'Materials': (0.20, 8.0, 0.03)
+    }
+    names = list(sectors)
+    sector_idx = rng.integers(0, len(names), n)
+    margin_level = np.array([sectors[s][0] for s in names])[sector_idx]
+    multiple_level = np.array([sectors[s][1] for s in names])[sector_idx]
+    growth_level = np.array([sectors[s][2] for s in names])[sector_idx]
+
+    revenue = rng.lognormal(np.log(800), 1.6, n)
+    ebitda = revenue * (margin_level + rng.normal(0, 0.10, n))
+    ev = np.maximum(ebitda, revenue * 0.05) * multiple_level * rng.lognormal(0, 0.35, n)
+    net_debt = ev * rng.uniform(-0.10, 0.45, n)
+    net_income = (ebitda - revenue * 0.05) * 0.70 + revenue * rng.normal(0, 0.03, n)
+    revenue_growth = growth_level + rng.normal(0, 0.08, n)
+
+    return pd.DataFrame({
+        'ticker': [f'C{i:05d}' for i in range(n)],
+        'sector': np.array(names)[sector_idx],
+        'market_cap': np.maximum(ev - net_debt, 1.0),
+        'net_debt': net_debt,
+        'revenue': revenue,
+        'ebitda': ebitda,
+        'net_income': net_income,
+        'revenue_growth': revenue_growth
+    })
+
+
+def example_comps_engine():
+    """Grouped comps for a 50,000-company universe, checked against pandas"""
+    import time
+
+    print("\n" + "="*80)
+    print("COMPARABLE COMPANIES ENGINE - 50,000 COMPANIES")
+    print("="*80)
+
+    universe = synthetic_universe(50_000)
+    # Vendor gaps: some names have no sector or no market cap
+    gaps = np.random.default_rng(7).choice(len(universe), 60, replace=False)
+    universe.loc[gaps[:25], 'sector'] = None
+    universe.loc[gaps[25:], 'market_cap'] = np.nan
+
+    start = time.perf_counter()
+    engine = ComparableCompaniesEngine(universe)
+    stats = engine.group_stats()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"\nUniverse:          {len(universe):,} companies, {len(engine.groups)} peer groups")
+    print(f"Multiples + stats: {elapsed:.0f} ms")
+    unclassified = engine.companies[engine.group_by].isna().any(axis=1).sum()
+    print(f"Unclassified:      {unclassified} companies (missing sector or market cap)")
+
+    # Same numbers from a plain pandas groupby (one pass per statistic)
+    from scipy.stats import trim_mean
+
+    start = time.perf_counter()
+    max_diff = 0.0
+    keyed = engine.companies.assign(**{column: _fill_unclassified(engine.companies[column])
+                                       for column in engine.group_by})
+    for multiple in MULTIPLES:
+        grouped = keyed.groupby(engine.group_by, observed=True)[multiple]
+        reference = pd.DataFrame({
+            'q1': grouped.quantile(0.25),
+            'median': grouped.median(),
+            'q3': grouped.quantile(0.75),
+            'trimmed_mean': grouped.agg(lambda x: trim_mean(x.dropna(), engine.trim)
+                                        if x.notna().any() else np.nan)
+        })
+        diff = (stats[multiple][reference.columns] - reference).abs().max().max()
+        max_diff = max(max_diff, diff)
+    reference_ms = (time.perf_counter() - start) * 1000
+    print(f"pandas groupby:    {reference_ms:.0f} ms (max difference {max_diff:.1e})")
+
+    print(f"\nEV/EBITDA BY SECTOR:")
+    by_sector = engine.group_stats(by=['sector'])['ev_ebitda']
+    print(f"{'Sector':<14} {'Count':>7} {'Q1':>7} {'Median':>7} {'Q3':>7} {'Trim Mean':>10}")
+    print("-" * 80)
+    for sector, row in by_sector.iterrows():
+        print(f"{sector:<14} {row['count']:>7,.0f} {row['q1']:>6.1f}x {row['median']:>6.1f}x "
+              f"{row['q3']:>6.1f}x {row['trimmed_mean']:>9.1f}x")
+
+    print(f"\nTECHNOLOGY BY SIZE BUCKET:")
+    tech = stats.xs('Technology', level='sector')
+    print(f"{'Bucket':<12} {'EV/Rev':>8} {'EV/EBITDA':>10} {'P/E':>8} {'Count':>7}")
+    print("-" * 80)
+    for bucket, row in tech.iterrows():
+        print(f"{bucket:<12} {row[('ev_revenue', 'median')]:>7.2f}x "
+              f"{row[('ev_ebitda', 'median')]:>9.1f}x {row[('pe', 'median')]:>7.1f}x "
+              f"{row[('ev_ebitda', 'count')]:>7,.0f}")
+
+    # Peer medians for 10,000 targets from the precomputed index
+    targets = universe['ticker'].sample(10_000, random_state=1).tolist()
+    start = time.perf_counter()
+    peers = engine.peer_medians(targets)
+    print(f"\nPeer medians for 10,000 targets: {(time.perf_counter() - start)*1000:.1f} ms")
+
+    # Spot-check one target against a direct median of its peers
+    target = peers.iloc[0]
+    mask = ((engine.companies['sector'] == target['sector'])
+            & (engine.companies['size_bucket'] == target['size_bucket'])
+            & (engine.companies['ticker'] != target['ticker']))
+    direct = engine.companies.loc[mask, 'ev_ebitda'].median()
+    print(f"{target['ticker']} ({target['sector']}, {target['size_bucket']}): "
+          f"peer EV/EBITDA {target['median_ev_ebitda']:.2f}x (direct {direct:.2f}x), "
+          f"implied EV ${target['implied_ev_ebitda']:,.0f}M")
+
+    return engine
+
+
+if __name__ == "__main__":
+    engine = example_comps_engine()
@@ -0,0 +1,405 @@
+"""
+Market Data Layer - Local Cache with Incremental Refresh
+
+Exercise 3 (Module 03) downloads the stock AND the S&P 500 on every run, and
+Module 04 Exercise 1 re-requests `Ticker.info` each time. This module puts a
+pluggable cache in front of any data provider:
+
+- Price bars are stored per ticker as Parquet files (columnar, compressed)
+  and kept in memory once read, until the file changes
+- A SQLite index records which date ranges were already fetched, so a request
+  for 2022-2025 after 2022-2024 only downloads the missing year
+- `info` snapshots are stored in SQLite and expire after a TTL
+- `OfflineFixtureProvider` produces deterministic data with no network, so
+  the whole pipeline runs in class, on a plane or in CI
+
+Providers implement two methods:
+    fetch_history(ticker, start, end) -> DataFrame (Open, High, Low, Close, Volume)
+    fetch_info(ticker)                -> dict (longName, marketCap, currentPrice, ...)
+A failed download raises MarketDataError; an empty frame means the range
+simply has no bars (weekend, holiday) and is cached as such.
+"""
+
+import abc
+import json
+import os
+import re
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class MarketDataError(Exception):
+    """A provider could not fetch the requested data."""
+
+
+class MarketDataProvider(abc.ABC):
+    """Interface for price and company-info sources (end dates are exclusive)."""
+
+    @abc.abstractmethod
+    def fetch_history(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """Daily Open, High, Low, Close, Volume bars for [start, end); raises MarketDataError on failure."""
+
+    @abc.abstractmethod
+    def fetch_info(self, ticker: str) -> Dict:
+        """Company info dict (longName, marketCap, currentPrice, ...)."""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance (yfinance is imported on first use)."""
+
+    def fetch_history(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        import yfinance as yf
+
+        data = yf.download(ticker, start=start, end=end, progress=False, auto_adjust=False)
+        # yf.download logs failures and returns an empty frame instead of raising
+        error = yf.shared._ERRORS.get(ticker.upper())
+        if error:
+            raise MarketDataError(f"{ticker}: {error}")
+        # Recent yfinance versions return (field, ticker) MultiIndex columns
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        data.index = pd.DatetimeIndex(data.index).tz_localize(None)
+        return data.reindex(columns=PRICE_COLUMNS)
+
+    def fetch_info(self, ticker: str) -> Dict:
+        import yfinance as yf
+        return dict(yf.Ticker(ticker).info)
+
+
+class OfflineFixtureProvider(MarketDataProvider):
+    """
+    Deterministic offline data.
+
+    If `fixtures_dir` contains `<TICKER>.csv` (Date + price columns) or
+    `<TICKER>.json` (info dict) those are used; otherwise prices follow a
+    seeded random walk on business days, identical for the same ticker and
+    date no matter which range is requested.
+    """
+
+    ORIGIN = pd.Timestamp('2000-01-03')
+
+    def __init__(self, fixtures_dir: Optional[str] = None, seed: int = 0):
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.seed = seed
+
+    def _ticker_seed(self, ticker: str) -> int:
+        return zlib.crc32(ticker.encode()) + self.seed
+
+    def _fixture(self, ticker: str, suffix: str) -> Optional[Path]:
+        if self.fixtures_dir is None:
+            return None
+        path = self.fixtures_dir / f'{_safe_name(ticker)}{suffix}'
+        return path if path.exists() else None
+
+    def fetch_history(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        path = self._fixture(ticker, '.csv')
+        if path is not None:
+            data = pd.read_csv(path, index_col=0, parse_dates=True)
+            return data.loc[(data.index >= start) & (data.index < end), PRICE_COLUMNS]
+
+        # Random walk from a fixed origin so every date has one stable value
+        dates = pd.bdate_range(self.ORIGIN, end - pd.Timedelta(days=1))
+        rng = np.random.default_rng(self._ticker_seed(ticker))
+        vol = rng.uniform(0.012, 0.025)
+        returns = rng.normal(0.0002, vol, len(dates))
+        close = rng.uniform(20, 200) * np.exp(np.cumsum(returns))
+        spread = np.abs(rng.normal(0, vol / 2, len(dates)))
+
+        data = pd.DataFrame({
+            'Open': close * (1 - returns / 2),
+            'High': close * (1 + spread),
+            'Low': close * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 50_000_000, len(dates)).astype(np.float64)
+        }, index=pd.DatetimeIndex(dates, name='Date'))
+        return data[data.index >= start]
+
+    def fetch_info(self, ticker: str) -> Dict:
+        path = self._fixture(ticker, '.json')
+        if path is not None:
+            return json.loads(path.read_text())
+
+        rng = np.random.default_rng(self._ticker_seed(ticker))
+        shares = float(rng.uniform(200e6, 5e9))
+        price = float(rng.uniform(20, 400))
+        return {
+            'symbol': ticker,
+            'longName': f'{ticker} (offline fixture)',
+            'currentPrice': round(price, 2),
+            'sharesOutstanding': shares,
+            'marketCap': price * shares,
+            'beta': round(float(rng.uniform(0.6, 1.6)), 2)
+        }
+
+
+def _safe_name(ticker: str) -> str:
+    """File-system safe ticker (e.g., '^GSPC' -> '_GSPC')."""
+    return re.sub(r'[^A-Za-z0-9.-]', '_', ticker)
+
+
+def _merge_intervals(intervals: List[Tuple[pd.Timestamp, pd.Timestamp]]):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_intervals(start, end, covered):
+    """Sub-ranges of [start, end) not in the (merged, sorted) covered list."""
+    gaps, cursor = [], start
+    for c_start, c_end in covered:
+        if c_end <= cursor:
+            continue
+        if c_start >= end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start))
+        cursor = max(cursor, c_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class MarketDataCache:
+    """
+    On-disk market data cache in front of a provider.
+
+    Usage:
+        with MarketDataCache(YFinanceProvider(), cache_dir='.market_data') as market_data:
+            prices = market_data.history('AAPL', '2022-01-01', '2024-12-31')
+            info = market_data.info('AAPL')
+    """
+
+    def __init__(
+        self,
+        provider: Optional[MarketDataProvider] = None,
+        cache_dir: str = '.market_data',
+        info_ttl: timedelta = timedelta(hours=24)
+    ):
+        """
+        Initialize the cache.
+
+        Parameters:
+        -----------
+        provider : MarketDataProvider, optional
+            Upstream source (defaults to YFinanceProvider)
+        cache_dir : str
+            Folder for Parquet price files and the SQLite index
+        info_ttl : timedelta
+            How long an `info` snapshot stays fresh
+        """
+        self.provider = provider or YFinanceProvider()
+        self.cache_dir = Path(cache_dir)
+        self.info_ttl = info_ttl
+        self.stats = {'history_hits': 0, 'ranges_fetched': 0, 'info_hits': 0, 'info_fetched': 0}
+        # ticker -> (Parquet file mtime, parsed bars), so hits skip the Parquet read
+        self._frames: Dict[str, Tuple[int, pd.DataFrame]] = {}
+
+        (self.cache_dir / 'prices').mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.cache_dir / 'index.sqlite')
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS coverage (
+                ticker TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS coverage_ticker ON coverage (ticker);
+            CREATE TABLE IF NOT EXISTS info (
+                ticker TEXT PRIMARY KEY, fetched_at TEXT NOT NULL, payload TEXT NOT NULL);
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the SQLite index and drop the in-memory price frames."""
+        self._db.close()
+        self._frames.clear()
+
+    def _price_path(self, ticker: str) -> Path:
+        return self.cache_dir / 'prices' / f'{_safe_name(ticker)}.parquet'
+
+    def _read_prices(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Cached bars for a ticker, re-read only if the Parquet file changed on disk."""
+        path = self._price_path(ticker)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._frames.pop(ticker, None)
+            return None
+        memo = self._frames.get(ticker)
+        if memo is None or memo[0] != mtime:
+            memo = (mtime, pd.read_parquet(path))
+            self._frames[ticker] = memo
+        return memo[1]
+
+    def _coverage(self, ticker: str):
+        rows = self._db.execute('SELECT start, end FROM coverage WHERE ticker = ?', (ticker,))
+        return _merge_intervals([(pd.Timestamp(s), pd.Timestamp(e)) for s, e in rows])
+
+    def _save_coverage(self, ticker: str, intervals):
+        with self._db:
+            self._db.execute('DELETE FROM coverage WHERE ticker = ?', (ticker,))
+            self._db.executemany(
+                'INSERT INTO coverage VALUES (?, ?, ?)',
+                [(ticker, s.isoformat(), e.isoformat()) for s, e in _merge_intervals(intervals)])
+
+    def history(self, ticker: str, start, end) -> pd.DataFrame:
+        """
+        Daily price bars for [start, end), fetching only uncached ranges.
+
+        If a range fails to download, the ranges that succeeded are still
+        cached and the MarketDataError is re-raised; the failed range is
+        fetched again on the next call.
+
+        Parameters:
+        -----------
+        ticker : str
+            Ticker symbol (e.g., 'AAPL', '^GSPC')
+        start, end : str or datetime
+            Date range (end exclusive, like yfinance)
+
+        Returns:
+        --------
+        pd.DataFrame
+            Open, High, Low, Close, Volume indexed by date
+        """
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        # Today's bar may still change - never mark it (or the future) as covered
+        coverable_end = min(end, pd.Timestamp.today().normalize())
+
+        covered = self._coverage(ticker)
+        gaps = _missing_intervals(start, end, covered)
+        path = self._price_path(ticker)
+        cached = self._read_prices(ticker)
+
+        if gaps:
+            frames = [] if cached is None else [cached]
+            fetched_gaps, error = [], None
+            for gap_start, gap_end in gaps:
+                try:
+                    fetched = self.provider.fetch_history(ticker, gap_start, gap_end)
+                except MarketDataError as exc:
+                    error = exc
+                    continue
+                frames.append(fetched[PRICE_COLUMNS].astype(np.float64))
+                fetched_gaps.append((gap_start, gap_end))
+                self.stats['ranges_fetched'] += 1
+
+            if fetched_gaps:
+                cached = pd.concat(frames)
+                cached = cached[~cached.index.duplicated(keep='last')].sort_index()
+                cached.index.name = 'Date'
+
+                # Write-then-rename so readers never see a partial file
+                tmp_path = path.with_suffix('.tmp')
+                cached.to_parquet(tmp_path)
+                os.replace(tmp_path, path)
+                self._frames[ticker] = (path.stat().st_mtime_ns, cached)
+
+                # Only ranges that actually downloaded count as covered
+                new_coverage = [(s, min(e, coverable_end))
+                                for s, e in fetched_gaps if s < coverable_end]
+                self._save_coverage(ticker, covered + new_coverage)
+            if error is not None:
+                raise error
+        else:
+            self.stats['history_hits'] += 1
+
+        if cached is None:
+            return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+        return cached.loc[(cached.index >= start) & (cached.index < end)]
+
+    def info(self, ticker: str, max_age: Optional[timedelta] = None) -> Dict:
+        """
+        Company info snapshot, refreshed when older than the TTL.
+
+        Parameters:
+        -----------
+        ticker : str
+            Ticker symbol
+        max_age : timedelta, optional
+            Override the cache TTL for this call (timedelta(0) forces refresh)
+
+        Returns:
+        --------
+        dict
+            Provider info dict (longName, marketCap, currentPrice, ...)
+        """
+        max_age = self.info_ttl if max_age is None else max_age
+        row = self._db.execute('SELECT fetched_at, payload FROM info WHERE ticker = ?',
+                               (ticker,)).fetchone()
+        if row is not None and datetime.now() - datetime.fromisoformat(row[0]) < max_age:
+            self.stats['info_hits'] += 1
+            return json.loads(row[1])
+
+        payload = self.provider.fetch_info(ticker)
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO info VALUES (?, ?, ?)',
+                             (ticker, datetime.now().isoformat(), json.dumps(payload, default=str)))
+        self.stats['info_fetched'] += 1
+        return payload
+
+    def clear(self, ticker: Optional[str] = None):
+        """Drop cached data for one ticker (or everything)."""
+        tickers = [ticker] if ticker else [
+            t for (t,) in self._db.execute('SELECT DISTINCT ticker FROM coverage')]
+        with self._db:
+            for t in tickers:
+                self._db.execute('DELETE FROM coverage WHERE ticker = ?', (t,))
+                self._db.execute('DELETE FROM info WHERE ticker = ?', (t,))
+                self._price_path(t).unlink(missing_ok=True)
+                self._frames.pop(t, None)
+            if ticker is None:
+                self._db.execute('DELETE FROM info')
+
+
+def example_market_data_cache():
+    """Run the Module 03 stock analysis twice offline and extend the range"""
+    import shutil
+    import tempfile
+    import time
+    from solutions import exercise_3_stock_analysis
+
+    print("\n" + "="*80)
+    print("MARKET DATA CACHE - INCREMENTAL REFRESH (OFFLINE FIXTURES)")
+    print("="*80)
+
+    cache_dir = tempfile.mkdtemp(prefix='market_data_')
+    with MarketDataCache(OfflineFixtureProvider(), cache_dir=cache_dir) as market_data:
+        exercise_3_stock_analysis('AAPL', '2022-01-01', '2024-12-31', market_data=market_data)
+        print(f"\nAfter first run:   {market_data.stats}")
+
+        start = time.perf_counter()
+        market_data.history('AAPL', '2022-01-01', '2024-12-31')
+        market_data.history('^GSPC', '2022-01-01', '2024-12-31')
+        print(f"Second run (cache): {(time.perf_counter() - start)*1000:.1f} ms, {market_data.stats}")
+
+        # Extending the window fetches only 2021 and 2025
+        prices = market_data.history('AAPL', '2021-01-01', '2025-06-30')
+        print(f"Extended range:    {len(prices)} bars, {market_data.stats}")
+
+        info = market_data.info('AAPL')
+        market_data.info('AAPL')
+        print(f"\nInfo:              {info['longName']}, price ${info['currentPrice']:.2f}")
+        print(f"Info stats:        fetched {market_data.stats['info_fetched']}, "
+              f"cache hits {market_data.stats['info_hits']}")
+
+    shutil.rmtree(cache_dir)
+    return market_data
+
+
+if __name__ == "__main__":
+    market_data = example_market_data_cache()
@@ -0,0 +1,470 @@
+"""
+Peer Finder - Nearest-Neighbour Comparable Selection
+
+The comps exercises use hand-picked peer lists. This module picks peers the
+way an analyst reasons about them - similar growth, margin, size, leverage
+and sector - but over the whole universe:
+
+- Each company becomes a point in a standardized feature space (z-scores
+  with per-feature weights). Companies in different sectors are a further
+  `sector_weight` apart, i.e. distance = sqrt(d_features² + sector_weight²)
+- KD-trees are built ONCE, one per sector. Top-k peers for a target are a
+  query on its own sector's tree (tens of microseconds); other sectors are
+  searched only when the k-th in-sector peer is farther than `sector_weight`,
+  so results are exactly those of a scan over the full embedding
+- Refreshed fundamentals do not rebuild the trees: changed companies are
+  tombstoned in the tree and appended to a small brute-force buffer, which
+  is folded into new trees once it exceeds `rebuild_fraction` of the index
+
+Fundamentals columns:
+    ticker, sector, revenue, revenue_growth, ebitda, net_debt
+    (+ market_cap and net_income for peer multiples)
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from comps_engine import MULTIPLES, UNCLASSIFIED, compute_multiples
+
+
+FEATURES = ['revenue_growth', 'ebitda_margin', 'log_revenue', 'leverage']
+
+DEFAULT_WEIGHTS = {
+    'revenue_growth': 1.0,
+    'ebitda_margin': 1.0,
+    'log_revenue': 1.0,
+    'leverage': 0.5
+}
+
+
+def company_features(fundamentals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Raw (unscaled) similarity features.
+
+    Leverage is Net Debt / EBITDA capped to [-2x, 8x]; companies with
+    non-positive EBITDA are treated as maximally levered. Features that
+    cannot be computed (missing inputs, non-positive revenue) are NaN.
+    """
+    revenue = fundamentals['revenue'].to_numpy(dtype=np.float64)
+    ebitda = fundamentals['ebitda'].to_numpy(dtype=np.float64)
+    net_debt = fundamentals['net_debt'].to_numpy(dtype=np.float64)
+
+    leverage = np.full(len(ebitda), 8.0)
+    np.divide(net_debt, ebitda, out=leverage, where=ebitda > 0)
+    leverage[np.isnan(ebitda) | np.isnan(net_debt)] = np.nan
+    margin = np.divide(ebitda, revenue, out=np.full(len(revenue), np.nan), where=revenue > 0)
+
+    features = pd.DataFrame({
+        'revenue_growth': fundamentals['revenue_growth'].to_numpy(dtype=np.float64),
+        'ebitda_margin': margin,
+        'log_revenue': np.log(np.maximum(revenue, 1e-6)),
+        'leverage': np.clip(leverage, -2.0, 8.0)
+    }, index=fundamentals.index)
+    return features.where(np.isfinite(features))
+
+
+def _fill_sector(fundamentals: pd.DataFrame) -> pd.DataFrame:
+    """Copy of the rows with missing sectors set to UNCLASSIFIED (as-is if none are missing)."""
+    if not fundamentals['sector'].isna().any():
+        return fundamentals
+    return fundamentals.assign(sector=fundamentals['sector'].astype(object).fillna(UNCLASSIFIED))
+
+
+def _top_k(rows: np.ndarray, dist: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the k smallest distances per row (padding with -1 / inf)."""
+    if dist.shape[1] < k:
+        pad = k - dist.shape[1]
+        rows = np.hstack([rows, np.full((len(rows), pad), -1)])
+        dist = np.hstack([dist, np.full((len(dist), pad), np.inf)])
+    order = np.argsort(dist, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(rows, order, axis=1), np.take_along_axis(dist, order, axis=1)
+
+
+class PeerFinder:
+    """
+    Per-sector KD-tree peer index with incremental refresh.
+
+    Usage:
+        finder = PeerFinder(universe)
+        finder.peers('MSFT', k=10)                    # DataFrame of peers
+        finder.peer_multiples(private_target, k=10)   # median multiples
+        finder.update(refreshed_rows)                 # no full rebuild
+
+    Missing or non-finite features are imputed at the index mean (zero
+    after standardization) and listed in `finder.imputed`.
+    """
+
+    def __init__(
+        self,
+        fundamentals: pd.DataFrame,
+        weights: Optional[Dict[str, float]] = None,
+        sector_weight: float = 3.0,
+        rebuild_fraction: float = 0.05
+    ):
+        """
+        Build the feature space and the KD-trees.
+
+        Parameters:
+        -----------
+        fundamentals : pd.DataFrame
+            One row per company (see module docstring for columns)
+        weights : dict, optional
+            Per-feature weights applied after standardization
+        sector_weight : float
+            Extra distance between companies in different sectors (in
+            standard deviations); large values keep peers within the sector
+        rebuild_fraction : float
+            Rebuild the trees once pending + stale rows exceed this share
+        """
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.sector_weight = sector_weight
+        self.rebuild_fraction = rebuild_fraction
+        self.stats = {'rebuilds': 0, 'updates': 0}
+
+        self._rebuild(_fill_sector(fundamentals).reset_index(drop=True))
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _rebuild(self, companies: pd.DataFrame):
+        from scipy.spatial import cKDTree
+
+        if companies['ticker'].duplicated().any():
+            raise ValueError("Tickers must be unique")
+
+        # Scaling is frozen between rebuilds so buffered rows stay comparable
+        features = company_features(companies)
+        self.mean = features.mean().fillna(0).to_numpy()
+        self.std = features.std().replace(0, 1).fillna(1).to_numpy()
+        self.sectors = sorted(companies['sector'].unique())
+
+        self.companies = companies
+        self.points, self.sector_codes = self.embed(companies)
+        self.tree_size = len(companies)
+
+        self.tree_rows = [np.flatnonzero(self.sector_codes == s) for s in range(len(self.sectors))]
+        self.trees = [cKDTree(self.points[rows]) for rows in self.tree_rows]
+        self.stale = np.zeros(len(self.sectors), dtype=np.int64)
+
+        self.alive = np.ones(len(companies), dtype=bool)
+        self._row = dict(zip(companies['ticker'].tolist(), range(len(companies))))
+        self.imputed = self._imputed_features(companies)
+        self.stats['rebuilds'] += 1
+
+    @staticmethod
+    def _imputed_features(fundamentals: pd.DataFrame) -> Dict[str, List[str]]:
+        """Ticker -> features that `embed` imputes for it."""
+        missing = company_features(fundamentals).isna()
+        rows = np.flatnonzero(missing.any(axis=1).to_numpy())
+        return {
+            fundamentals['ticker'].iloc[i]: [f for f in FEATURES if missing[f].iloc[i]]
+            for i in rows
+        }
+
+    def embed(self, fundamentals: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map companies into the (weighted, standardized) feature space.
+
+        Returns:
+        --------
+        tuple
+            (n_companies, n_features) points and sector codes (-1 if the
+            sector is not in the index)
+        """
+        scaled = (company_features(fundamentals).to_numpy() - self.mean) / self.std
+        # Missing features sit at the mean so they neither attract nor repel peers
+        scaled[np.isnan(scaled)] = 0.0
+        scaled *= np.array([self.weights[f] for f in FEATURES])
+        codes = pd.Index(self.sectors).get_indexer(fundamentals['sector'])
+        return scaled, codes.astype(np.int64)
+
+    def update(self, fundamentals: pd.DataFrame) -> 'PeerFinder':
+        """
+        Insert new companies or replace the fundamentals of existing ones.
+
+        Replaced rows are marked stale in their tree and the new versions sit
+        in a pending buffer that queries scan directly; the trees are rebuilt
+        only when that overhead exceeds `rebuild_fraction` of the index (or
+        when a new sector appears).
+
+        Parameters:
+        -----------
+        fundamentals : pd.DataFrame
+            Rows to upsert (all fundamentals columns required)
+        """
+        fundamentals = _fill_sector(fundamentals.drop_duplicates('ticker', keep='last')
+                                    .reset_index(drop=True))
+        self.stats['updates'] += len(fundamentals)
+
+        for ticker in fundamentals['ticker'].tolist():
+            self.imputed.pop(ticker, None)
+            row = self._row.get(ticker)
+            if row is not None and self.alive[row]:
+                self.alive[row] = False
+                if row < self.tree_size:
+                    self.stale[self.sector_codes[row]] += 1
+
+        start = len(self.companies)
+        points, codes = self.embed(fundamentals)
+        self.companies = pd.concat([self.companies, fundamentals], ignore_index=True)
+        self.points = np.vstack([self.points, points])
+        self.sector_codes = np.concatenate([self.sector_codes, codes])
+        self.alive = np.concatenate([self.alive, np.ones(len(fundamentals), dtype=bool)])
+        self._row.update(zip(fundamentals['ticker'].tolist(), range(start, len(self.companies))))
+        self.imputed.update(self._imputed_features(fundamentals))
+
+        overhead = self.pending + self.stale.sum()
+        if (codes < 0).any() or overhead > self.rebuild_fraction * self.tree_size:
+            self._rebuild(self.companies[self.alive].reset_index(drop=True))
+
+        return self
+
+    @property
+    def pending(self) -> int:
+        """Rows waiting in the brute-force buffer (not yet in a tree)."""
+        return len(self.companies) - self.tree_size
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _query_tree(self, sector: int, points: np.ndarray, k: int,
+                    exclude: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k live rows of one sector's tree (feature distance only)."""
+        tree_rows = self.tree_rows[sector]
+        m, n = len(points), len(tree_rows)
+        if n == 0:
+            return np.full((m, k), -1), np.full((m, k), np.inf)
+
+        # Ask for a few spares to cover stale rows and the target itself
+        k_tree = min(n, k + 1 + min(int(self.stale[sector]), 4 * k))
+        while True:
+            dist, idx = self.trees[sector].query(points, k=k_tree)
+            dist, idx = dist.reshape(m, -1), idx.reshape(m, -1)
+            rows = tree_rows[idx]
+            usable = self.alive[rows] & (rows != exclude[:, None])
+            if k_tree == n or usable.sum(axis=1).min() >= k:
+                break
+            k_tree = min(n, k_tree * 4)
+
+        # Tree results are already sorted; usually the first k are all usable
+        if k_tree >= k and usable[:, :k].all():
+            return rows[:, :k], dist[:, :k]
+        return _top_k(rows, np.where(usable, dist, np.inf), k)
+
+    def nearest(
+        self,
+        points: np.ndarray,
+        sectors: np.ndarray,
+        k: int,
+        exclude: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k live neighbours for a batch of embedded companies.
+
+        Parameters:
+        -----------
+        points, sectors : np.ndarray
+            (m, n_features) points and sector codes from `embed`
+        k : int
+            Peers per query
+        exclude : np.ndarray, optional
+            Row per query to leave out (the target itself), -1 for none
+
+        Returns:
+        --------
+        tuple
+            (rows, distances), both (m, k), nearest first
+        """
+        points = np.atleast_2d(points)
+        sectors = np.atleast_1d(sectors)
+        m = len(points)
+        exclude = np.full(m, -1) if exclude is None else np.atleast_1d(exclude)
+        penalty = self.sector_weight
+
+        rows = np.full((m, k), -1)
+        dist = np.full((m, k), np.inf)
+        for sector in (sectors if m == 1 else np.unique(sectors)):
+            q = np.flatnonzero(sectors == sector)
+            if sector >= 0:
+                rows[q], dist[q] = self._query_tree(sector, points[q], k, exclude[q])
+
+            # Other sectors can only win if the k-th in-sector peer is farther than the penalty
+            far = q[dist[q, -1] > penalty]
+            if len(far) == 0:
+                continue
+            for other in range(len(self.sectors)):
+                if other == sector:
+                    continue
+                other_rows, other_dist = self._query_tree(other, points[far], k, exclude[far])
+                rows[far], dist[far] = _top_k(
+                    np.hstack([rows[far], other_rows]),
+                    np.hstack([dist[far], np.sqrt(other_dist ** 2 + penalty ** 2)]), k)
+
+        if self.pending:
+            buffer_rows = np.arange(self.tree_size, len(self.companies))
+            buffer_points = self.points[buffer_rows]
+            buffer_codes = self.sector_codes[buffer_rows]
+            buffer_alive = self.alive[buffer_rows]
+            # Scan the buffer in query chunks of ~1M (query x buffer x feature) cells
+            chunk = max(1, 1_000_000 // (len(buffer_rows) * points.shape[1]))
+            for lo in range(0, m, chunk):
+                q = slice(lo, lo + chunk)
+                n_q = len(points[q])
+                diff = points[q, None, :] - buffer_points[None, :, :]
+                cross = sectors[q, None] != buffer_codes[None, :]
+                buffer_dist = np.sqrt((diff ** 2).sum(axis=2) + cross * penalty ** 2)
+                buffer_ok = buffer_alive[None, :] & (buffer_rows[None, :] != exclude[q, None])
+                rows[q], dist[q] = _top_k(
+                    np.hstack([rows[q], np.broadcast_to(buffer_rows, (n_q, len(buffer_rows)))]),
+                    np.hstack([dist[q], np.where(buffer_ok, buffer_dist, np.inf)]), k)
+
+        return rows, dist
+
+    def _embed_target(self, target: Union[str, Dict, pd.Series]) -> Tuple[np.ndarray, int, int]:
+        if isinstance(target, str):
+            row = self._row.get(target)
+            if row is None or not self.alive[row]:
+                raise KeyError(f"{target} is not in the peer index")
+            return self.points[row], self.sector_codes[row], row
+        points, codes = self.embed(_fill_sector(pd.DataFrame([dict(target)])))
+        return points[0], codes[0], -1
+
+    def peers(self, target: Union[str, Dict, pd.Series], k: int = 10) -> pd.DataFrame:
+        """
+        The k most similar companies to a target.
+
+        Parameters:
+        -----------
+        target : str or dict
+            A ticker in the index, or the fundamentals of any company
+            (e.g. a private target that has no market cap)
+        k : int
+            Number of peers
+
+        Returns:
+        --------
+        pd.DataFrame
+            Peer fundamentals with a 'distance' column, nearest first
+        """
+        point, sector, row = self._embed_target(target)
+        rows, dist = self.nearest(point, sector, k, exclude=row)
+        found = np.isfinite(dist[0])
+
+        peers = self.companies.iloc[rows[0][found]].reset_index(drop=True)
+        peers['distance'] = dist[0][found]
+        return peers
+
+    def peer_multiples(self, target: Union[str, Dict, pd.Series], k: int = 10) -> Dict:
+        """
+        Median EV/Revenue, EV/EBITDA and P/E of a target's k nearest peers.
+
+        Returns:
+        --------
+        dict
+            median_<multiple> for each multiple, plus the peer tickers
+        """
+        peers = self.peers(target, k)
+        multiples = compute_multiples(peers)
+
+        result = {f'median_{m}': float(multiples[m].median()) for m in MULTIPLES}
+        result['peers'] = peers['ticker'].tolist()
+        return result
+
+
+def _brute_force(finder: PeerFinder, rows: np.ndarray, k: int) -> np.ndarray:
+    """Reference answer: scan every live company."""
+    live = np.flatnonzero(finder.alive)
+    diff = finder.points[rows][:, None, :] - finder.points[live][None, :, :]
+    cross = finder.sector_codes[rows][:, None] != finder.sector_codes[live][None, :]
+    dist = np.sqrt((diff ** 2).sum(axis=2) + cross * finder.sector_weight ** 2)
+    dist[live[None, :] == rows[:, None]] = np.inf
+    return live[np.argsort(dist, axis=1, kind='stable')[:, :k]]
+
+
+def example_peer_finder():
+    """Build a 50,000-company peer index, query it and refresh it in place"""
+    import time
+
+    from comps_engine import synthetic_universe
+
+    print("\n" + "="*80)
+    print("PEER FINDER - KD-TREE NEAREST-NEIGHBOUR COMPS")
+    print("="*80)
+
+    universe = synthetic_universe(50_000)
+    # A few names have no sector classification yet
+    universe.loc[[7, 8], 'sector'] = None
+    import scipy.spatial  # noqa: F401  (keep the one-off import out of the build timing)
+
+    start = time.perf_counter()
+    finder = PeerFinder(universe)
+    print(f"\nIndex build ({len(universe):,} companies):  "
+          f"{(time.perf_counter() - start)*1000:.0f} ms")
+
+    # Single-target latency
+    ticker = universe['ticker'].iloc[123]
+    point, sector, row = finder._embed_target(ticker)
+    start = time.perf_counter()
+    for _ in range(1_000):
+        finder.nearest(point, sector, 10, exclude=row)
+    print(f"Top-10 peers, one target:          {(time.perf_counter() - start)*1e3:.0f} µs")
+
+    # Batched: every company's peers at once
+    all_rows = np.arange(len(universe))
+    start = time.perf_counter()
+    rows, _ = finder.nearest(finder.points, finder.sector_codes, 10, exclude=all_rows)
+    elapsed = time.perf_counter() - start
+    print(f"Top-10 peers, all 50,000:          {elapsed*1000:.0f} ms "
+          f"({elapsed / len(universe) * 1e6:.1f} µs per company)")
+
+    sample = np.random.default_rng(0).choice(len(universe), 200, replace=False)
+    matches = np.array_equal(np.sort(_brute_force(finder, sample, 10), axis=1),
+                             np.sort(rows[sample], axis=1))
+    print(f"Matches brute force (200 names):   {matches}")
+
+    print(f"\nPEERS FOR {ticker}:")
+    target = universe.iloc[123]
+    print(f"Target: {target['sector']}, revenue ${target['revenue']:,.0f}M, "
+          f"growth {target['revenue_growth']:.1%}, "
+          f"margin {target['ebitda'] / target['revenue']:.1%}")
+    peers = finder.peers(ticker, k=5)
+    peers['ebitda_margin'] = peers['ebitda'] / peers['revenue']
+    print(peers[['ticker', 'sector', 'revenue', 'revenue_growth', 'ebitda_margin', 'distance']]
+          .round(3).to_string(index=False))
+
+    medians = finder.peer_multiples(ticker, k=10)
+    print(f"\nTop-10 peer medians: EV/Revenue {medians['median_ev_revenue']:.2f}x, "
+          f"EV/EBITDA {medians['median_ev_ebitda']:.1f}x, P/E {medians['median_pe']:.1f}x")
+
+    # Refresh 1% of fundamentals: buffered, no rebuild
+    refreshed = universe.sample(500, random_state=3).copy()
+    refreshed['revenue'] *= 1.05
+    refreshed['revenue_growth'] += 0.02
+    # Some vendor rows arrive incomplete: no growth figure, zero revenue
+    refreshed.iloc[:3, refreshed.columns.get_loc('revenue_growth')] = np.nan
+    refreshed.iloc[3:5, refreshed.columns.get_loc('revenue')] = 0.0
+    refreshed.iloc[5:7, refreshed.columns.get_loc('sector')] = None
+
+    start = time.perf_counter()
+    finder.update(refreshed)
+    print(f"\nRefresh 500 companies:             {(time.perf_counter() - start)*1000:.1f} ms "
+          f"(pending {finder.pending}, rebuilds {finder.stats['rebuilds']})")
+    print(f"Imputed (non-finite features):     {len(finder.imputed)} companies "
+          f"{sorted(set(sum(finder.imputed.values(), [])))}")
+
+    check = np.array([finder._row[t] for t in refreshed['ticker'].iloc[:100]]
+                     + list(range(100)))
+    rows, _ = finder.nearest(finder.points[check], finder.sector_codes[check], 10, exclude=check)
+    matches = np.array_equal(np.sort(_brute_force(finder, check, 10), axis=1),
+                             np.sort(rows, axis=1))
+    print(f"Matches brute force after refresh: {matches}")
+
+    return finder
+
+
+if __name__ == "__main__":
+    finder = example_peer_finder()
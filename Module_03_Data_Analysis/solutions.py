@@ -7,7 +7,6 @@ Study these after attempting the exercises yourself!
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 
 
 # =============================================================================
@@ -84,28 +83,53 @@ def exercise_1_revenue_analysis():
 # EXERCISE 2: Tech Comps Table
 # =============================================================================
 
-def exercise_2_comps_analysis():
+def exercise_2_comps_analysis(universe=None, n_peers=5):
     """
     Build a professional comparable company analysis with valuation.
     
     This demonstrates:
+    - Peer selection (nearest neighbours by growth, margin, size, leverage, sector)
     - Comp table construction
     - Multiple calculations
     - Statistical analysis
     - Valuation using multiples
+    
+    Parameters:
+    -----------
+    universe : pd.DataFrame, optional
+        Listed companies to pick peers from (see peer_finder.py for columns);
+        defaults to a synthetic 20,000-company universe
+    n_peers : int
+        Number of comparable companies
     """
+    from comps_engine import synthetic_universe
+    from peer_finder import PeerFinder
+    
     print("\n" + "="*80)
     print("EXERCISE 2: TECH COMPS TABLE")
     print("="*80)
     
-    # Create comp table with realistic SaaS metrics
+    # Private SaaS target (no market cap - that's what we are valuing)
+    target = {'ticker': 'Target Co', 'sector': 'Technology', 'revenue': 2000,
+              'ebitda': 400, 'net_debt': 250, 'revenue_growth': 0.30}
+    
+    # Let the peer index pick the comps instead of a hand-curated list
+    if universe is None:
+        universe = synthetic_universe(20_000)
+    finder = PeerFinder(universe)
+    peers = finder.peers(target, k=n_peers)
+    
+    print(f"\nPeers: {n_peers} nearest of {len(universe):,} companies "
+          f"(growth, margin, size, leverage, sector)")
+    
     comps = pd.DataFrame({
-        'Company': ['SaaS Leader A', 'Cloud Co B', 'Platform C', 'Enterprise D', 'Growth Co E', 'Target Co'],
-        'Revenue': [2500, 1800, 3200, 4000, 1200, 2000],
-        'EBITDA': [500, 360, 640, 800, 240, 400],
-        'Market_Cap': [7500, 5000, 10000, 12000, 3500, np.nan],  # Target unknown
-        'Net_Debt': [300, 200, 500, 600, 100, 250],
-        'Growth_%': [28, 35, 22, 18, 45, 30]
+        'Company': peers['ticker'].tolist() + [target['ticker']],
+        'Revenue': peers['revenue'].tolist() + [target['revenue']],
+        'EBITDA': peers['ebitda'].tolist() + [target['ebitda']],
+        'Market_Cap': peers['market_cap'].tolist() + [np.nan],  # Target unknown
+        'Net_Debt': peers['net_debt'].tolist() + [target['net_debt']],
+        'Growth_%': (peers['revenue_growth'] * 100).tolist() + [target['revenue_growth'] * 100],
+        'Peer_Distance': peers['distance'].tolist() + [np.nan]
     })
     
     # Calculate Enterprise Value
@@ -187,7 +211,8 @@ def exercise_2_comps_analysis():
 # EXERCISE 3: Stock Returns and Risk Analysis
 # =============================================================================
 
-def exercise_3_stock_analysis(ticker='AAPL', start_date='2022-01-01', end_date='2024-12-31'):
+def exercise_3_stock_analysis(ticker='AAPL', start_date='2022-01-01', end_date='2024-12-31',
+                              market_data=None):
     """
     Download and analyze real stock data with risk metrics.
     
@@ -199,6 +224,9 @@ def exercise_3_stock_analysis(ticker='AAPL', start_date='2022-01-01', end_date='
         Start date for analysis
     end_date : str
         End date for analysis
+    market_data : MarketDataCache, optional
+        Cached / offline data source (see market_data.py); downloads
+        directly from yfinance when omitted
     
     This demonstrates:
     - Real market data download
@@ -212,8 +240,18 @@ def exercise_3_stock_analysis(ticker='AAPL', start_date='2022-01-01', end_date='
     
     print(f"\nDownloading {ticker} data from {start_date} to {end_date}...")
     
+    if market_data is None:
+        # Imported here: yfinance is only needed for live downloads
+        import yfinance as yf
+        
+        def download(symbol):
+            return yf.download(symbol, start=start_date, end=end_date, progress=False)
+    else:
+        def download(symbol):
+            return market_data.history(symbol, start_date, end_date)
+    
     # Download stock data
-    stock = yf.download(ticker, start=start_date, end=end_date, progress=False)
+    stock = download(ticker)
     
     print(f"✅ Downloaded {len(stock)} trading days\n")
     
@@ -256,28 +294,34 @@ def exercise_3_stock_analysis(ticker='AAPL', start_date='2022-01-01', end_date='
     print("\n" + "-"*80)
     print("MONTHLY RETURNS:")
     print("-"*80)
-    monthly_returns = stock['Close'].resample('M').last().pct_change() * 100
+    monthly_returns = stock['Close'].resample('ME').last().pct_change() * 100
     print(monthly_returns.tail(12))
     
-    # Maximum drawdown
-    cumulative = (1 + stock['Close'].pct_change()).cumprod()
-    running_max = cumulative.cummax()
-    drawdown = ((cumulative - running_max) / running_max) * 100
+    # Risk metrics vs the S&P 500 (same engine as for a 5,000-ticker panel)
+    from risk_panel import RiskPanel
+    
+    sp500 = download('^GSPC')
+    panel = RiskPanel(pd.DataFrame({ticker: stock['Close'].squeeze()}),
+                      sp500['Close'].squeeze(), window=None)
+    
+    # Drawdown straight from prices - no cumulative-return copies needed
+    drawdown = panel.drawdown()[ticker] * 100
     max_drawdown = drawdown.min()
     max_dd_date = drawdown.idxmin()
+    risk = panel.summary().loc[ticker]
     
     print("\n" + "-"*80)
     print("RISK METRICS:")
     print("-"*80)
     print(f"Maximum Drawdown:        {max_drawdown:.2f}%")
     print(f"Max Drawdown Date:       {max_dd_date.strftime('%Y-%m-%d')}")
+    print(f"Beta vs S&P 500:         {risk['beta']:.2f}")
     
     # BONUS: Compare with S&P 500
     print("\n" + "-"*80)
     print("BONUS: COMPARISON WITH S&P 500:")
     print("-"*80)
     
-    sp500 = yf.download('^GSPC', start=start_date, end=end_date, progress=False)
     sp500_return = ((sp500['Close'].iloc[-1] / sp500['Close'].iloc[0]) - 1) * 100
     stock_return = ((stock['Close'].iloc[-1] / stock['Close'].iloc[0]) - 1) * 100
     
@@ -286,13 +330,7 @@ def exercise_3_stock_analysis(ticker='AAPL', start_date='2022-01-01', end_date='
     print(f"Outperformance:          {stock_return - sp500_return:+.2f}%")
     
     # Correlation
-    combined = pd.DataFrame({
-        ticker: stock['Close'].pct_change(),
-        'SP500': sp500['Close'].pct_change()
-    }).dropna()
-    
-    correlation = combined[ticker].corr(combined['SP500'])
-    print(f"Correlation with S&P 500: {correlation:.3f}")
+    print(f"Correlation with S&P 500: {risk['correlation']:.3f}")
     
     return stock
 
@@ -315,78 +353,67 @@ def exercise_4_excel_integration():
     print("EXERCISE 4: EXCEL MODEL INTEGRATION")
     print("="*80)
     
-    years = ['2020', '2021', '2022', '2023', '2024']
-    
+    from three_statement import ThreeStatementModel, OPENING_BALANCES
+
+    # OPENING BALANCE SHEET (FY2019 actuals) AND DRIVERS
+    # Statements are linked: cash rolls forward from the cash flow statement,
+    # retained earnings from net income, so the balance sheet must balance.
+    print("\nBuilding linked 3-statement model from drivers...")
+
+    opening = pd.DataFrame({
+        'revenue': 870, 'cash': 200, 'receivables': 107, 'inventory': 86, 'ppe': 1500,
+        'payables': 57, 'debt': 700, 'common_equity': 800, 'retained_earnings': 336
+    }, index=['Company'])[OPENING_BALANCES]
+    drivers = pd.DataFrame({
+        'revenue_growth': 0.15,     # 15% growth
+        'cogs_pct': 0.60,           # 60% of revenue
+        'opex_pct': 0.20,           # 20% of revenue
+        'da_pct': 0.05,
+        'capex_pct': 0.10,          # 10% of revenue
+        'tax_rate': 0.25,
+        'interest_rate': 0.06,
+        'debt_amortization': 0.10   # Debt paydown
+    }, index=['Company'])
+
+    model = ThreeStatementModel(opening, drivers, periods=5, periods_per_year=1, start='2020')
+    result = model.run()
+    statements = result.statements('Company')
+
+    checks = result.balance_check()
+    print("  Balance sheet balances in every year ✅" if checks.empty
+          else f"  ⚠️  Balance check failed:\n{checks}")
+
     # INCOME STATEMENT
-    print("\nBuilding Income Statement...")
-    
-    revenue = [1000, 1150, 1323, 1521, 1749]  # 15% growth
-    cogs = [600, 690, 794, 913, 1049]  # 60% of revenue
-    gross_profit = [r - c for r, c in zip(revenue, cogs)]
-    opex = [200, 230, 265, 304, 350]  # 20% of revenue
-    ebitda = [gp - op for gp, op in zip(gross_profit, opex)]
-    
-    income_statement = pd.DataFrame({
-        '2020': [revenue[0], cogs[0], gross_profit[0], opex[0], ebitda[0]],
-        '2021': [revenue[1], cogs[1], gross_profit[1], opex[1], ebitda[1]],
-        '2022': [revenue[2], cogs[2], gross_profit[2], opex[2], ebitda[2]],
-        '2023': [revenue[3], cogs[3], gross_profit[3], opex[3], ebitda[3]],
-        '2024': [revenue[4], cogs[4], gross_profit[4], opex[4], ebitda[4]]
-    }, index=['Revenue', 'COGS', 'Gross Profit', 'Operating Expenses', 'EBITDA'])
-    
-    print(income_statement)
-    
+    print("\nIncome Statement...")
+    income_statement = statements['income_statement']
+    income_statement.columns = income_statement.columns.astype(str)
+    print(income_statement.round(1))
+
     # BALANCE SHEET
-    print("\nBuilding Balance Sheet...")
-    
-    balance_sheet = pd.DataFrame({
-        '2020': [3000, 1800, 1200],
-        '2021': [3450, 1950, 1500],
-        '2022': [3968, 2100, 1868],
-        '2023': [4563, 2250, 2313],
-        '2024': [5247, 2400, 2847]
-    }, index=['Total Assets', 'Total Liabilities', 'Total Equity'])
-    
-    print(balance_sheet)
-    
+    print("\nBalance Sheet...")
+    balance_sheet = statements['balance_sheet']
+    balance_sheet.columns = balance_sheet.columns.astype(str)
+    print(balance_sheet.round(1))
+
     # CASH FLOW STATEMENT
-    print("\nBuilding Cash Flow Statement...")
-    
-    operating_cf = [eb * 0.8 for eb in ebitda]  # 80% of EBITDA
-    investing_cf = [-r * 0.1 for r in revenue]  # -10% of revenue (capex)
-    financing_cf = [-50, -60, -70, -80, -90]  # Debt paydown
-    
-    cash_flow = pd.DataFrame({
-        '2020': [operating_cf[0], investing_cf[0], financing_cf[0]],
-        '2021': [operating_cf[1], investing_cf[1], financing_cf[1]],
-        '2022': [operating_cf[2], investing_cf[2], financing_cf[2]],
-        '2023': [operating_cf[3], investing_cf[3], financing_cf[3]],
-        '2024': [operating_cf[4], investing_cf[4], financing_cf[4]]
-    }, index=['Operating Cash Flow', 'Investing Cash Flow', 'Financing Cash Flow'])
-    
-    print(cash_flow)
-    
+    print("\nCash Flow Statement...")
+    cash_flow = statements['cash_flow']
+    cash_flow.columns = cash_flow.columns.astype(str)
+    print(cash_flow.round(1))
+
     # KEY METRICS
     print("\nCalculating Key Metrics...")
-    
-    # Calculate metrics
-    gross_margin = (income_statement.loc['Gross Profit'] / income_statement.loc['Revenue']) * 100
-    ebitda_margin = (income_statement.loc['EBITDA'] / income_statement.loc['Revenue']) * 100
-    
-    # Simplified ROE (EBITDA / Equity as proxy)
-    roe = (income_statement.loc['EBITDA'] / balance_sheet.loc['Total Equity']) * 100
-    
-    # Net Debt / EBITDA (assuming some debt)
-    net_debt = [500, 450, 400, 350, 300]  # Declining debt
-    net_debt_ebitda = [nd / eb for nd, eb in zip(net_debt, ebitda)]
-    
-    key_metrics = pd.DataFrame({
-        '2020': [gross_margin['2020'], ebitda_margin['2020'], roe['2020'], net_debt_ebitda[0]],
-        '2021': [gross_margin['2021'], ebitda_margin['2021'], roe['2021'], net_debt_ebitda[1]],
-        '2022': [gross_margin['2022'], ebitda_margin['2022'], roe['2022'], net_debt_ebitda[2]],
-        '2023': [gross_margin['2023'], ebitda_margin['2023'], roe['2023'], net_debt_ebitda[3]],
-        '2024': [gross_margin['2024'], ebitda_margin['2024'], roe['2024'], net_debt_ebitda[4]]
-    }, index=['Gross Margin %', 'EBITDA Margin %', 'ROE %', 'Net Debt / EBITDA'])
+
+    gross_margin = (income_statement.loc['gross_profit'] / income_statement.loc['revenue']) * 100
+    ebitda_margin = (income_statement.loc['ebitda'] / income_statement.loc['revenue']) * 100
+    roe = (income_statement.loc['net_income'] / balance_sheet.loc['total_equity']) * 100
+    net_debt = balance_sheet.loc['debt'] - balance_sheet.loc['cash']
+    net_debt_ebitda = net_debt / income_statement.loc['ebitda']
+
+    key_metrics = pd.DataFrame(
+        [gross_margin, ebitda_margin, roe, net_debt_ebitda],
+        index=['Gross Margin %', 'EBITDA Margin %', 'ROE %', 'Net Debt / EBITDA']
+    )
     
     print(key_metrics.round(2))
     
@@ -395,29 +422,33 @@ def exercise_4_excel_integration():
     
     print(f"\n✍️  Writing to Excel: {output_file}")
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        income_statement.to_excel(writer, sheet_name='Income Statement')
-        balance_sheet.to_excel(writer, sheet_name='Balance Sheet')
-        cash_flow.to_excel(writer, sheet_name='Cash Flow')
-        key_metrics.to_excel(writer, sheet_name='Key Metrics')
+    from excel_export import ExcelExporter, verify_export
+
+    # Write-only workbook: rows stream to disk, a Summary sheet records row
+    # counts and checksums, and oversize tables would spill to Parquet
+    with ExcelExporter(output_file) as export:
+        export.write('Income Statement', income_statement)
+        export.write('Balance Sheet', balance_sheet)
+        export.write('Cash Flow', cash_flow)
+        export.write('Key Metrics', key_metrics)
     
     print(f"✅ Successfully created {output_file}")
     
-    # READ BACK AND VERIFY
-    print(f"\n🔍 Reading back from Excel to verify...")
+    # VERIFY (row counts + checksums against the Summary sheet, no pd.read_excel)
+    print(f"\n🔍 Verifying against the export summary...")
     
-    df_income = pd.read_excel(output_file, sheet_name='Income Statement', index_col=0)
-    df_balance = pd.read_excel(output_file, sheet_name='Balance Sheet', index_col=0)
-    df_cashflow = pd.read_excel(output_file, sheet_name='Cash Flow', index_col=0)
-    df_metrics = pd.read_excel(output_file, sheet_name='Key Metrics', index_col=0)
+    checks = verify_export(output_file, deep=True)
     
     print("\nVerification:")
-    print(f"  Income Statement: {df_income.shape[0]} rows × {df_income.shape[1]} columns ✅")
-    print(f"  Balance Sheet:    {df_balance.shape[0]} rows × {df_balance.shape[1]} columns ✅")
-    print(f"  Cash Flow:        {df_cashflow.shape[0]} rows × {df_cashflow.shape[1]} columns ✅")
-    print(f"  Key Metrics:      {df_metrics.shape[0]} rows × {df_metrics.shape[1]} columns ✅")
-    
-    print("\n✅ All sheets verified successfully!")
+    for table in export.tables:
+        status = "✅" if checks.loc[table['table'], 'ok'] else "❌"
+        print(f"  {table['table'] + ':':<18}{table['rows']} rows × {table['columns'] - 1} columns {status}")
+    
+    if checks['ok'].all():
+        print("\n✅ All sheets verified successfully!")
+    else:
+        print("\n❌ Verification failed:")
+        print(checks[~checks['ok']])
     print(f"\n📁 Open '{output_file}' in Excel to see your financial model!")
     
     return {
@@ -0,0 +1,392 @@
+"""
+Beta Service - Regression Betas Feeding WACC
+
+`DCFModel.set_wacc_assumptions`, `DCFValuationTool.calculate_wacc` and the
+Module 04 exercises take beta as a typed-in number. This service estimates it
+from price history instead:
+
+- Raw beta is the OLS slope of stock returns on benchmark returns. All
+  tickers are regressed together: the normal equations are column sums over
+  a (periods x tickers) return matrix, with per-ticker masks for missing data
+- Blume-adjusted beta = 0.67 x raw + 0.33 (betas drift toward 1 over time)
+- Hamada unlevering / relevering moves a beta to a target capital structure,
+  and `wacc()` turns the result straight into a batch WACC table
+- Results are cached per (ticker, window, frequency); a repeated request only
+  regresses the tickers that are not cached yet
+
+Prices: DataFrame indexed by date, one column per ticker (e.g. read from the
+Module 03 MarketDataCache), plus a benchmark price Series.
+"""
+
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Periods per year and pandas resample rule for each return frequency
+FREQUENCIES = {
+    'D': (252, None),
+    'W': (52, 'W-FRI'),
+    'M': (12, 'ME')
+}
+
+FREQUENCY_NAMES = {'D': 'daily', 'W': 'weekly', 'M': 'monthly'}
+
+BLUME_WEIGHT = 0.67
+
+
+def unlever_beta(levered_beta, debt_to_equity, tax_rate):
+    """Hamada: asset beta = levered beta / (1 + (1 - t) x D/E)."""
+    return levered_beta / (1 + (1 - tax_rate) * debt_to_equity)
+
+
+def relever_beta(unlevered_beta, debt_to_equity, tax_rate):
+    """Hamada: levered beta = asset beta x (1 + (1 - t) x D/E)."""
+    return unlevered_beta * (1 + (1 - tax_rate) * debt_to_equity)
+
+
+class BetaService:
+    """
+    Batched regression betas with a (ticker, window, frequency) cache.
+
+    Usage:
+        service = BetaService(prices, sp500)
+        service.betas(window=104, frequency='W')       # all tickers
+        service.wacc(debt_to_equity=0.3, current_debt_to_equity=de)
+    """
+
+    def __init__(self, prices: pd.DataFrame, benchmark: pd.Series, min_fraction: float = 0.8):
+        """
+        Parameters:
+        -----------
+        prices : pd.DataFrame
+            Daily prices, dates x tickers (NaN where a ticker did not trade)
+        benchmark : pd.Series
+            Daily benchmark prices (e.g. S&P 500)
+        min_fraction : float
+            Share of the window a ticker must have traded for a beta
+        """
+        self.prices = prices.sort_index()
+        self.benchmark = benchmark.sort_index()
+        self.min_fraction = min_fraction
+
+        self._cache: Dict[tuple, Dict[str, float]] = {}
+        self._returns: Dict[str, tuple] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'regressions': 0}
+
+    @classmethod
+    def from_market_data(cls, market_data, tickers: Sequence[str], start, end,
+                         benchmark: str = '^GSPC', **kwargs) -> 'BetaService':
+        """Build from a MarketDataCache (only missing date ranges are downloaded)."""
+        prices = pd.DataFrame({t: market_data.history(t, start, end)['Close'] for t in tickers})
+        bench = market_data.history(benchmark, start, end)['Close']
+        return cls(prices, bench, **kwargs)
+
+    def update_prices(self, prices: pd.DataFrame, benchmark: Optional[pd.Series] = None):
+        """
+        Add or replace price history; cached betas for affected tickers are dropped.
+
+        A new benchmark series invalidates every cached beta.
+        """
+        self.prices = prices.combine_first(self.prices).sort_index()
+        self._returns.clear()
+        if benchmark is not None:
+            self.benchmark = benchmark.combine_first(self.benchmark).sort_index()
+            self._cache.clear()
+            return
+
+        changed = set(prices.columns)
+        self._cache = {key: value for key, value in self._cache.items() if key[0] not in changed}
+
+    def _frequency_returns(self, frequency: str):
+        """Returns (periods x tickers) and benchmark returns at a frequency."""
+        if frequency not in self._returns:
+            if frequency not in FREQUENCIES:
+                raise ValueError(f"frequency must be one of {list(FREQUENCIES)}")
+            rule = FREQUENCIES[frequency][1]
+
+            bench = self.benchmark.dropna()
+            prices = self.prices.reindex(bench.index)
+            if rule is not None:
+                bench = bench.resample(rule).last()
+                prices = prices.resample(rule).last()
+
+            stock_returns = prices.to_numpy(dtype=np.float64)
+            stock_returns = stock_returns[1:] / stock_returns[:-1] - 1
+            bench = bench.to_numpy(dtype=np.float64)
+            self._returns[frequency] = (stock_returns, bench[1:] / bench[:-1] - 1)
+
+        return self._returns[frequency]
+
+    def _regress(self, columns: np.ndarray, window: int, frequency: str) -> pd.DataFrame:
+        """One least-squares pass over the last `window` periods for many tickers."""
+        stock_returns, bench_returns = self._frequency_returns(frequency)
+        x = bench_returns[-window:]
+        y = stock_returns[-window:, columns]
+
+        valid = ~np.isnan(y) & ~np.isnan(x)[:, None]
+        n = valid.sum(axis=0).astype(np.float64)
+
+        # Normal equations for y = alpha + beta * x, per column with its own mask
+        xm = np.where(valid, x[:, None], 0.0)
+        ym = np.where(valid, y, 0.0)
+        sx, sy = xm.sum(axis=0), ym.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_bar, y_bar = sx / n, sy / n
+            dx = np.where(valid, xm - x_bar, 0.0)
+            dy = np.where(valid, ym - y_bar, 0.0)
+            sxx = (dx * dx).sum(axis=0)
+            syy = (dy * dy).sum(axis=0)
+            sxy = (dx * dy).sum(axis=0)
+
+            beta = sxy / sxx
+            alpha = y_bar - beta * x_bar
+            r_squared = sxy * sxy / (sxx * syy)
+            residual_var = (syy - beta * sxy) / (n - 2)
+            std_error = np.sqrt(np.maximum(residual_var, 0.0) / sxx)
+
+        enough = n >= max(self.min_fraction * window, 3)
+        periods_per_year = FREQUENCIES[frequency][0]
+        result = pd.DataFrame({
+            'beta_raw': beta,
+            'beta_adjusted': BLUME_WEIGHT * beta + (1 - BLUME_WEIGHT),
+            'std_error': std_error,
+            'r_squared': r_squared,
+            'alpha_annual': alpha * periods_per_year,
+            'observations': n.astype(np.int64)
+        }, index=self.prices.columns[columns])
+        result.loc[~enough, ['beta_raw', 'beta_adjusted', 'std_error', 'r_squared',
+                             'alpha_annual']] = np.nan
+
+        self.stats['regressions'] += 1
+        return result
+
+    def betas(
+        self,
+        tickers: Optional[Sequence[str]] = None,
+        window: int = 104,
+        frequency: str = 'W'
+    ) -> pd.DataFrame:
+        """
+        Raw and Blume-adjusted betas (cached per ticker, window, frequency).
+
+        Parameters:
+        -----------
+        tickers : sequence of str, optional
+            Defaults to every ticker in the price panel
+        window : int
+            Regression window in periods (104 weekly = 2 years, 60 monthly = 5)
+        frequency : str
+            'D', 'W' or 'M' returns
+
+        Returns:
+        --------
+        pd.DataFrame
+            beta_raw, beta_adjusted, std_error, r_squared, alpha_annual,
+            observations - one row per ticker
+        """
+        tickers = list(self.prices.columns if tickers is None else tickers)
+        unknown = [t for t in tickers if t not in self.prices.columns]
+        if unknown:
+            raise KeyError(f"No price history for: {unknown}")
+
+        missing = [t for t in tickers if (t, window, frequency) not in self._cache]
+        self.stats['hits'] += len(tickers) - len(missing)
+        self.stats['misses'] += len(missing)
+
+        if missing:
+            columns = self.prices.columns.get_indexer(missing)
+            fresh = self._regress(columns, window, frequency)
+            for ticker, row in zip(fresh.index, fresh.to_dict('records')):
+                self._cache[(ticker, window, frequency)] = row
+
+        return pd.DataFrame.from_records(
+            [self._cache[(t, window, frequency)] for t in tickers], index=pd.Index(tickers, name='ticker'))
+
+    def beta(self, ticker: str, adjusted: bool = True, window: int = 104,
+             frequency: str = 'W') -> float:
+        """
+        Single beta, e.g. for DCFModel.set_wacc_assumptions(beta=...).
+
+        Raises ValueError when the ticker has too little history in the
+        window, rather than handing a NaN on to WACC and the valuation.
+        """
+        row = self.betas([ticker], window=window, frequency=frequency).iloc[0]
+        value = float(row['beta_adjusted'] if adjusted else row['beta_raw'])
+        if np.isnan(value):
+            required = max(int(np.ceil(self.min_fraction * window)), 3)
+            raise ValueError(
+                f"{ticker}: {int(row['observations'])} {FREQUENCY_NAMES[frequency]} returns "
+                f"in the last {window} periods, need at least {required} for a beta")
+        return value
+
+    @staticmethod
+    def describe(window: int = 104, frequency: str = 'W', adjusted: bool = True) -> str:
+        """Label for a beta estimate, e.g. '2Y weekly regression, Blume-adjusted'."""
+        years = window / FREQUENCIES[frequency][0]
+        span = f"{years:g}Y" if years == round(years) else f"{window}-period"
+        return (f"{span} {FREQUENCY_NAMES[frequency]} regression"
+                + (", Blume-adjusted" if adjusted else ", raw"))
+
+    def wacc(
+        self,
+        tickers: Optional[Sequence[str]] = None,
+        debt_to_equity: Union[float, np.ndarray, pd.Series] = 0.30,
+        current_debt_to_equity: Union[None, float, np.ndarray, pd.Series] = None,
+        tax_rate: Union[float, np.ndarray, pd.Series] = 0.21,
+        risk_free_rate: float = 0.04,
+        market_risk_premium: float = 0.06,
+        cost_of_debt: Union[float, np.ndarray, pd.Series] = 0.05,
+        adjusted: bool = True,
+        window: int = 104,
+        frequency: str = 'W'
+    ) -> pd.DataFrame:
+        """
+        Batch WACC from regression betas.
+
+        When `current_debt_to_equity` is given, each beta is unlevered at the
+        company's current D/E and relevered at the target `debt_to_equity`;
+        otherwise the regression beta is used as is.
+
+        Parameters:
+        -----------
+        debt_to_equity : float or array
+            Target D/E (scalar or one per ticker)
+        current_debt_to_equity : float or array, optional
+            D/E over the regression window
+        tax_rate, cost_of_debt : float or array
+            Scalars or one per ticker (pre-tax cost of debt)
+        adjusted : bool
+            Start from Blume-adjusted (True) or raw betas
+
+        Returns:
+        --------
+        pd.DataFrame
+            Betas, cost of equity, capital weights and WACC per ticker
+        """
+        table = self.betas(tickers, window=window, frequency=frequency)
+
+        def per_ticker(value):
+            if isinstance(value, pd.Series):
+                return value.reindex(table.index).to_numpy(dtype=np.float64)
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), len(table))
+
+        target_de = per_ticker(debt_to_equity)
+        tax = per_ticker(tax_rate)
+        beta = table['beta_adjusted' if adjusted else 'beta_raw'].to_numpy()
+
+        if current_debt_to_equity is not None:
+            table['beta_unlevered'] = unlever_beta(beta, per_ticker(current_debt_to_equity), tax)
+            beta = relever_beta(table['beta_unlevered'].to_numpy(), target_de, tax)
+
+        table['beta'] = beta
+        table['cost_of_equity'] = risk_free_rate + beta * market_risk_premium
+        table['equity_weight'] = 1 / (1 + target_de)
+        table['after_tax_cost_of_debt'] = per_ticker(cost_of_debt) * (1 - tax)
+        table['wacc'] = (table['equity_weight'] * table['cost_of_equity']
+                         + (1 - table['equity_weight']) * table['after_tax_cost_of_debt'])
+        return table
+
+
+def synthetic_price_panel(n_tickers: int = 3_000, years: int = 6, seed: int = 42) -> tuple:
+    """
+    Daily one-factor prices with known true betas (some names list late).
+
+    Returns:
+    --------
+    tuple
+        (prices DataFrame, benchmark Series, true betas Series)
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2024-12-31', periods=years * 252)
+    n_days = len(dates)
+
+    market = rng.normal(0.0003, 0.011, n_days)
+    true_beta = rng.uniform(0.3, 2.0, n_tickers)
+    returns = (market[:, None] * true_beta
+               + rng.standard_normal((n_days, n_tickers)) * rng.uniform(0.008, 0.02, n_tickers))
+    prices = 40 * np.cumprod(1 + returns, axis=0)
+
+    listed = np.where(rng.random(n_tickers) < 0.1, rng.integers(0, n_days, n_tickers), 0)
+    prices[np.arange(n_days)[:, None] < listed] = np.nan
+
+    tickers = [f'S{i:04d}' for i in range(n_tickers)]
+    return (pd.DataFrame(prices, index=dates, columns=tickers),
+            pd.Series(3000 * np.cumprod(1 + market), index=dates, name='Benchmark'),
+            pd.Series(true_beta, index=tickers))
+
+
+def example_beta_service():
+    """Regression betas for 3,000 tickers, cache reuse, batch WACC, DCFModel hookup"""
+    import time
+
+    from dcf_model import DCFModel
+
+    print("\n" + "="*80)
+    print("BETA SERVICE - REGRESSION BETAS -> WACC")
+    print("="*80)
+
+    prices, benchmark, true_beta = synthetic_price_panel(3_000)
+    service = BetaService(prices, benchmark)
+
+    start = time.perf_counter()
+    weekly = service.betas(window=104, frequency='W')
+    print(f"\n2Y weekly betas, {len(weekly):,} tickers (one pass): "
+          f"{(time.perf_counter() - start)*1000:.0f} ms")
+
+    start = time.perf_counter()
+    service.betas(window=104, frequency='W')
+    print(f"Same request again (cache):                 "
+          f"{(time.perf_counter() - start)*1000:.1f} ms")
+
+    start = time.perf_counter()
+    monthly = service.betas(window=60, frequency='M')
+    print(f"5Y monthly betas (new cache key):           "
+          f"{(time.perf_counter() - start)*1000:.0f} ms")
+    print(f"Cache stats: {service.stats}")
+
+    # Check against a per-ticker np.polyfit on the same returns
+    stock_returns, bench_returns = service._frequency_returns('W')
+    checks = []
+    for i in range(25):
+        y, x = stock_returns[-104:, i], bench_returns[-104:]
+        ok = ~np.isnan(y)
+        if ok.sum() >= 0.8 * 104:
+            checks.append(abs(np.polyfit(x[ok], y[ok], 1)[0] - weekly['beta_raw'].iloc[i]))
+    print(f"Max difference vs np.polyfit (25 names): {max(checks):.1e}")
+
+    estimated = weekly['beta_raw'].dropna()
+    error = (estimated - true_beta[estimated.index]).abs()
+    print(f"\nBeta recovery vs true beta: median abs error {error.median():.3f} "
+          f"(weekly, {len(estimated):,} names with enough history)")
+    print(f"Median standard error: weekly {weekly['std_error'].median():.3f}, "
+          f"monthly {monthly['std_error'].median():.3f}")
+
+    # Batch WACC: unlever at current leverage, relever at a 30% D/E target
+    rng = np.random.default_rng(1)
+    current_de = pd.Series(rng.uniform(0.0, 1.2, len(prices.columns)), index=prices.columns)
+    start = time.perf_counter()
+    waccs = service.wacc(debt_to_equity=0.30, current_debt_to_equity=current_de, tax_rate=0.21)
+    print(f"\nBatch WACC, {len(waccs):,} tickers: {(time.perf_counter() - start)*1000:.0f} ms")
+    print(waccs[['beta_raw', 'beta_adjusted', 'beta_unlevered', 'beta', 'cost_of_equity', 'wacc']]
+          .head(6).round(3).to_string())
+
+    # Feed a regression beta into the DCF model
+    ticker = prices.columns[0]
+    model = DCFModel(f'{ticker} Corp', ticker)
+    model.set_historical_data([2022, 2023, 2024], [800, 920, 1050], [160, 200, 250])
+    model.set_revenue_assumptions([0.18, 0.15, 0.12, 0.10, 0.08])
+    model.set_operating_assumptions(ebitda_margin=0.25, tax_rate=0.21, da_pct_revenue=0.03,
+                                    capex_pct_revenue=0.04, nwc_pct_revenue=0.10)
+    model.set_wacc_assumptions(risk_free_rate=0.04, equity_risk_premium=0.06,
+                               beta=service.beta(ticker), cost_of_debt=0.05,
+                               mv_equity=5000, mv_debt=1000)
+    print(f"\nDCFModel for {ticker}: beta {model.beta:.2f} (Blume-adjusted), "
+          f"WACC {model.calculate_wacc():.2%}")
+
+    return service
+
+
+if __name__ == "__main__":
+    service = example_beta_service()
@@ -7,11 +7,12 @@ This module contains a comprehensive DCF model for investment banking valuation.
 Complete DCF Valuation Model
 """
 
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
 
+# pandas is imported inside the methods that build tables, so a plain
+# valuation (assumptions -> calculate_dcf -> calculate_equity_value) never
+# pays its import cost
+
 class DCFModel:
     """
     Comprehensive Discounted Cash Flow Model
@@ -27,6 +28,9 @@ class DCFModel:
     - Enterprise and Equity Value
     """
     
+    # Shared memo of results (e.g. model_cache.ModelCache); None computes directly
+    cache = None
+    
     def __init__(self, company_name, ticker):
         self.company_name = company_name
         self.ticker = ticker
@@ -60,6 +64,8 @@ class DCFModel:
         
         # Results
         self.projections = None
+        self._projection_columns = None
+        self._projected_from = None
         self.enterprise_value = 0.0
         self.equity_value = 0.0
         self.equity_value_per_share = 0.0
@@ -100,6 +106,12 @@ class DCFModel:
         self.terminal_growth_rate = growth_rate
         self.terminal_ebitda_multiple = ebitda_multiple
     
+    def _memo(self, name, inputs, compute):
+        """compute(), or the cached result for the same inputs"""
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(f'{type(self).__name__}.{name}', inputs, compute)
+    
     def calculate_wacc(self):
         """Calculate Weighted Average Cost of Capital"""
         # Cost of equity (CAPM)
@@ -121,7 +133,18 @@ class DCFModel:
     
     def build_projections(self):
         """Build financial projections"""
-        # Initialize projection DataFrame
+        import pandas as pd
+
+        self.projections = pd.DataFrame(self._projections())
+        return self.projections
+
+    def _projection_inputs(self):
+        """Everything _project() depends on"""
+        return (self.historical_revenue[-1], tuple(self.revenue_growth_rates), self.ebitda_margin,
+                self.tax_rate, self.da_pct_revenue, self.capex_pct_revenue, self.nwc_pct_revenue)
+
+    def _project(self):
+        """Projection columns as plain lists (no pandas needed)"""
         years = list(range(1, self.projection_years + 1))
         
         # Revenue projections
@@ -169,8 +192,7 @@ class DCFModel:
             for nopat_da, cx, nwc in zip(nopat_plus_da, capex, nwc_changes)
         ]
         
-        # Create DataFrame
-        self.projections = pd.DataFrame({
+        self._projection_columns = {
             'Year': years,
             'Revenue': revenues,
             'Revenue_Growth': self.revenue_growth_rates,
@@ -186,19 +208,31 @@ class DCFModel:
             'Less_CapEx': capex,
             'Less_NWC': nwc_changes,
             'FCF': fcfs
-        })
+        }
         
-        return self.projections
+        return self._projection_columns
+
+    def _projections(self):
+        """Projection columns, rebuilt when their inputs have changed"""
+        inputs = self._projection_inputs()
+        if self._projection_columns is None or inputs != self._projected_from:
+            self._projection_columns = self._memo('project', inputs, self._project)
+            self._projected_from = inputs
+        return self._projection_columns
+
+    def _projected(self, column):
+        """Projected column, building projections on first use"""
+        return self._projections()[column]
     
     def calculate_terminal_value_perpetuity(self, wacc):
         """Calculate terminal value using perpetuity growth method"""
-        terminal_fcf = self.projections['FCF'].iloc[-1] * (1 + self.terminal_growth_rate)
+        terminal_fcf = self._projected('FCF')[-1] * (1 + self.terminal_growth_rate)
         terminal_value = terminal_fcf / (wacc - self.terminal_growth_rate)
         return terminal_value
     
     def calculate_terminal_value_multiple(self):
         """Calculate terminal value using exit multiple method"""
-        terminal_ebitda = self.projections['EBITDA'].iloc[-1]
+        terminal_ebitda = self._projected('EBITDA')[-1]
         terminal_value = terminal_ebitda * self.terminal_ebitda_multiple
         return terminal_value
     
@@ -212,11 +246,20 @@ class DCFModel:
             If True, use perpetuity growth method for terminal value
             If False, use exit multiple method
         """
+        inputs = (self._projection_inputs(), self.risk_free_rate, self.equity_risk_premium,
+                  self.beta, self.cost_of_debt, self.market_value_equity, self.market_value_debt,
+                  self.terminal_growth_rate, self.terminal_ebitda_multiple, use_perpetuity)
+        result = self._memo('calculate_dcf', inputs, lambda: self._discount(use_perpetuity))
+        self.enterprise_value = result['Enterprise_Value']
+        return result
+
+    def _discount(self, use_perpetuity):
+        """calculate_dcf() without the cache"""
         wacc = self.calculate_wacc()
         
         # Present value of projected FCFs
         pv_fcfs = []
-        for year, fcf in enumerate(self.projections['FCF'], 1):
+        for year, fcf in enumerate(self._projected('FCF'), 1):
             pv = fcf / (1 + wacc) ** year
             pv_fcfs.append(pv)
         
@@ -231,15 +274,12 @@ class DCFModel:
         # PV of terminal value
         pv_terminal = terminal_value / (1 + wacc) ** self.projection_years
         
-        # Enterprise value
-        self.enterprise_value = pv_projection_period + pv_terminal
-        
         return {
             'WACC': wacc,
             'PV_Projection_Period': pv_projection_period,
             'Terminal_Value': terminal_value,
             'PV_Terminal_Value': pv_terminal,
-            'Enterprise_Value': self.enterprise_value
+            'Enterprise_Value': pv_projection_period + pv_terminal
         }
     
     def calculate_equity_value(self, cash, debt, minority_interest=0, 
@@ -270,6 +310,8 @@ class DCFModel:
         
         Returns a DataFrame with equity values per share for different scenarios
         """
+        import pandas as pd
+
         results = []
         
         for wacc in wacc_range:
@@ -310,6 +352,80 @@ class DCFModel:
         
         return sensitivity_df
     
+    @classmethod
+    def value_batch(cls, inputs, use_perpetuity=True):
+        """
+        calculate_dcf() + calculate_equity_value() for many companies at once
+        
+        Parameters:
+        -----------
+        inputs : mapping of str -> array
+            One value per company (e.g. a deal_book.DealBatch): base_revenue
+            (last historical revenue), revenue_growth (n × years), ebitda_margin,
+            tax_rate, da_pct_revenue, capex_pct_revenue, nwc_pct_revenue,
+            risk_free_rate, equity_risk_premium, beta, cost_of_debt, mv_equity,
+            mv_debt, terminal_growth_rate, terminal_ebitda_multiple, cash, debt;
+            optional minority_interest, investments, shares_outstanding
+        use_perpetuity : bool
+            Terminal value by perpetuity growth (True) or exit multiple
+        
+        Returns:
+        --------
+        dict
+            Arrays: WACC, PV_Projection_Period, Terminal_Value,
+            PV_Terminal_Value, Enterprise_Value, Equity_Value,
+            Equity_Value_Per_Share
+        """
+        import numpy as np
+
+        def column(name, default=None):
+            value = inputs[name] if default is None or name in inputs else default
+            return np.asarray(value, dtype=np.float64)
+
+        growth = np.atleast_2d(column('revenue_growth'))
+        n_years = growth.shape[1]
+        base_revenue = column('base_revenue')[:, None]
+        tax_rate = column('tax_rate')
+
+        # Projections: same steps as _project(), one row per company
+        revenues = base_revenue * np.cumprod(1 + growth, axis=1)
+        ebitdas = revenues * column('ebitda_margin')[:, None]
+        da_values = revenues * column('da_pct_revenue')[:, None]
+        ebits = ebitdas - da_values
+        taxes = np.where(ebits > 0, ebits * tax_rate[:, None], 0.0)
+        capex = revenues * column('capex_pct_revenue')[:, None]
+        nwc = np.hstack([base_revenue, revenues]) * column('nwc_pct_revenue')[:, None]
+        fcfs = ebits - taxes + da_values - capex - np.diff(nwc, axis=1)
+
+        # WACC
+        mv_equity, mv_debt = column('mv_equity'), column('mv_debt')
+        total_capital = mv_equity + mv_debt
+        cost_of_equity = column('risk_free_rate') + column('beta') * column('equity_risk_premium')
+        wacc = (mv_equity / total_capital * cost_of_equity
+                + mv_debt / total_capital * column('cost_of_debt') * (1 - tax_rate))
+
+        discount = (1 + wacc[:, None]) ** -np.arange(1, n_years + 1)
+        pv_projection_period = (fcfs * discount).sum(axis=1)
+        if use_perpetuity:
+            growth_rate = column('terminal_growth_rate')
+            terminal_value = fcfs[:, -1] * (1 + growth_rate) / (wacc - growth_rate)
+        else:
+            terminal_value = ebitdas[:, -1] * column('terminal_ebitda_multiple')
+        pv_terminal = terminal_value * discount[:, -1]
+        enterprise_value = pv_projection_period + pv_terminal
+
+        equity_value = (enterprise_value + column('cash') - column('debt')
+                        - column('minority_interest', 0.0) + column('investments', 0.0))
+        return {
+            'WACC': wacc,
+            'PV_Projection_Period': pv_projection_period,
+            'Terminal_Value': terminal_value,
+            'PV_Terminal_Value': pv_terminal,
+            'Enterprise_Value': enterprise_value,
+            'Equity_Value': equity_value,
+            'Equity_Value_Per_Share': equity_value / column('shares_outstanding', 1.0)
+        }
+    
     def display_summary(self):
         """Display valuation summary"""
         wacc = self.calculate_wacc()
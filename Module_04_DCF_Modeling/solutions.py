@@ -7,7 +7,6 @@ Study these after attempting the exercises yourself!
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime
 
 
@@ -15,7 +14,7 @@ from datetime import datetime
 # EXERCISE 1: Build a Complete DCF from Scratch
 # =============================================================================
 
-def exercise_1_complete_dcf(ticker='AAPL'):
+def exercise_1_complete_dcf(ticker='AAPL', market_data=None, beta_service=None):
     """
     Build a complete DCF model for a public company.
     
@@ -32,15 +31,24 @@ def exercise_1_complete_dcf(ticker='AAPL'):
     -----------
     ticker : str
         Stock ticker to value (default: AAPL)
+    market_data : MarketDataCache, optional
+        Cached / offline data source (Module_03_Data_Analysis/market_data.py);
+        fetches `info` from yfinance when omitted
+    beta_service : BetaService, optional
+        Regression betas (beta_service.py); a typed-in beta of 1.1 is used
+        when omitted
     """
     print("\n" + "="*80)
     print(f"EXERCISE 1: COMPLETE DCF MODEL - {ticker}")
     print("="*80)
     
-    # Download stock data
     print(f"\n📊 Downloading {ticker} data...")
-    stock = yf.Ticker(ticker)
-    info = stock.info
+    if market_data is None:
+        # yfinance is only needed for live downloads
+        import yfinance as yf
+        info = yf.Ticker(ticker).info
+    else:
+        info = market_data.info(ticker)
     
     # Get key metrics
     company_name = info.get('longName', ticker)
@@ -144,7 +152,9 @@ def exercise_1_complete_dcf(ticker='AAPL'):
     
     # CAPM assumptions
     risk_free_rate = 0.04
-    beta = 1.1
+    beta_window, beta_frequency = 104, 'W'
+    beta = (beta_service.beta(ticker, window=beta_window, frequency=beta_frequency)
+            if beta_service is not None else 1.1)
     equity_risk_premium = 0.06
     cost_of_equity = risk_free_rate + (beta * equity_risk_premium)
     
@@ -159,6 +169,9 @@ def exercise_1_complete_dcf(ticker='AAPL'):
     
     wacc = (weight_equity * cost_of_equity) + (weight_debt * cost_of_debt * (1 - tax_rate))
     
+    beta_source = (beta_service.describe(beta_window, beta_frequency)
+                   if beta_service is not None else "assumed")
+    print(f"Beta: {beta:.2f} ({beta_source})")
     print(f"Cost of Equity (CAPM): {cost_of_equity*100:.2f}%")
     print(f"After-tax Cost of Debt: {cost_of_debt*(1-tax_rate)*100:.2f}%")
     print(f"Capital Structure: {weight_equity*100:.1f}% Equity / {weight_debt*100:.1f}% Debt")
@@ -364,111 +377,54 @@ def exercise_3_scenario_analysis():
     print("EXERCISE 3: SCENARIO ANALYSIS (Base / Bull / Bear)")
     print("="*80)
     
-    # Common assumptions
-    base_revenue = 1000
-    years = 5
-    tax_rate = 0.25
-    shares = 100
-    cash = 150
-    debt = 400
-    
-    # Scenario assumptions
-    scenarios = {
-        'BASE': {
-            'revenue_growth': [0.12, 0.10, 0.09, 0.08, 0.07],
-            'ebitda_margin': 0.24,
-            'capex_pct': 0.04,
-            'nwc_pct': 0.08,
-            'wacc': 0.095,
-            'terminal_growth': 0.025
-        },
-        'BULL': {
-            'revenue_growth': [0.15, 0.13, 0.11, 0.10, 0.09],
-            'ebitda_margin': 0.26,  # Margin expansion
-            'capex_pct': 0.04,
-            'nwc_pct': 0.07,  # Better working capital management
-            'wacc': 0.085,  # Lower risk perception
-            'terminal_growth': 0.030
-        },
-        'BEAR': {
-            'revenue_growth': [0.08, 0.07, 0.06, 0.05, 0.04],
-            'ebitda_margin': 0.22,  # Margin compression
-            'capex_pct': 0.05,  # Higher reinvestment needs
-            'nwc_pct': 0.10,
-            'wacc': 0.105,  # Higher risk
-            'terminal_growth': 0.020
-        }
-    }
+    from scenario_manager import ScenarioManager
+    
+    # Common assumptions + BASE case; BULL and BEAR are stored as diffs
+    manager = ScenarioManager({
+        'base_revenue': 1000,
+        'tax_rate': 0.25,
+        'shares': 100,
+        'cash': 150,
+        'debt': 400,
+        'da_pct': 0.03,  # D&A constant at 3%
+        'revenue_growth': [0.12, 0.10, 0.09, 0.08, 0.07],
+        'ebitda_margin': 0.24,
+        'capex_pct': 0.04,
+        'nwc_pct': 0.08,
+        'wacc': 0.095,
+        'terminal_growth': 0.025
+    })
+    manager.add(
+        'BULL',
+        revenue_growth=[0.15, 0.13, 0.11, 0.10, 0.09],
+        ebitda_margin=0.26,  # Margin expansion
+        nwc_pct=0.07,  # Better working capital management
+        wacc=0.085,  # Lower risk perception
+        terminal_growth=0.030
+    )
+    manager.add(
+        'BEAR',
+        revenue_growth=[0.08, 0.07, 0.06, 0.05, 0.04],
+        ebitda_margin=0.22,  # Margin compression
+        capex_pct=0.05,  # Higher reinvestment needs
+        nwc_pct=0.10,
+        wacc=0.105,  # Higher risk
+        terminal_growth=0.020
+    )
     
-    results = {}
+    valuations = manager.evaluate().loc['Company']
+    results = {name: row.to_dict() for name, row in valuations.iterrows()}
     
-    for scenario_name, assumptions in scenarios.items():
+    for scenario_name, result in results.items():
         print(f"\n{'-'*80}")
         print(f"{scenario_name} CASE:")
         print(f"{'-'*80}")
-        
-        # Build revenue projections
-        revenues = []
-        current_revenue = base_revenue
-        for g in assumptions['revenue_growth']:
-            current_revenue *= (1 + g)
-            revenues.append(current_revenue)
-        
-        # Calculate FCF
-        ebitda_values = [r * assumptions['ebitda_margin'] for r in revenues]
-        da_values = [r * 0.03 for r in revenues]  # D&A constant at 3%
-        ebit_values = [ebitda - da for ebitda, da in zip(ebitda_values, da_values)]
-        taxes = [ebit * tax_rate for ebit in ebit_values]
-        nopat = [ebit - tax for ebit, tax in zip(ebit_values, taxes)]
-        capex = [r * assumptions['capex_pct'] for r in revenues]
-        
-        # NWC changes
-        base_nwc = base_revenue * assumptions['nwc_pct']
-        nwc_changes = []
-        prev_nwc = base_nwc
-        for r in revenues:
-            current_nwc = r * assumptions['nwc_pct']
-            nwc_changes.append(current_nwc - prev_nwc)
-            prev_nwc = current_nwc
-        
-        # FCF
-        fcfs = [n + da - cx - nwc for n, da, cx, nwc in 
-                zip(nopat, da_values, capex, nwc_changes)]
-        
-        # Valuation
-        wacc = assumptions['wacc']
-        terminal_growth = assumptions['terminal_growth']
-        
-        # PV of FCFs
-        pv_fcfs = sum([fcf / ((1 + wacc) ** (i+1)) for i, fcf in enumerate(fcfs)])
-        
-        # Terminal value
-        terminal_fcf = fcfs[-1] * (1 + terminal_growth)
-        terminal_value = terminal_fcf / (wacc - terminal_growth)
-        pv_terminal = terminal_value / ((1 + wacc) ** years)
-        
-        # Enterprise and equity value
-        ev = pv_fcfs + pv_terminal
-        equity_value = ev + cash - debt
-        price_per_share = equity_value / shares
-        
-        # Store results
-        results[scenario_name] = {
-            'Revenue_CAGR_%': (((revenues[-1] / base_revenue) ** (1/years)) - 1) * 100,
-            'Avg_EBITDA_Margin_%': assumptions['ebitda_margin'] * 100,
-            'WACC_%': wacc * 100,
-            'Terminal_Growth_%': terminal_growth * 100,
-            'Enterprise_Value': ev,
-            'Equity_Value': equity_value,
-            'Price_per_Share': price_per_share
-        }
-        
-        print(f"Revenue CAGR: {results[scenario_name]['Revenue_CAGR_%']:.1f}%")
-        print(f"EBITDA Margin: {results[scenario_name]['Avg_EBITDA_Margin_%']:.1f}%")
-        print(f"WACC: {results[scenario_name]['WACC_%']:.2f}%")
-        print(f"Enterprise Value: ${ev:,.0f}M")
-        print(f"Equity Value: ${equity_value:,.0f}M")
-        print(f"Price per Share: ${price_per_share:.2f}")
+        print(f"Revenue CAGR: {result['Revenue_CAGR_%']:.1f}%")
+        print(f"EBITDA Margin: {result['Avg_EBITDA_Margin_%']:.1f}%")
+        print(f"WACC: {result['WACC_%']:.2f}%")
+        print(f"Enterprise Value: ${result['Enterprise_Value']:,.0f}M")
+        print(f"Equity Value: ${result['Equity_Value']:,.0f}M")
+        print(f"Price per Share: ${result['Price_per_Share']:.2f}")
     
     # SUMMARY TABLE
     print("\n" + "="*80)
@@ -495,6 +451,9 @@ def exercise_3_scenario_analysis():
     print(f"   If current price < ${base_price:.2f}: BUY")
     print(f"   If current price > ${bull_price:.2f}: SELL")
     
+    # What moves the price from BASE to BEAR?
+    manager.report('BASE', 'BEAR')
+    
     return results
 
 
@@ -20,6 +20,9 @@ class LBOModel:
     and exit to calculate returns (IRR and MOIC)
     """
     
+    # Shared memo of results (e.g. model_cache.ModelCache); None computes directly
+    cache = None
+    
     def __init__(self, company_name, transaction_date):
         self.company_name = company_name
         self.transaction_date = transaction_date
@@ -103,8 +106,22 @@ class LBOModel:
         """Set exit valuation multiple"""
         self.exit_multiple = exit_multiple
     
+    def _memo(self, name, inputs, compute):
+        """compute(), or the cached result for the same inputs"""
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(f'{type(self).__name__}.{name}', inputs, compute)
+    
     def build_sources_and_uses(self):
         """Create sources and uses of funds table"""
+        result = self._memo('build_sources_and_uses',
+                            (self.purchase_price, self.senior_debt, self.subordinated_debt),
+                            self._sources_and_uses)
+        self.equity_contribution = result['Sources'].loc['Equity Contribution', 'Amount']
+        return result
+    
+    def _sources_and_uses(self):
+        """build_sources_and_uses() without the cache"""
         uses = {
             'Purchase Equity': [self.purchase_price],
             'Transaction Fees': [self.purchase_price * 0.02],  # 2% fees
@@ -118,8 +135,6 @@ class LBOModel:
             'Equity Contribution': [total_uses - self.senior_debt - self.subordinated_debt]
         }
         
-        self.equity_contribution = sources['Equity Contribution'][0]
-        
         sources_df = pd.DataFrame(sources).T
         sources_df.columns = ['Amount']
         
@@ -134,6 +149,15 @@ class LBOModel:
     
     def build_operating_model(self):
         """Build financial projections"""
+        inputs = (self.entry_ebitda, self.ebitda_margin, tuple(self.revenue_growth_rates),
+                  self.da_pct_revenue, self.tax_rate, self.capex_pct_revenue, self.nwc_pct_revenue,
+                  self.senior_debt, self.subordinated_debt, self.senior_debt_rate,
+                  self.subordinated_debt_rate)
+        self.projections = self._memo('build_operating_model', inputs, self._operating_model)
+        return self.projections
+    
+    def _operating_model(self):
+        """build_operating_model() without the cache"""
         years = list(range(1, self.holding_period + 1))
         
         # Calculate base revenue from EBITDA and margin
@@ -198,7 +222,7 @@ class LBOModel:
         ]
         
         # Create projections DataFrame
-        self.projections = pd.DataFrame({
+        return pd.DataFrame({
             'Year': years,
             'Revenue': revenues,
             'EBITDA': ebitdas,
@@ -213,11 +237,15 @@ class LBOModel:
             'Less_NWC': nwc_changes,
             'FCF': fcfs
         })
-        
-        return self.projections
     
     def build_debt_schedule(self):
         """Build debt amortization schedule"""
+        inputs = (self.senior_debt, self.subordinated_debt, self.projections['FCF'].to_numpy())
+        self.debt_schedule = self._memo('build_debt_schedule', inputs, self._debt_schedule)
+        return self.debt_schedule
+    
+    def _debt_schedule(self):
+        """build_debt_schedule() without the cache"""
         years = list(range(1, self.holding_period + 1))
         
         senior_balances = [self.senior_debt]
@@ -248,17 +276,25 @@ class LBOModel:
             senior_balances.append(max(0, new_senior))
             sub_balances.append(sub_balances[-1])  # Sub debt stays constant
         
-        self.debt_schedule = pd.DataFrame({
+        return pd.DataFrame({
             'Year': [0] + years,
             'Senior_Debt': senior_balances,
             'Sub_Debt': sub_balances,
             'Total_Debt': [s + sub for s, sub in zip(senior_balances, sub_balances)]
         })
-        
-        return self.debt_schedule
     
     def calculate_returns(self):
         """Calculate IRR and MOIC"""
+        inputs = (self.purchase_price, self.entry_multiple, self.entry_ebitda, self.exit_multiple,
+                  self.equity_contribution, self.holding_period,
+                  self.projections['EBITDA'].iloc[-1], self.debt_schedule['Total_Debt'].iloc[-1])
+        returns = self._memo('calculate_returns', inputs, self._returns)
+        self.moic = returns['MOIC']
+        self.irr = returns['IRR']
+        return returns
+    
+    def _returns(self):
+        """calculate_returns() without the cache"""
         # Exit valuation
         exit_ebitda = self.projections['EBITDA'].iloc[-1]
         exit_enterprise_value = exit_ebitda * self.exit_multiple
@@ -270,10 +306,10 @@ class LBOModel:
         exit_equity_value = exit_enterprise_value - final_debt
         
         # MOIC
-        self.moic = exit_equity_value / self.equity_contribution
+        moic = exit_equity_value / self.equity_contribution
         
         # IRR (approximation)
-        self.irr = (self.moic ** (1 / self.holding_period)) - 1
+        irr = (moic ** (1 / self.holding_period)) - 1
         
         return {
             'Entry_EV': self.purchase_price,
@@ -285,8 +321,91 @@ class LBOModel:
             'Exit_Debt': final_debt,
             'Exit_Equity_Value': exit_equity_value,
             'Equity_Invested': self.equity_contribution,
-            'MOIC': self.moic,
-            'IRR': self.irr
+            'MOIC': moic,
+            'IRR': irr
+        }
+    
+    @classmethod
+    def returns_batch(cls, inputs, include_fees=False):
+        """
+        build_operating_model() + build_debt_schedule() + calculate_returns()
+        for many deals at once (loops over years, not deals)
+        
+        Parameters:
+        -----------
+        inputs : mapping of str -> array
+            One value per deal (e.g. a deal_book.DealBatch): entry_ebitda,
+            entry_multiple, senior_debt_multiple, sub_debt_multiple,
+            senior_rate, sub_rate, revenue_growth (n × years), ebitda_margin,
+            tax_rate, capex_pct, nwc_pct, da_pct, exit_multiple
+        include_fees : bool
+            Size equity from Sources & Uses (2% transaction + 3% financing
+            fees), as display_summary() does; otherwise price less debt
+        
+        Returns:
+        --------
+        dict
+            Arrays with the calculate_returns() keys; IRR is NaN when the
+            exit equity is negative
+        """
+        def column(name):
+            return np.asarray(inputs[name], dtype=np.float64)
+
+        growth = np.atleast_2d(column('revenue_growth'))
+        holding_period = growth.shape[1]
+        entry_ebitda = column('entry_ebitda')
+        margin = column('ebitda_margin')[:, None]
+        purchase_price = entry_ebitda * column('entry_multiple')
+        senior_debt = entry_ebitda * column('senior_debt_multiple')
+        sub_debt = entry_ebitda * column('sub_debt_multiple')
+        equity = purchase_price - senior_debt - sub_debt
+        if include_fees:
+            equity = equity + purchase_price * 0.02 + (senior_debt + sub_debt) * 0.03
+
+        # Operating model (interest on opening balances, as build_operating_model)
+        base_revenue = (entry_ebitda / margin[:, 0])[:, None]
+        revenues = base_revenue * np.cumprod(1 + growth, axis=1)
+        ebitdas = revenues * margin
+        da_values = revenues * column('da_pct')[:, None]
+        interest = (senior_debt * column('senior_rate') + sub_debt * column('sub_rate'))[:, None]
+        ebts = ebitdas - da_values - interest
+        taxes = np.where(ebts > 0, ebts * column('tax_rate')[:, None], 0.0)
+        capex = revenues * column('capex_pct')[:, None]
+        nwc = np.hstack([base_revenue, revenues]) * column('nwc_pct')[:, None]
+        fcfs = ebts - taxes + da_values - capex - np.diff(nwc, axis=1)
+
+        # Debt schedule: 5% mandatory senior amortization, then half of remaining cash
+        senior = senior_debt.copy()
+        for year in range(holding_period):
+            payment = np.minimum(senior_debt * 0.05, senior)
+            new_senior = senior - payment
+            remaining_cash = fcfs[:, year] - payment
+            optional = (remaining_cash > 0) & (new_senior > 0)
+            new_senior = np.where(optional, new_senior - np.minimum(remaining_cash * 0.5, new_senior),
+                                  new_senior)
+            senior = np.maximum(0, new_senior)
+
+        exit_ebitda = ebitdas[:, -1]
+        exit_multiple = column('exit_multiple')
+        exit_enterprise_value = exit_ebitda * exit_multiple
+        final_debt = senior + sub_debt
+        exit_equity_value = exit_enterprise_value - final_debt
+        moic = exit_equity_value / equity
+        with np.errstate(invalid='ignore'):
+            irr = moic ** (1 / holding_period) - 1
+
+        return {
+            'Entry_EV': purchase_price,
+            'Entry_Multiple': column('entry_multiple'),
+            'Entry_EBITDA': entry_ebitda,
+            'Exit_EV': exit_enterprise_value,
+            'Exit_Multiple': exit_multiple,
+            'Exit_EBITDA': exit_ebitda,
+            'Exit_Debt': final_debt,
+            'Exit_Equity_Value': exit_equity_value,
+            'Equity_Invested': equity,
+            'MOIC': moic,
+            'IRR': irr
         }
     
     def display_summary(self):
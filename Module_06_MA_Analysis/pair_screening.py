@@ -0,0 +1,304 @@
+"""
+Universe-Scale Acquirer / Target Pair Screening
+
+Module 06 analyzes one hand-picked deal. This screen evaluates every
+acquirer × target combination in a fundamentals table (e.g., 2,000 × 5,000 =
+10M pairs) for day-one EPS accretion, pro forma leverage and ownership.
+
+Cheap bounds prune pairs before the full computation:
+
+1. P/E ARBITRAGE (exact sign of day-one accretion):
+   A deal is accretive only if the target's earnings yield at the offer price
+   beats the acquirer's blended cost of consideration:
+       (NI_target + after-tax synergies) / Offer  >  stock% / (P/E acquirer)
+                                                    + cash% × rate × (1 - tax)
+   Targets are sorted by yield once, so each acquirer keeps a prefix.
+
+2. LEVERAGE CAP (separable in acquirer and target):
+       ND_a - cap × EBITDA_a  +  ND_t + new_debt_t - cap × EBITDA_t  <=  0
+
+3. RELATIVE SIZE: offer value <= max_relative_size × acquirer market cap
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterator, Optional
+
+
+class PairScreener:
+    """
+    Chunked, vectorized screen over all acquirer × target pairs.
+
+    Fundamentals tables need columns:
+    'ticker', 'net_income', 'shares', 'price', 'ebitda', 'net_debt'
+    (amounts and shares in millions, price per share).
+    """
+
+    def __init__(
+        self,
+        acquirers: pd.DataFrame,
+        targets: pd.DataFrame,
+        premium: float = 0.30,
+        stock_pct: float = 0.50,
+        interest_rate: float = 0.06,
+        tax_rate: float = 0.25,
+        synergy_pct_ebitda: float = 0.0,
+        leverage_cap: float = 4.0,
+        max_relative_size: float = 1.0
+    ):
+        """
+        Initialize the screener.
+
+        Parameters:
+        -----------
+        acquirers, targets : pd.DataFrame
+            Fundamentals tables (see class docstring)
+        premium : float
+            Offer premium over target share price
+        stock_pct : float
+            Share of consideration paid in acquirer stock (rest is new debt)
+        interest_rate : float
+            Pre-tax rate on acquisition debt
+        tax_rate : float
+            Tax rate for interest shield and synergies
+        synergy_pct_ebitda : float
+            Run-rate pre-tax synergies as % of target EBITDA
+        leverage_cap : float
+            Maximum pro forma Net Debt / EBITDA
+        max_relative_size : float
+            Maximum offer value as a multiple of acquirer market cap
+        """
+        # Accretion is only meaningful for profitable acquirers
+        self.acquirers = acquirers[acquirers['net_income'] > 0].reset_index(drop=True)
+        self.targets = targets.reset_index(drop=True)
+
+        self.premium = premium
+        self.stock_pct = stock_pct
+        self.interest_rate = interest_rate
+        self.tax_rate = tax_rate
+        self.synergy_pct_ebitda = synergy_pct_ebitda
+        self.leverage_cap = leverage_cap
+        self.max_relative_size = max_relative_size
+
+        self._prepare()
+
+    def _prepare(self):
+        """Precompute per-company terms for the bounds (sort targets by yield once)."""
+        a = self.acquirers
+        t = self.targets
+        s = self.stock_pct
+        after_tax_rate = self.interest_rate * (1 - self.tax_rate)
+
+        # Acquirer side
+        self.a_ni = a['net_income'].to_numpy(dtype=np.float64)
+        self.a_shares = a['shares'].to_numpy(dtype=np.float64)
+        self.a_price = a['price'].to_numpy(dtype=np.float64)
+        self.a_ebitda = a['ebitda'].to_numpy(dtype=np.float64)
+        self.a_net_debt = a['net_debt'].to_numpy(dtype=np.float64)
+        self.a_eps = self.a_ni / self.a_shares
+        self.a_market_cap = self.a_price * self.a_shares
+        self.a_required_yield = s * self.a_eps / self.a_price + (1 - s) * after_tax_rate
+        self.a_leverage_slack = self.a_net_debt - self.leverage_cap * self.a_ebitda
+
+        # Target side, sorted by earnings yield at the offer (highest first)
+        offer = t['price'].to_numpy(dtype=np.float64) * t['shares'].to_numpy() * (1 + self.premium)
+        synergies = self.synergy_pct_ebitda * t['ebitda'].to_numpy(dtype=np.float64)
+        earnings = t['net_income'].to_numpy(dtype=np.float64) + synergies * (1 - self.tax_rate)
+        yield_at_offer = earnings / offer
+
+        order = np.argsort(-yield_at_offer, kind='stable')
+        self.t_order = order
+        self.t_offer = offer[order]
+        self.t_earnings = earnings[order]
+        self.t_yield = yield_at_offer[order]
+        self.t_ebitda = t['ebitda'].to_numpy(dtype=np.float64)[order] + synergies[order]
+        self.t_net_debt = t['net_debt'].to_numpy(dtype=np.float64)[order]
+        self.t_new_debt = (1 - s) * self.t_offer
+        self.t_leverage_slack = (self.t_net_debt + self.t_new_debt
+                                 - self.leverage_cap * self.t_ebitda)
+        self.t_tickers = t['ticker'].to_numpy()[order]
+
+    def iter_screen(
+        self,
+        min_accretion: float = 0.0,
+        chunk_size: int = 256
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Screen all pairs chunk by chunk, yielding surviving pairs.
+
+        Parameters:
+        -----------
+        min_accretion : float
+            Minimum day-one EPS accretion (e.g., 0.02 for +2%)
+        chunk_size : int
+            Acquirers evaluated per vectorized block
+
+        Yields:
+        -------
+        pd.DataFrame
+            Surviving pairs in each acquirer chunk
+        """
+        n_targets = len(self.t_yield)
+        # Yields sorted descending -> ascending view for searchsorted
+        ascending_yield = self.t_yield[::-1]
+        a_tickers = self.acquirers['ticker'].to_numpy()
+
+        for lo in range(0, len(self.a_ni), chunk_size):
+            hi = min(lo + chunk_size, len(self.a_ni))
+            rows = np.arange(lo, hi)
+
+            # Bound 1: accretive targets form a prefix of the yield-sorted list
+            # (side='left' keeps targets exactly at breakeven, accretion = 0)
+            if min_accretion >= 0:
+                keep = n_targets - np.searchsorted(ascending_yield, self.a_required_yield[rows],
+                                                   side='left')
+            else:
+                keep = np.full(hi - lo, n_targets)
+            width = int(keep.max()) if len(keep) else 0
+            if width == 0:
+                continue
+
+            cols = np.arange(width)
+            mask = cols[None, :] < keep[:, None]
+
+            # Bound 2: leverage cap, Bound 3: relative size
+            mask &= (self.a_leverage_slack[rows, None] + self.t_leverage_slack[None, :width]) <= 0
+            mask &= self.t_offer[None, :width] <= self.max_relative_size * self.a_market_cap[rows, None]
+
+            ai, tj = np.nonzero(mask)
+            if len(ai) == 0:
+                continue
+            ai = rows[ai]
+
+            # Full computation on survivors only
+            new_shares = self.stock_pct * self.t_offer[tj] / self.a_price[ai]
+            after_tax_interest = self.t_new_debt[tj] * self.interest_rate * (1 - self.tax_rate)
+            proforma_ni = self.a_ni[ai] + self.t_earnings[tj] - after_tax_interest
+            proforma_shares = self.a_shares[ai] + new_shares
+            proforma_eps = proforma_ni / proforma_shares
+            accretion = proforma_eps / self.a_eps[ai] - 1
+
+            proforma_leverage = ((self.a_net_debt[ai] + self.t_net_debt[tj] + self.t_new_debt[tj])
+                                 / (self.a_ebitda[ai] + self.t_ebitda[tj]))
+            ownership = self.a_shares[ai] / proforma_shares
+
+            passed = accretion >= min_accretion
+            passed &= a_tickers[ai] != self.t_tickers[tj]
+            if not passed.any():
+                continue
+
+            yield pd.DataFrame({
+                'acquirer': a_tickers[ai][passed],
+                'target': self.t_tickers[tj][passed],
+                'offer_value': self.t_offer[tj][passed],
+                'proforma_eps': proforma_eps[passed],
+                'accretion': accretion[passed],
+                'proforma_leverage': proforma_leverage[passed],
+                'acquirer_ownership': ownership[passed]
+            })
+
+    def screen(
+        self,
+        min_accretion: float = 0.0,
+        top_n_per_acquirer: Optional[int] = None,
+        chunk_size: int = 256
+    ) -> pd.DataFrame:
+        """
+        Run the full screen and collect results.
+
+        Parameters:
+        -----------
+        min_accretion : float
+            Minimum day-one EPS accretion
+        top_n_per_acquirer : int, optional
+            Keep only the N most accretive targets per acquirer
+        chunk_size : int
+            Acquirers evaluated per vectorized block
+
+        Returns:
+        --------
+        pd.DataFrame
+            Surviving pairs sorted by accretion
+        """
+        frames = []
+        for chunk in self.iter_screen(min_accretion, chunk_size):
+            if top_n_per_acquirer is not None:
+                chunk = (chunk.sort_values('accretion', ascending=False)
+                         .groupby('acquirer', sort=False).head(top_n_per_acquirer))
+            frames.append(chunk)
+
+        if not frames:
+            return pd.DataFrame(columns=['acquirer', 'target', 'offer_value', 'proforma_eps',
+                                         'accretion', 'proforma_leverage', 'acquirer_ownership'])
+
+        results = pd.concat(frames, ignore_index=True)
+        return results.sort_values('accretion', ascending=False).reset_index(drop=True)
+
+
+def synthetic_fundamentals(n: int, prefix: str, seed: int = 0) -> pd.DataFrame:
+    """Random but realistic fundamentals table for demonstrations."""
+    rng = np.random.default_rng(seed)
+    revenue = rng.lognormal(np.log(2_000), 1.2, n)
+    ebitda = revenue * rng.uniform(0.08, 0.35, n)
+    net_income = ebitda * rng.uniform(0.25, 0.55, n) - rng.uniform(0, 0.05, n) * revenue
+    shares = rng.lognormal(np.log(200), 0.8, n)
+    pe = rng.lognormal(np.log(18), 0.35, n)
+    price = np.maximum(net_income, revenue * 0.01) * pe / shares
+
+    return pd.DataFrame({
+        'ticker': [f'{prefix}{i:05d}' for i in range(n)],
+        'net_income': net_income,
+        'shares': shares,
+        'price': price,
+        'ebitda': ebitda,
+        'net_debt': ebitda * rng.uniform(-0.5, 3.5, n)
+    })
+
+
+def example_pair_screening(n_acquirers: int = 2_000, n_targets: int = 5_000):
+    """Screen 10M acquirer × target pairs"""
+    import time
+
+    print("\n" + "="*80)
+    print("UNIVERSE PAIR SCREENING - ACCRETION / LEVERAGE / OWNERSHIP")
+    print("="*80)
+
+    acquirers = synthetic_fundamentals(n_acquirers, 'ACQ', seed=1)
+    # Near-zero earnings make any deal look hugely accretive - keep P/E <= 40x
+    acquirer_pe = acquirers['price'] * acquirers['shares'] / acquirers['net_income']
+    acquirers = acquirers[(acquirer_pe > 0) & (acquirer_pe <= 40)]
+    targets = synthetic_fundamentals(n_targets, 'TGT', seed=2)
+
+    screener = PairScreener(
+        acquirers, targets,
+        premium=0.30,
+        stock_pct=0.50,
+        interest_rate=0.06,
+        tax_rate=0.25,
+        synergy_pct_ebitda=0.05,
+        leverage_cap=4.0,
+        max_relative_size=0.5
+    )
+
+    start = time.perf_counter()
+    results = screener.screen(min_accretion=0.02)
+    elapsed = time.perf_counter() - start
+
+    total_pairs = len(screener.a_ni) * n_targets
+    print(f"\nAcquirers (P/E 0-40x):      {len(screener.a_ni):,}")
+    print(f"Targets:                    {n_targets:,}")
+    print(f"Pairs in Universe:          {total_pairs:,}")
+    print(f"Pairs Passing (≥2% accr.):  {len(results):,}")
+    print(f"Screen Time:                {elapsed:.2f}s")
+
+    print(f"\nTOP 10 PAIRS BY ACCRETION:")
+    display = results.head(10).copy()
+    display['accretion'] = (display['accretion'] * 100).round(1)
+    display['acquirer_ownership'] = (display['acquirer_ownership'] * 100).round(1)
+    print(display.round(2).to_string(index=False))
+
+    return results
+
+
+if __name__ == "__main__":
+    results = example_pair_screening()
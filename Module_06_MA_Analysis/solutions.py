@@ -430,29 +430,55 @@ def exercise_3_synergy_analysis():
     
     # NPV CALCULATION
     print("\n" + "="*80)
-    print("NPV OF SYNERGIES")
+    print("NPV OF SYNERGIES (PHASED)")
     print("="*80)
     
+    from synergy_phasing import DEFAULT_CATEGORIES, SynergyPhaseInEngine
+    
     # Assume EBITDA margin on revenue synergies
     ebitda_margin = 0.15
     revenue_synergy_ebitda = total_revenue_synergies * ebitda_margin
     
     total_annual_synergies = total_cost_synergies + revenue_synergy_ebitda
     
-    # Perpetuity value (synergies last forever)
+    # The perpetuity shortcut (annual synergies / WACC) assumes full run-rate
+    # from day 1, forever, pre-tax. Instead, each category ramps on its own
+    # curve, integration costs are spread over several years, everything is
+    # taxed and capture is uncertain (the 50% revenue haircut becomes the
+    # cross-sell capture rate).
     wacc = 0.10
-    pv_synergies = total_annual_synergies / wacc
-    
-    # Net of integration costs
-    npv_synergies = pv_synergies - total_integration_costs
+    perpetuity_npv = total_annual_synergies / wacc - total_integration_costs
+    
+    phased_inputs = {  # category: (run-rate synergy, one-time cost)
+        'Headcount': (headcount_synergy, severance_cost),
+        'Stores': (store_synergy, store_closure_cost),
+        'IT': (it_synergy, it_integration),
+        'Procurement': (procurement_synergy, 0.0),
+        'Cross-Sell': (total_revenue_synergies_gross * ebitda_margin, rebranding)
+    }
+    categories = [
+        {**category, 'run_rate': phased_inputs[category['category']][0],
+         'one_time_cost': phased_inputs[category['category']][1]}
+        for category in DEFAULT_CATEGORIES
+    ]
+    engine = SynergyPhaseInEngine(categories, years=10, wacc=wacc, tax_rate=0.25)
+    base = engine.base_case()
+    engine.simulate(n_paths=20_000)
+    npv = engine.results['npv']
+    npv_synergies = float(npv.mean())
     
     print(f"\nAnnual Cost Synergies:   ${total_cost_synergies:.1f}M")
     print(f"Annual Revenue Synergies (EBITDA): ${revenue_synergy_ebitda:.1f}M")
-    print(f"Total Annual Synergies:  ${total_annual_synergies:.1f}M")
-    print(f"\nPV of Perpetuity @ {wacc*100:.0f}%:  ${pv_synergies:.1f}M")
-    print(f"Less: Integration Costs: (${total_integration_costs:.1f}M)")
+    print(f"Total Annual Synergies:  ${total_annual_synergies:.1f}M (run-rate)")
+    
+    print(f"\nPHASE-IN (mean capture, no delay, $M):")
+    print(base[['Total_Synergies', 'Integration_Costs', 'After_Tax_Impact']].head(5)
+          .round(1).to_string())
+    
+    print(f"\nPerpetuity Shortcut @ {wacc*100:.0f}%: ${perpetuity_npv:.1f}M (pre-tax, full run-rate day 1)")
+    print(f"Phased NPV P5 - P95:      ${np.percentile(npv, 5):.1f}M - ${np.percentile(npv, 95):.1f}M")
     print(f"\n{'='*80}")
-    print(f"NET SYNERGY VALUE:       ${npv_synergies:.1f}M")
+    print(f"NET SYNERGY VALUE:       ${npv_synergies:.1f}M (after-tax, mean of {len(npv):,} paths)")
     print(f"{'='*80}")
     
     # What this means for valuation
@@ -469,6 +495,7 @@ def exercise_3_synergy_analysis():
         'cost_synergies': total_cost_synergies,
         'revenue_synergies': total_revenue_synergies,
         'integration_costs': total_integration_costs,
+        'perpetuity_npv': perpetuity_npv,
         'npv_synergies': npv_synergies
     }
 
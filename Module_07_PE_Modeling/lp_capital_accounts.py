@@ -0,0 +1,371 @@
+"""
+Multi-LP Capital Account Allocation Engine
+
+Real funds have hundreds of LPs on different terms: fee classes, side letters
+with reduced carry, fee offset percentages and post-investment-period fee
+step-downs. This engine allocates every fund-level event across all LPs at
+once as (n_quarters × n_lps) NumPy arrays and produces per-LP capital account
+statements that roll forward:
+
+    Ending = Beginning + Capital_Calls + Fee_Contributions - Management_Fees
+             - Net_Distributions + Allocated_Gain_Loss - Carry_Allocation
+
+Allocated_Gain_Loss is the LP's pro-rata share of the fund NAV change net of
+calls and distributions; Carry_Allocation is the carry charged to the LP in
+the quarter (paid plus the change in accrued carry), so each LP's capital
+reflects its own fee and carry terms.
+
+Waterfall (European / whole-fund, per LP, 100% GP catch-up):
+1. Return of contributed capital
+2. Preferred return at the hurdle rate (compounded quarterly on the capital
+   and pref still owed; nothing accrues once the pref has been paid)
+3. GP catch-up until GP holds `carry` of total profit
+4. Remaining profit split (1 - carry) / carry
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+
+class LPAllocationEngine:
+    """
+    Pro-rates calls, distributions, fees and carry across many LPs.
+
+    LP terms (one row per LP):
+    - 'lp'            : LP identifier
+    - 'commitment'    : commitment (millions)
+    - 'mgmt_fee'      : annual fee rate during the investment period
+    - 'step_down_fee' : annual fee rate after the investment period
+    - 'fee_offset'    : share of transaction fees credited against fees
+                        (unused credits carry forward)
+    - 'carry'         : carried interest rate (side letters may reduce it)
+    Missing term columns are filled with the fund defaults.
+    """
+
+    def __init__(
+        self,
+        lps: pd.DataFrame,
+        investment_period_quarters: int = 20,
+        hurdle_rate: float = 0.08,
+        mgmt_fee: float = 0.02,
+        step_down_fee: float = 0.015,
+        fee_offset: float = 0.80,
+        carry: float = 0.20
+    ):
+        """
+        Initialize the allocation engine.
+
+        Parameters:
+        -----------
+        lps : pd.DataFrame
+            LP terms table (see class docstring)
+        investment_period_quarters : int
+            Quarters in the investment period (fees on commitment)
+        hurdle_rate : float
+            Annual preferred return (e.g., 0.08 for 8%)
+        mgmt_fee, step_down_fee, fee_offset, carry : float
+            Fund default terms for LPs without an override
+        """
+        defaults = {
+            'mgmt_fee': mgmt_fee,
+            'step_down_fee': step_down_fee,
+            'fee_offset': fee_offset,
+            'carry': carry
+        }
+        lps = lps.copy()
+        for column, value in defaults.items():
+            if column not in lps.columns:
+                lps[column] = value
+            lps[column] = lps[column].fillna(value)
+
+        self.lps = lps.reset_index(drop=True)
+        self.investment_period_quarters = investment_period_quarters
+        self.hurdle_rate = hurdle_rate
+
+        commitment = self.lps['commitment'].to_numpy(dtype=np.float64)
+        self.share = commitment / commitment.sum()
+
+        # Allocation results (n_quarters × n_lps)
+        self.quarters = None
+        self.results: Dict[str, np.ndarray] = {}
+
+    def _carry_from_cumulative(
+        self,
+        cum_contrib: np.ndarray,
+        cum_dist: np.ndarray,
+        excess_over_hurdle: np.ndarray,
+        carry: np.ndarray
+    ) -> np.ndarray:
+        """
+        Cumulative carry under a 100% catch-up waterfall.
+
+        Everything above the hurdle goes to the GP until it has `carry` of
+        total profit; after that the split is (1 - carry) / carry, so the GP
+        total is the smaller of the two.
+        """
+        profit = np.maximum(cum_dist - cum_contrib, 0.0)
+        return np.minimum(excess_over_hurdle, carry * profit)
+
+    def _hurdle_waterfall(
+        self,
+        contributions: np.ndarray,
+        gross_dist: np.ndarray
+    ) -> tuple:
+        """
+        Capital plus pref still owed, and cumulative distributions above it.
+
+        The amount owed compounds at the hurdle rate and is floored at zero:
+        once a distribution clears it, the surplus counts towards the
+        catch-up and nothing keeps compounding in later quarters.
+
+        Returns:
+        --------
+        tuple
+            (owed, excess_over_hurdle), both (n_quarters × n_lps)
+        """
+        growth = (1 + self.hurdle_rate) ** 0.25
+        owed = np.empty_like(contributions)
+        excess = np.empty_like(contributions)
+        owed_t = np.zeros(contributions.shape[1])
+        excess_t = np.zeros(contributions.shape[1])
+        for t in range(len(contributions)):
+            due = owed_t * growth + contributions[t]
+            excess_t = excess_t + np.maximum(gross_dist[t] - due, 0.0)
+            owed_t = np.maximum(due - gross_dist[t], 0.0)
+            owed[t] = owed_t
+            excess[t] = excess_t
+        return owed, excess
+
+    def allocate(self, events: pd.DataFrame) -> 'LPAllocationEngine':
+        """
+        Allocate a quarterly fund-level event history across all LPs.
+
+        Parameters:
+        -----------
+        events : pd.DataFrame
+            One row per quarter (in order) with columns:
+            'quarter', 'call' (investment capital called), 'distribution'
+            (gross proceeds), 'transaction_fees' (deal fees earned by the GP),
+            'invested_capital' (cost of unrealized investments), 'nav' (fund NAV)
+
+        Returns:
+        --------
+        LPAllocationEngine
+            self, with per-LP allocation matrices populated
+
+        Notes:
+        ------
+        Carry_Paid can be negative: a later contribution (e.g. a fee or
+        follow-on call) lowers cumulative profit, and the GP's entitlement
+        falls with it. The negative amount is an implicit clawback returned
+        to the LP through Net_Distributions.
+        """
+        self.quarters = pd.Index(events['quarter'], name='quarter')
+        n_q = len(events)
+
+        call = events['call'].to_numpy(dtype=np.float64)[:, None]
+        dist = events['distribution'].to_numpy(dtype=np.float64)[:, None]
+        deal_fees = events['transaction_fees'].to_numpy(dtype=np.float64)[:, None]
+        invested = events['invested_capital'].to_numpy(dtype=np.float64)[:, None]
+        nav = events['nav'].to_numpy(dtype=np.float64)[:, None]
+
+        share = self.share[None, :]
+        commitment = self.lps['commitment'].to_numpy(dtype=np.float64)[None, :]
+        carry = self.lps['carry'].to_numpy(dtype=np.float64)[None, :]
+        offset = self.lps['fee_offset'].to_numpy(dtype=np.float64)[None, :]
+
+        # Management fees: commitment basis in the investment period,
+        # invested-capital basis at the step-down rate afterwards
+        in_period = (np.arange(n_q) < self.investment_period_quarters)[:, None]
+        fee_rate = np.where(in_period,
+                            self.lps['mgmt_fee'].to_numpy()[None, :],
+                            self.lps['step_down_fee'].to_numpy()[None, :])
+        fee_basis = np.where(in_period, commitment, invested * share)
+        gross_fees = fee_rate * fee_basis / 4
+
+        # Offset credits beyond the quarter's fee carry forward:
+        # cumulative fees paid = running max of (cumulative gross - cumulative credits)
+        credits = offset * deal_fees * share
+        excess = np.cumsum(gross_fees, axis=0) - np.cumsum(credits, axis=0)
+        paid_to_date = np.maximum.accumulate(np.maximum(excess, 0.0), axis=0)
+        fees = np.diff(paid_to_date, axis=0, prepend=0.0)
+
+        # Pro-rata capital calls and gross distributions
+        calls = call * share
+        gross_dist = dist * share
+        contributions = calls + fees
+
+        cum_contrib = np.cumsum(contributions, axis=0)
+        cum_dist = np.cumsum(gross_dist, axis=0)
+
+        owed, excess_over_hurdle = self._hurdle_waterfall(contributions, gross_dist)
+
+        cum_carry = self._carry_from_cumulative(cum_contrib, cum_dist, excess_over_hurdle, carry)
+        carry_paid = np.diff(cum_carry, axis=0, prepend=0.0)
+        net_dist = gross_dist - carry_paid
+
+        # Hypothetical liquidation at NAV: carry accrued on unrealized gains
+        nav_share = nav * share
+        liquidation_carry = self._carry_from_cumulative(
+            cum_contrib, cum_dist + nav_share,
+            excess_over_hurdle + np.maximum(nav_share - owed, 0.0), carry)
+        accrued_carry = liquidation_carry - cum_carry
+
+        # Investment gain / loss: NAV change not explained by calls and distributions
+        nav_change = np.diff(nav_share, axis=0, prepend=0.0)
+        gain_loss = nav_change - calls + gross_dist
+        carry_allocation = carry_paid + np.diff(accrued_carry, axis=0, prepend=0.0)
+
+        # Fees are paid in by the LP and booked straight out as a fund expense
+        fee_contributions = fees
+        ending_capital = np.cumsum(calls + fee_contributions - fees - net_dist
+                                   + gain_loss - carry_allocation, axis=0)
+        beginning_capital = np.vstack([np.zeros((1, nav_share.shape[1])), ending_capital[:-1]])
+
+        self.results = {
+            'Beginning_Capital': beginning_capital,
+            'Capital_Calls': calls,
+            'Fee_Contributions': fee_contributions,
+            'Management_Fees': fees,
+            'Fee_Offset': np.maximum(gross_fees - fees, 0.0),
+            'Gross_Distributions': gross_dist,
+            'Carry_Paid': carry_paid,
+            'Net_Distributions': net_dist,
+            'Allocated_Gain_Loss': gain_loss,
+            'Carry_Allocation': carry_allocation,
+            'Accrued_Carry': accrued_carry,
+            'Ending_Capital': ending_capital,
+            'Cumulative_Contributions': cum_contrib,
+            'Cumulative_Net_Distributions': np.cumsum(net_dist, axis=0)
+        }
+        return self
+
+    def capital_account_statements(self) -> pd.DataFrame:
+        """
+        All LP capital account statements in long format.
+
+        Returns:
+        --------
+        pd.DataFrame
+            MultiIndex (quarter, lp), one column per statement line
+        """
+        if not self.results:
+            raise RuntimeError("Call allocate() before building statements")
+
+        index = pd.MultiIndex.from_product([self.quarters, self.lps['lp']],
+                                           names=['quarter', 'lp'])
+        return pd.DataFrame({name: values.ravel() for name, values in self.results.items()},
+                            index=index)
+
+    def statement(self, lp) -> pd.DataFrame:
+        """Quarterly capital account statement for a single LP."""
+        matches = np.flatnonzero(self.lps['lp'].to_numpy() == lp)
+        if len(matches) == 0:
+            raise KeyError(f"Unknown LP: {lp!r}")
+        column = int(matches[0])
+        return pd.DataFrame({name: values[:, column] for name, values in self.results.items()},
+                            index=self.quarters)
+
+    def lp_summary(self) -> pd.DataFrame:
+        """
+        Inception-to-date summary per LP (latest quarter).
+
+        Returns:
+        --------
+        pd.DataFrame
+            Paid-in, net distributions, capital, fees, carry, DPI and TVPI per LP
+        """
+        paid_in = self.results['Cumulative_Contributions'][-1]
+        distributed = self.results['Cumulative_Net_Distributions'][-1]
+        capital = self.results['Ending_Capital'][-1]
+
+        return pd.DataFrame({
+            'Commitment': self.lps['commitment'].to_numpy(),
+            'Paid_In': paid_in,
+            'Net_Distributions': distributed,
+            'Ending_Capital': capital,
+            'Total_Fees': self.results['Management_Fees'].sum(axis=0),
+            'Carry_Paid': self.results['Carry_Paid'].sum(axis=0),
+            'Accrued_Carry': self.results['Accrued_Carry'][-1],
+            'Net_DPI': distributed / paid_in,
+            'Net_TVPI': (distributed + capital) / paid_in
+        }, index=pd.Index(self.lps['lp'], name='lp'))
+
+
+def example_lp_capital_accounts(n_lps: int = 500):
+    """Allocate 10 years of quarterly events across a 500-LP fund"""
+    import time
+
+    print("\n" + "="*80)
+    print("MULTI-LP CAPITAL ACCOUNT ALLOCATION")
+    print("="*80)
+
+    rng = np.random.default_rng(42)
+
+    # LP base: three fee classes plus the GP commitment on no fee / no carry
+    fee_class = rng.choice(['A', 'B', 'C'], n_lps - 1, p=[0.6, 0.3, 0.1])
+    class_fee = {'A': 0.02, 'B': 0.0175, 'C': 0.015}
+    lps = pd.DataFrame({
+        'lp': [f'LP{i:03d}' for i in range(1, n_lps)] + ['GP'],
+        'commitment': np.append(rng.lognormal(np.log(5), 1.0, n_lps - 1).round(1), 20.0),
+        'mgmt_fee': np.append([class_fee[c] for c in fee_class], 0.0),
+        'carry': np.append(np.where(fee_class == 'C', 0.15, 0.20), 0.0)
+    })
+    committed = lps['commitment'].sum()
+
+    # Fund-level quarterly history (40 quarters)
+    n_q = 40
+    q = np.arange(n_q)
+    call = np.where(q < 20, committed * 0.045, 0.0)
+    distribution = np.where(q >= 16, committed * 0.06 * np.exp(-(q - 28) ** 2 / 60), 0.0)
+    invested = np.maximum(np.cumsum(call) - np.cumsum(distribution) / 1.9, 0.0)
+    nav = invested * (1 + 0.03 * q)
+    events = pd.DataFrame({
+        'quarter': pd.period_range('2015Q1', periods=n_q, freq='Q'),
+        'call': call,
+        'distribution': distribution,
+        'transaction_fees': np.where(q < 20, committed * 0.001, 0.0),
+        'invested_capital': invested,
+        'nav': nav
+    })
+
+    engine = LPAllocationEngine(lps, investment_period_quarters=20)
+
+    start = time.perf_counter()
+    engine.allocate(events)
+    statements = engine.capital_account_statements()
+    summary = engine.lp_summary()
+    elapsed = time.perf_counter() - start
+
+    print(f"\nFund Size:                  €{committed:,.0f}M")
+    print(f"LPs:                        {n_lps}")
+    print(f"Quarters:                   {n_q}")
+    print(f"Statement Rows:             {len(statements):,}")
+    print(f"Allocation Time:            {elapsed*1000:.1f} ms")
+
+    print(f"\nSTATEMENT - {lps['lp'].iloc[0]} (last 4 quarters):")
+    print(engine.statement(lps['lp'].iloc[0]).tail(4).T.round(3).to_string())
+
+    print(f"\nNET TVPI BY FEE CLASS:")
+    summary['Class'] = np.append(fee_class, 'GP')
+    print(summary.groupby('Class')[['Net_DPI', 'Net_TVPI']].mean().round(2).to_string())
+
+    # Check: LP allocations add back to fund-level totals
+    total_calls = engine.results['Capital_Calls'].sum()
+    print(f"\nCalls allocated:            €{total_calls:,.1f}M (fund: €{call.sum():,.1f}M)")
+
+    # Check: rolled-forward capital equals each LP's NAV share less accrued carry
+    r = engine.results
+    liquidation_value = nav[:, None] * engine.share[None, :] - r['Accrued_Carry']
+    print(f"Roll-forward break:         {np.abs(r['Ending_Capital'] - liquidation_value).max():.1e}")
+
+    # Check: carry is only paid when cash is distributed
+    idle = distribution == 0
+    print(f"Carry in idle quarters:     €{np.abs(r['Carry_Paid'][idle]).sum():,.3f}M")
+
+    return engine
+
+
+if __name__ == "__main__":
+    engine = example_lp_capital_accounts()
@@ -0,0 +1,447 @@
+"""
+Public Market Equivalent (PME) Analysis
+
+Compares PE fund cash flows against a public benchmark index:
+- KS-PME (Kaplan-Schoar): market-adjusted TVPI, > 1.0 means fund beat the index
+- LN-PME (Long-Nickels): IRR of an index "shadow" investment with the same flows
+- Direct Alpha (Gredil-Griffiths-Stucke): annualized excess return over the index
+
+The benchmark is stored as a dense daily price array, so looking up the index
+level for any cash flow date is a single integer subtraction. All metrics are
+computed for thousands of funds at once with NumPy (no per-fund loops).
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+
+# =============================================================================
+# BENCHMARK INDEX
+# =============================================================================
+
+def load_index_series(
+    path: str,
+    price_column: Optional[str] = None
+) -> pd.Series:
+    """
+    Load a benchmark price history from a local CSV or Parquet file.
+
+    Works with files saved from yfinance, e.g. the ^GSPC download in
+    Module 03 `exercise_3_stock_analysis` (`sp500.to_csv('gspc.csv')`).
+
+    Parameters:
+    -----------
+    path : str
+        Path to .csv or .parquet file with a date column/index
+    price_column : str, optional
+        Price column to use (default: 'Adj Close' if present, else 'Close')
+
+    Returns:
+    --------
+    pd.Series
+        Prices indexed by date, sorted ascending
+    """
+    if str(path).endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, index_col=0)
+
+    # yfinance frames can carry (Price, Ticker) column levels
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    if price_column is None:
+        price_column = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
+
+    # Drop any extra header rows (yfinance CSVs include 'Ticker'/'Date' rows)
+    dates = pd.to_datetime(df.index, errors='coerce', format='mixed')
+    prices = pd.to_numeric(df[price_column], errors='coerce')
+    series = pd.Series(prices.values, index=dates).dropna()
+    series = series[series.index.notna()]
+
+    return series.sort_index()
+
+
+class BenchmarkIndex:
+    """
+    Benchmark price series with O(1) date lookups.
+
+    Prices are forward-filled onto a daily calendar once, so the level for any
+    date is `prices[date - start_date]` - fully vectorized over date arrays.
+    """
+
+    def __init__(self, prices: pd.Series, name: str = 'Benchmark'):
+        """
+        Initialize the benchmark index.
+
+        Parameters:
+        -----------
+        prices : pd.Series
+            Index levels indexed by date (trading days only is fine)
+        name : str
+            Display name (e.g., 'S&P 500')
+        """
+        self.name = name
+        prices = prices.sort_index()
+        calendar = pd.date_range(prices.index[0].normalize(),
+                                 prices.index[-1].normalize(), freq='D')
+
+        # Weekends / holidays take the last available close
+        self.start_day = calendar[0].to_datetime64().astype('datetime64[D]')
+        self.levels = prices.reindex(calendar, method='ffill').to_numpy(dtype=np.float64)
+
+    @classmethod
+    def from_file(cls, path: str, name: str = 'Benchmark',
+                  price_column: Optional[str] = None) -> 'BenchmarkIndex':
+        """Build a BenchmarkIndex from a CSV/Parquet file (see load_index_series)."""
+        return cls(load_index_series(path, price_column), name=name)
+
+    def lookup(self, dates) -> np.ndarray:
+        """
+        Index level on each date (vectorized).
+
+        Parameters:
+        -----------
+        dates : array-like of dates
+
+        Returns:
+        --------
+        np.ndarray
+            Index levels; raises if any date falls outside the history
+        """
+        days = np.asarray(pd.to_datetime(dates).values.astype('datetime64[D]'))
+        offsets = (days - self.start_day).astype(np.int64)
+
+        if offsets.min() < 0 or offsets.max() >= len(self.levels):
+            raise ValueError(f"Cash flow dates fall outside the {self.name} history")
+
+        return self.levels[offsets]
+
+
+# =============================================================================
+# VECTORIZED IRR
+# =============================================================================
+
+def _bracketed_xirr(
+    fund_idx: np.ndarray,
+    years: np.ndarray,
+    amounts: np.ndarray,
+    n_funds: int,
+    tol: float = 1e-12
+) -> np.ndarray:
+    """
+    XIRR by bisection: scan a rate grid for a sign change in NPV, then halve
+    the bracket. Slower than Newton but cannot diverge; NaN where NPV never
+    changes sign on (-99%, +10,000%). With several roots, the one nearest 0%.
+    """
+    # Grid is even in log(1 + rate), so it is dense around ordinary returns
+    grid = np.expm1(np.linspace(np.log(0.01), np.log(101.0), 121))
+    npv = np.empty((len(grid), n_funds))
+    for k, rate in enumerate(grid):
+        npv[k] = np.bincount(fund_idx, weights=amounts * (1 + rate) ** (-years), minlength=n_funds)
+
+    sign = np.sign(npv)
+    brackets = sign[:-1] * sign[1:] <= 0
+    found = brackets.any(axis=0)
+    # bracket nearest 0%: order candidates by |log(1 + rate)| of their midpoint
+    closeness = np.abs(np.log1p(grid[:-1]) + np.log1p(grid[1:]))
+    k = np.argmin(np.where(brackets, closeness[:, None], np.inf), axis=0)
+
+    funds = np.arange(n_funds)
+    lo, hi = grid[k], grid[k + 1]
+    f_lo = npv[k, funds]
+    while np.any(found & (hi - lo > tol)):
+        mid = (lo + hi) / 2
+        f_mid = np.bincount(fund_idx, weights=amounts * (1 + mid[fund_idx]) ** (-years),
+                            minlength=n_funds)
+        same_side = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(same_side, mid, lo)
+        f_lo = np.where(same_side, f_mid, f_lo)
+        hi = np.where(same_side, hi, mid)
+
+    return np.where(found, (lo + hi) / 2, np.nan)
+
+
+def vectorized_xirr(
+    fund_idx: np.ndarray,
+    years: np.ndarray,
+    amounts: np.ndarray,
+    n_funds: int,
+    max_iter: int = 100,
+    tol: float = 1e-7
+) -> np.ndarray:
+    """
+    Solve XIRR for many funds at once.
+
+    Newton's method runs for every fund together; funds it does not solve
+    (divergence, a flat NPV, oscillation) are re-solved by bisection on a
+    bracketed sign change, so NaN means no IRR exists in (-99%, +10,000%).
+    This is the shared IRR solver for the Module 07 engines.
+
+    Parameters:
+    -----------
+    fund_idx : np.ndarray
+        Fund index (0..n_funds-1) of each cash flow
+    years : np.ndarray
+        Time of each cash flow in years (any common origin per fund)
+    amounts : np.ndarray
+        Cash flow amounts (negative = paid in, positive = received)
+    n_funds : int
+        Number of funds
+    max_iter : int
+        Maximum Newton iterations
+    tol : float
+        Convergence tolerance on NPV relative to total flows
+
+    Returns:
+    --------
+    np.ndarray
+        Annual IRR per fund (NaN where no solution exists)
+    """
+    fund_idx = np.asarray(fund_idx, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+
+    # Measure time from each fund's first flow: with t >= 0 the discount
+    # factors stay bounded as Newton moves the rate up
+    first = np.full(n_funds, np.inf)
+    np.minimum.at(first, fund_idx, years)
+    years = years - first[fund_idx]
+
+    scale = np.bincount(fund_idx, weights=np.abs(amounts), minlength=n_funds)
+    scale[scale == 0] = 1.0
+
+    def npv_at(rate):
+        return np.bincount(fund_idx, weights=amounts * (1 + rate[fund_idx]) ** (-years),
+                           minlength=n_funds)
+
+    rate = np.full(n_funds, 0.10)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for _ in range(max_iter):
+            base = 1 + rate[fund_idx]
+            pv = amounts * base ** (-years)
+            npv = np.bincount(fund_idx, weights=pv, minlength=n_funds)
+            if np.all(np.abs(npv) / scale < tol):
+                break
+            slope = np.bincount(fund_idx, weights=-years * pv / base, minlength=n_funds)
+            step = np.divide(npv, slope, out=np.zeros(n_funds), where=slope != 0)
+            rate = np.clip(rate - step, -0.99, 10.0)
+        npv = npv_at(rate)
+
+    # IRR only exists when a fund has both inflows and outflows
+    has_neg = np.bincount(fund_idx, weights=(amounts < 0), minlength=n_funds) > 0
+    has_pos = np.bincount(fund_idx, weights=(amounts > 0), minlength=n_funds) > 0
+    solvable = has_neg & has_pos
+    unsolved = solvable & ~(np.abs(npv) / scale < 1e-4)
+
+    if unsolved.any():
+        keep = unsolved[fund_idx]
+        local = np.cumsum(unsolved) - 1
+        with np.errstate(over='ignore', invalid='ignore'):
+            rate[unsolved] = _bracketed_xirr(local[fund_idx[keep]], years[keep], amounts[keep],
+                                             int(unsolved.sum()))
+
+    return np.where(solvable, rate, np.nan)
+
+
+# =============================================================================
+# PME ENGINE
+# =============================================================================
+
+class PMEAnalyzer:
+    """
+    PME analytics for a book of PE funds against one benchmark index.
+
+    Cash flows use the LP sign convention from Module 07:
+    capital calls are negative, distributions are positive.
+    """
+
+    def __init__(self, benchmark: BenchmarkIndex):
+        """
+        Parameters:
+        -----------
+        benchmark : BenchmarkIndex
+            Public market index to compare against
+        """
+        self.benchmark = benchmark
+
+    def calculate(
+        self,
+        cash_flows: pd.DataFrame,
+        navs: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Calculate IRR, TVPI, KS-PME, LN-PME and Direct Alpha for every fund.
+
+        Parameters:
+        -----------
+        cash_flows : pd.DataFrame
+            Columns 'fund', 'date', 'amount' (calls < 0, distributions > 0)
+        navs : pd.DataFrame
+            Columns 'fund', 'date', 'nav' - one valuation per fund
+
+        Returns:
+        --------
+        pd.DataFrame
+            One row per fund indexed by fund id
+        """
+        fund_ids, fund_idx = np.unique(cash_flows['fund'].to_numpy(), return_inverse=True)
+        n_funds = len(fund_ids)
+
+        navs = navs.set_index('fund').reindex(fund_ids)
+        if navs['nav'].isna().any():
+            raise ValueError("Every fund with cash flows needs a NAV row")
+
+        amounts = cash_flows['amount'].to_numpy(dtype=np.float64)
+        flow_dates = pd.to_datetime(cash_flows['date']).values.astype('datetime64[D]')
+        nav_dates = pd.to_datetime(navs['date']).values.astype('datetime64[D]')
+        nav = navs['nav'].to_numpy(dtype=np.float64)
+
+        # Index levels on flow dates and each fund's valuation date
+        index_at_flow = self.benchmark.lookup(flow_dates)
+        index_at_nav = self.benchmark.lookup(nav_dates)
+        growth_to_nav = index_at_nav[fund_idx] / index_at_flow
+
+        # Time of each flow in years relative to the fund's valuation date (<= 0)
+        years = (flow_dates - nav_dates[fund_idx]).astype(np.float64) / 365.25
+
+        calls = np.where(amounts < 0, -amounts, 0.0)
+        dists = np.where(amounts > 0, amounts, 0.0)
+
+        paid_in = np.bincount(fund_idx, weights=calls, minlength=n_funds)
+        distributed = np.bincount(fund_idx, weights=dists, minlength=n_funds)
+
+        # KS-PME: market-adjusted distributions + NAV over market-adjusted calls
+        fv_calls = np.bincount(fund_idx, weights=calls * growth_to_nav, minlength=n_funds)
+        fv_dists = np.bincount(fund_idx, weights=dists * growth_to_nav, minlength=n_funds)
+        ks_pme = (fv_dists + nav) / fv_calls
+
+        # Terminal NAV appended as a final flow at t = 0 for each fund
+        all_idx = np.concatenate([fund_idx, np.arange(n_funds)])
+        all_years = np.concatenate([years, np.zeros(n_funds)])
+
+        # Fund IRR
+        irr = vectorized_xirr(all_idx, all_years,
+                              np.concatenate([amounts, nav]), n_funds)
+
+        # LN-PME: replace fund NAV with the index "shadow" NAV
+        # (NaN when strong funds drive the shadow NAV deeply negative)
+        pme_nav = fv_calls - fv_dists
+        ln_pme_irr = vectorized_xirr(all_idx, all_years,
+                                     np.concatenate([amounts, pme_nav]), n_funds)
+
+        # Direct Alpha: IRR of index-compounded flows, continuous rate
+        compounded = np.concatenate([amounts * growth_to_nav, nav])
+        alpha_discrete = vectorized_xirr(all_idx, all_years, compounded, n_funds)
+        direct_alpha = np.log1p(alpha_discrete)
+
+        results = pd.DataFrame({
+            'Paid_In': paid_in,
+            'Distributed': distributed,
+            'NAV': nav,
+            'TVPI': (distributed + nav) / paid_in,
+            'IRR': irr,
+            'KS_PME': ks_pme,
+            'LN_PME_IRR': ln_pme_irr,
+            'IRR_Spread_vs_LN': irr - ln_pme_irr,
+            'Shadow_NAV': pme_nav,
+            'Direct_Alpha': direct_alpha
+        }, index=pd.Index(fund_ids, name='fund'))
+
+        return results
+
+    def summary(self, results: pd.DataFrame) -> Dict[str, float]:
+        """
+        Book-level summary of PME results.
+
+        Medians are over funds with a solution; the 'unsolved_*' counts are
+        funds whose rate has no root (e.g. an LN-PME shadow NAV so negative
+        that the flows never break even), so they are not silently dropped.
+
+        Returns:
+        --------
+        dict
+            Fund count, % beating the index, median metrics and unsolved counts
+        """
+        return {
+            'funds': len(results),
+            'unsolved_irr': int(results['IRR'].isna().sum()),
+            'unsolved_ln_pme_irr': int(results['LN_PME_IRR'].isna().sum()),
+            'unsolved_direct_alpha': int(results['Direct_Alpha'].isna().sum()),
+            'pct_beating_index': float((results['KS_PME'] > 1.0).mean()),
+            'median_ks_pme': float(results['KS_PME'].median()),
+            'median_irr': float(results['IRR'].median()),
+            'median_ln_pme_irr': float(results['LN_PME_IRR'].median()),
+            'median_direct_alpha': float(results['Direct_Alpha'].median())
+        }
+
+
+def example_pme_analysis(index_path: Optional[str] = None, n_funds: int = 2_000):
+    """
+    PME for a book of synthetic funds.
+
+    Pass `index_path` to use a real benchmark file (e.g., ^GSPC history saved
+    from Module 03); otherwise a simulated index is used.
+    """
+    print("\n" + "="*80)
+    print("PUBLIC MARKET EQUIVALENT (PME) ANALYSIS")
+    print("="*80)
+
+    rng = np.random.default_rng(42)
+
+    if index_path is not None:
+        benchmark = BenchmarkIndex.from_file(index_path, name='S&P 500')
+        history = load_index_series(index_path)
+        start, end = history.index[0], history.index[-1]
+    else:
+        # Simulated index: 10% drift, 16% vol, business days
+        dates = pd.bdate_range('2010-01-01', '2024-12-31')
+        log_returns = rng.normal(0.10 / 252, 0.16 / np.sqrt(252), len(dates))
+        prices = pd.Series(1000 * np.exp(np.cumsum(log_returns)), index=dates)
+        benchmark = BenchmarkIndex(prices, name='Simulated Index')
+        start, end = dates[0], dates[-1]
+
+    # Each fund: 8 quarterly calls, then 8 distributions, valued at the end
+    span_days = (end - start).days
+    fund_start = start + pd.to_timedelta(rng.integers(0, span_days // 3, n_funds), unit='D')
+    quarters = np.arange(16)
+
+    fund_ids = np.repeat(np.arange(n_funds), len(quarters))
+    flow_dates = np.repeat(fund_start.values, len(quarters)) + \
+        np.tile(quarters * np.timedelta64(91, 'D'), n_funds)
+    commitment = np.repeat(rng.uniform(50, 500, n_funds), len(quarters))
+    multiple = np.repeat(rng.lognormal(np.log(1.6), 0.35, n_funds), len(quarters))
+    is_call = np.tile(quarters < 8, n_funds)
+    amounts = np.where(is_call, -commitment / 8, commitment * multiple * 0.6 / 8)
+
+    cash_flows = pd.DataFrame({'fund': fund_ids, 'date': flow_dates, 'amount': amounts})
+    navs = pd.DataFrame({
+        'fund': np.arange(n_funds),
+        'date': np.full(n_funds, np.datetime64(end.date())),
+        'nav': commitment[::len(quarters)] * multiple[::len(quarters)] * 0.4
+    })
+
+    analyzer = PMEAnalyzer(benchmark)
+    results = analyzer.calculate(cash_flows, navs)
+    summary = analyzer.summary(results)
+
+    print(f"\nBENCHMARK:                  {benchmark.name}")
+    print(f"Funds Analyzed:             {summary['funds']:,}")
+    print(f"\nSAMPLE FUNDS:")
+    print(results.head(5)[['TVPI', 'IRR', 'KS_PME', 'LN_PME_IRR', 'Direct_Alpha']].round(3).to_string())
+
+    print(f"\nBOOK SUMMARY:")
+    print(f"  % Beating Index (KS>1):   {summary['pct_beating_index']*100:.1f}%")
+    print(f"  Median KS-PME:            {summary['median_ks_pme']:.2f}x")
+    print(f"  Median Fund IRR:          {summary['median_irr']*100:.1f}%")
+    print(f"  Median LN-PME IRR:        {summary['median_ln_pme_irr']*100:.1f}%")
+    print(f"  Median Direct Alpha:      {summary['median_direct_alpha']*100:.1f}%")
+    print(f"  No solution (IRR / LN-PME / Alpha): {summary['unsolved_irr']} / "
+          f"{summary['unsolved_ln_pme_irr']} / {summary['unsolved_direct_alpha']} funds")
+
+    return results
+
+
+if __name__ == "__main__":
+    results = example_pme_analysis()
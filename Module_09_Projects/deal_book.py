@@ -0,0 +1,445 @@
+"""
+Streaming Deal Book Loader
+
+Every model in the course is configured by hand - one DCFModel or LBOModel
+object, one setter call per assumption. A deal book (one row of assumptions
+per deal, kept in Excel or CSV) of 100k rows does not fit that pattern: it
+would mean 100k model objects and a Python loop over each. This loader:
+
+- Reads CSV (pandas chunks), Excel (openpyxl read-only row streaming) or
+  Parquet (record batches) without loading the whole book
+- Maps the file's columns onto a model's inputs (headers are normalized -
+  'Entry EBITDA' -> entry_ebitda - and can be renamed explicitly)
+- Yields DealBatch objects: one typed numpy array per input, per-year inputs
+  (revenue_growth_1 ... revenue_growth_5) as one (n x years) array
+- Rejects rows with missing / non-numeric required inputs, recording the
+  file row number and the offending columns; skips blank rows and counts
+  optional inputs that fell back to their default
+
+Batches go straight to the models' bulk entry points:
+
+    'dcf'     DCFModel.value_batch(batch)                 (Module 04)
+    'lbo'     LBOModel.returns_batch(batch)               (Module 05)
+    'lbo_mc'  LBOModelMonteCarlo.base_case_batch(batch)   (this module)
+
+Usage:
+    loader = DealBookLoader('lbo_mc', columns={'Target': 'deal_id'})
+    for batch in loader.batches('deal_book.xlsx'):
+        results = LBOModelMonteCarlo.base_case_batch(batch)
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Model inputs: name -> default (None = required). Per-year inputs are listed in
+# SERIES and read from '<name>_1', '<name>_2', ... columns (or one '<name>'
+# column applied to every year).
+DEAL_SCHEMAS = {
+    'dcf': {
+        'base_revenue': None,
+        'revenue_growth': None,
+        'ebitda_margin': None,
+        'tax_rate': 0.25,
+        'da_pct_revenue': 0.03,
+        'capex_pct_revenue': 0.04,
+        'nwc_pct_revenue': 0.10,
+        'risk_free_rate': 0.04,
+        'equity_risk_premium': 0.06,
+        'beta': 1.0,
+        'cost_of_debt': 0.05,
+        'mv_equity': None,
+        'mv_debt': 0.0,
+        'terminal_growth_rate': 0.025,
+        'terminal_ebitda_multiple': 10.0,
+        'cash': 0.0,
+        'debt': 0.0,
+        'minority_interest': 0.0,
+        'investments': 0.0,
+        'shares_outstanding': 1.0
+    },
+    'lbo': {
+        'entry_ebitda': None,
+        'entry_multiple': None,
+        'senior_debt_multiple': None,
+        'sub_debt_multiple': 0.0,
+        'senior_rate': 0.06,
+        'sub_rate': 0.10,
+        'revenue_growth': None,
+        'ebitda_margin': None,
+        'tax_rate': 0.25,
+        'capex_pct': 0.03,
+        'nwc_pct': 0.10,
+        'da_pct': 0.025,
+        'exit_multiple': None
+    },
+    'lbo_mc': {
+        'entry_ebitda': None,
+        'entry_multiple': None,
+        'senior_debt': None,
+        'mezz_debt': 0.0,
+        'equity': None,
+        'holding_period': 5.0,
+        'revenue_growth': 0.08,
+        'ebitda_margin': 0.30,
+        'exit_multiple': 11.0,
+        'debt_paydown_pct': 0.50
+    }
+}
+SERIES = {'dcf': {'revenue_growth'}, 'lbo': {'revenue_growth'}, 'lbo_mc': set()}
+ID_COLUMN = 'deal_id'
+
+
+def normalize_header(name) -> str:
+    """'Entry EBITDA ($M)' -> 'entry_ebitda_m'"""
+    return re.sub(r'[^0-9a-z]+', '_', str(name).strip().lower()).strip('_')
+
+
+class DealBatch:
+    """
+    Typed, columnar slice of a deal book.
+
+    Behaves as a read-only mapping of input name -> numpy array, so it can be
+    passed wherever a model's batch method expects `inputs[name]`.
+    """
+
+    def __init__(self, ids: np.ndarray, data: Dict[str, np.ndarray], rows: np.ndarray):
+        self.ids = ids
+        self.data = data
+        self.rows = rows                    # file row numbers (1 = header)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.data[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.data
+
+    def keys(self):
+        return self.data.keys()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Inputs as a DataFrame (per-year inputs expanded to _1.._n columns)"""
+        columns = {}
+        for name, values in self.data.items():
+            if values.ndim == 2:
+                for year in range(values.shape[1]):
+                    columns[f'{name}_{year + 1}'] = values[:, year]
+            else:
+                columns[name] = values
+        return pd.DataFrame(columns, index=pd.Index(self.ids, name=ID_COLUMN))
+
+
+class DealBookLoader:
+    """Stream a deal book into DealBatch objects for one model type"""
+
+    def __init__(
+        self,
+        model: str,
+        columns: Optional[Dict[str, str]] = None,
+        batch_size: int = 10_000,
+        years: int = 5,
+        sheet_name: Optional[str] = None,
+        max_reported_rejects: int = 100
+    ):
+        """
+        Parameters:
+        -----------
+        model : str
+            'dcf', 'lbo' or 'lbo_mc' (see DEAL_SCHEMAS)
+        columns : dict, optional
+            File header -> input name, for headers that do not normalize to
+            the input name (e.g. {'Target': 'deal_id', 'EV/EBITDA': 'entry_multiple'})
+        batch_size : int
+            Deals per batch
+        years : int
+            Projection years when a per-year input comes as a single column
+        sheet_name : str, optional
+            Workbook sheet (default: the first one)
+        max_reported_rejects : int
+            Rejected rows kept in `rejects` (all are counted in stats)
+        """
+        if model not in DEAL_SCHEMAS:
+            raise ValueError(f"Unknown model {model!r}; expected one of {list(DEAL_SCHEMAS)}")
+        self.model = model
+        self.schema = DEAL_SCHEMAS[model]
+        self.series = SERIES[model]
+        self.columns = {normalize_header(k): v for k, v in (columns or {}).items()}
+        self.batch_size = batch_size
+        self.years = years
+        self.sheet_name = sheet_name
+        self.max_reported_rejects = max_reported_rejects
+
+        self.rejects: List[Dict] = []
+        self.defaulted: Dict[str, int] = {}  # input -> rows left blank and given the default
+        self.stats = {'rows': 0, 'deals': 0, 'rejected': 0, 'blank': 0, 'batches': 0}
+        self._layout = None
+
+    def _plan(self, header: List) -> Dict:
+        """Map file columns (by position) onto inputs; fails fast on missing required inputs"""
+        names = [self.columns.get(normalize_header(h), normalize_header(h)) for h in header]
+        layout = {'id': None, 'scalar': {}, 'series': {}}
+        for position, name in enumerate(names):
+            match = re.fullmatch(r'(.+?)_(?:y|year_?)?(\d+)', name)
+            if name == ID_COLUMN:
+                layout['id'] = position
+            elif name in self.schema:
+                layout['scalar'][name] = position
+            elif match and match.group(1) in self.series:
+                layout['series'].setdefault(match.group(1), {})[int(match.group(2))] = position
+
+        for name, years in layout['series'].items():
+            layout['series'][name] = [years[y] for y in sorted(years)]
+        missing = [name for name, default in self.schema.items() if default is None
+                   and name not in layout['scalar'] and name not in layout['series']]
+        if missing:
+            raise ValueError(f"Deal book has no column for required inputs: {missing}")
+        return layout
+
+    def _batch(self, frame: pd.DataFrame, rows: np.ndarray) -> DealBatch:
+        """Type one chunk (columns by file position, `rows` = file row numbers) and drop invalid rows"""
+        layout = self._layout
+        n = len(frame)
+        valid = np.ones(n, dtype=bool)
+        bad = {}
+
+        def numeric(position):
+            return pd.to_numeric(frame.iloc[:, position], errors='coerce').to_numpy(dtype=np.float64)
+
+        data = {}
+        for name, default in self.schema.items():
+            if name in layout['series']:
+                values = np.column_stack([numeric(p) for p in layout['series'][name]])
+            elif name in layout['scalar']:
+                values = numeric(layout['scalar'][name])
+                if default is not None:
+                    blank = np.isnan(values)
+                    if blank.any():
+                        self.defaulted[name] = self.defaulted.get(name, 0) + int(blank.sum())
+                        values = np.where(blank, default, values)
+                if name in self.series:
+                    values = np.repeat(values[:, None], self.years, axis=1)
+            else:
+                shape = (n, self.years) if name in self.series else (n,)
+                values = np.full(shape, default, dtype=np.float64)
+
+            missing = np.isnan(values) if values.ndim == 1 else np.isnan(values).any(axis=1)
+            if missing.any():
+                bad[name] = missing
+                valid &= ~missing
+            data[name] = values
+
+        ids = frame.iloc[:, layout['id']].to_numpy(dtype=object) if layout['id'] is not None \
+            else rows.astype(object)
+
+        n_bad = int((~valid).sum())
+        if n_bad:
+            self.stats['rejected'] += n_bad
+            for i in np.flatnonzero(~valid)[:max(0, self.max_reported_rejects - len(self.rejects))]:
+                self.rejects.append({'row': int(rows[i]), 'deal_id': ids[i],
+                                     'invalid': [name for name, mask in bad.items() if mask[i]]})
+            data = {name: values[valid] for name, values in data.items()}
+            ids, rows = ids[valid], rows[valid]
+
+        self.stats['rows'] += n
+        self.stats['deals'] += len(ids)
+        self.stats['batches'] += 1
+        return DealBatch(ids, data, rows)
+
+    def _chunks(self, path: Path) -> Iterator[pd.DataFrame]:
+        """Raw chunks of at most batch_size rows (blank rows included), in file order; sets self._layout"""
+        suffix = path.suffix.lower()
+        if suffix in ('.xlsx', '.xlsm'):
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(path, read_only=True, data_only=True)
+            try:
+                sheet = workbook[self.sheet_name] if self.sheet_name else workbook.worksheets[0]
+                rows = sheet.iter_rows(values_only=True)
+                header = list(next(rows, ()))
+                self._layout = self._plan(header)
+                batch = []
+                for row in rows:
+                    batch.append(row)
+                    if len(batch) == self.batch_size:
+                        yield pd.DataFrame(batch)
+                        batch = []
+                if batch:
+                    yield pd.DataFrame(batch)
+            finally:
+                workbook.close()
+        elif suffix == '.parquet':
+            import pyarrow.parquet as pq
+
+            parquet = pq.ParquetFile(path)
+            self._layout = self._plan(parquet.schema_arrow.names)
+            for batch in parquet.iter_batches(batch_size=self.batch_size):
+                frame = batch.to_pandas()
+                frame.columns = range(frame.shape[1])
+                yield frame
+        else:
+            reader = pd.read_csv(path, chunksize=self.batch_size, header=None, skiprows=1,
+                                 skip_blank_lines=False)
+            self._layout = self._plan(list(pd.read_csv(path, nrows=0).columns))
+            yield from reader
+
+    def batches(self, path: Union[str, Path]) -> Iterator[DealBatch]:
+        """
+        Stream a deal book (.csv, .xlsx or .parquet) as DealBatch objects.
+
+        Yields:
+        -------
+        DealBatch
+            Valid deals of each chunk (rejected rows are in `rejects`)
+        """
+        first_row = 2
+        for frame in self._chunks(Path(path)):
+            rows = np.arange(first_row, first_row + len(frame))
+            first_row += len(frame)
+            # Drop blank rows here so every kept row keeps its own file row number
+            blank = frame.isna().all(axis=1).to_numpy()
+            if blank.any():
+                self.stats['blank'] += int(blank.sum())
+                frame, rows = frame[~blank], rows[~blank]
+            if len(frame):
+                yield self._batch(frame, rows)
+
+    def load(self, path: Union[str, Path]) -> DealBatch:
+        """Whole deal book as a single batch (for books that fit in memory)"""
+        parts = list(self.batches(path))
+        if not parts:
+            return DealBatch(np.array([], dtype=object), {}, np.array([], dtype=np.int64))
+        return DealBatch(np.concatenate([p.ids for p in parts]),
+                         {name: np.concatenate([p.data[name] for p in parts])
+                          for name in parts[0].data},
+                         np.concatenate([p.rows for p in parts]))
+
+
+def write_synthetic_deal_book(path: Union[str, Path], n_deals: int = 100_000, seed: int = 42) -> int:
+    """
+    Write an 'lbo_mc' deal book with analyst-style headers, a few bad rows and
+    (in Excel) a few blank rows.
+
+    Returns the number of deals written (bad rows included).
+    """
+    rng = np.random.default_rng(seed)
+    path = Path(path)
+    entry_ebitda = np.round(rng.lognormal(np.log(80), 0.7, n_deals), 1)
+    entry_multiple = np.round(rng.uniform(7.0, 13.0, n_deals), 1)
+    entry_ev = entry_ebitda * entry_multiple
+    debt = entry_ev * rng.uniform(0.45, 0.65, n_deals)
+    book = pd.DataFrame({
+        'Target': [f'DEAL-{i:06d}' for i in range(n_deals)],
+        'Entry EBITDA': entry_ebitda,
+        'EV/EBITDA': entry_multiple,
+        'Senior Debt': np.round(debt * 0.75, 1),
+        'Mezz Debt': np.round(debt * 0.25, 1),
+        'Equity': np.round(entry_ev - debt, 1),
+        'Holding Period': rng.choice([4, 5, 6], n_deals),
+        'Revenue Growth': np.round(rng.normal(0.07, 0.03, n_deals), 4),
+        'Exit Multiple': np.round(entry_multiple + rng.normal(0, 1.0, n_deals), 1),
+        'Debt Paydown %': np.round(rng.uniform(0.3, 0.7, n_deals), 3)
+    })
+    # Typical data-entry problems: blanks and text in numeric cells
+    book['Entry EBITDA'] = book['Entry EBITDA'].astype(object)
+    book.loc[book.index[::25_000], 'Entry EBITDA'] = 'n/a'
+    book.loc[book.index[7::40_000], 'Equity'] = np.nan
+    book.loc[book.index[3::50_000], 'Exit Multiple'] = np.nan        # optional: defaults to 11.0x
+
+    if path.suffix == '.xlsx':
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Deals')
+        sheet.append(list(book.columns))
+        for i, row in enumerate(book.astype(object).where(book.notna(), None)
+                                .itertuples(index=False, name=None)):
+            sheet.append(row)
+            if i % 5_000 == 3:
+                sheet.append([])  # spacer rows left in by analysts
+        workbook.save(path)
+    else:
+        book.to_csv(path, index=False)
+    return n_deals
+
+
+def example_deal_book():
+    """Stream a 100k-deal book through LBOModelMonteCarlo.base_case_batch"""
+    import shutil
+    import tempfile
+    import time
+    import tracemalloc
+
+    from solutions import LBOModelMonteCarlo
+
+    print("\n" + "="*80)
+    print("STREAMING DEAL BOOK LOADER")
+    print("="*80)
+
+    workdir = Path(tempfile.mkdtemp(prefix='deal_book_'))
+    csv_path = workdir / 'deal_book.csv'
+    xlsx_path = workdir / 'deal_book.xlsx'
+    n_deals = write_synthetic_deal_book(csv_path, 100_000)
+    write_synthetic_deal_book(xlsx_path, 20_000)
+    columns = {'Target': 'deal_id', 'EV/EBITDA': 'entry_multiple', 'Debt Paydown %': 'debt_paydown_pct'}
+
+    # CSV: stream, value each batch, keep only the results
+    loader = DealBookLoader('lbo_mc', columns=columns, batch_size=20_000)
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = []
+    for batch in loader.batches(csv_path):
+        returns = LBOModelMonteCarlo.base_case_batch(batch)
+        returns.insert(0, 'deal_id', batch.ids)
+        results.append(returns)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results = pd.concat(results, ignore_index=True)
+
+    print(f"\nCSV deal book: {n_deals:,} rows -> {loader.stats['deals']:,} deals valued in "
+          f"{elapsed:.2f} s ({loader.stats['batches']} batches), peak traced memory {peak / 1e6:.0f} MB")
+    print(f"Rejected {loader.stats['rejected']} rows:")
+    print(pd.DataFrame(loader.rejects).to_string(index=False))
+    print(f"Defaulted (blank optional inputs): {loader.defaulted}")
+
+    # Reference: one LBOModelMonteCarlo object per deal
+    inputs = loader.load(csv_path)
+    sample = np.arange(0, len(inputs), 100)
+    start = time.perf_counter()
+    worst = 0.0
+    for i in sample:
+        model = LBOModelMonteCarlo(inputs.ids[i], inputs['entry_ebitda'][i], inputs['entry_multiple'][i],
+                                   inputs['senior_debt'][i], inputs['mezz_debt'][i], inputs['equity'][i],
+                                   holding_period=int(inputs['holding_period'][i]))
+        base = model.calculate_base_case(revenue_growth=inputs['revenue_growth'][i],
+                                         exit_multiple=inputs['exit_multiple'][i],
+                                         debt_paydown_pct=inputs['debt_paydown_pct'][i])
+        worst = max(worst, abs(base['irr'] - results['irr'][i]), abs(base['moic'] - results['moic'][i]))
+    per_deal = (time.perf_counter() - start) / len(sample)
+    print(f"\nObject-per-deal loop: {per_deal * 1e6:.0f} us/deal "
+          f"(~{per_deal * len(inputs):.1f} s for the book); max IRR/MOIC difference {worst:.1e}")
+
+    # Excel: read-only row streaming
+    xlsx_loader = DealBookLoader('lbo_mc', columns=columns, batch_size=5_000)
+    start = time.perf_counter()
+    xlsx_deals = sum(len(batch) for batch in xlsx_loader.batches(xlsx_path))
+    print(f"\nExcel deal book: {xlsx_deals:,} deals streamed in {time.perf_counter() - start:.1f} s "
+          f"({xlsx_loader.stats['rejected']} rejected, {xlsx_loader.stats['blank']} blank rows skipped)")
+    print(pd.DataFrame(xlsx_loader.rejects).to_string(index=False))
+
+    print(f"\nTOP 5 DEALS BY BASE-CASE IRR:")
+    print(results.nlargest(5, 'irr').round(3).to_string(index=False))
+
+    shutil.rmtree(workdir)
+    return results
+
+
+if __name__ == "__main__":
+    results = example_deal_book()
@@ -0,0 +1,357 @@
+"""
+Fund Event Log - Quarterly Performance Time Series
+
+Models a PE fund as an append-only log of dated events (capital calls,
+distributions, management fees, NAV marks) instead of a single snapshot.
+
+Running totals are kept as prefix sums while events are appended, so any
+"as-of" query is a binary search (O(log n)) rather than a replay of history.
+Quarter-end metrics (DPI, RVPI, TVPI, IRR-to-date, J-curve) are cached as
+checkpoints once a quarter is closed.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+
+EVENT_TYPES = ('call', 'distribution', 'fee', 'nav')
+
+
+class FundEventLog:
+    """
+    Append-only event log for one PE fund with O(log n) as-of metrics.
+
+    Sign convention: amounts are positive; the event type gives direction
+    (calls and fees are paid in by LPs, distributions are paid out).
+    """
+
+    def __init__(self, fund_name: str, committed_capital: float, capacity: int = 256):
+        """
+        Initialize an empty event log.
+
+        Parameters:
+        -----------
+        fund_name : str
+            Name of PE fund
+        committed_capital : float
+            Total committed capital (millions)
+        capacity : int
+            Initial array capacity (grows automatically)
+        """
+        self.fund_name = fund_name
+        self.committed_capital = committed_capital
+
+        # Cash events: dates (days since epoch) and running totals
+        self._n = 0
+        self._days = np.zeros(capacity, dtype=np.int64)
+        self._cum_calls = np.zeros(capacity)
+        self._cum_dists = np.zeros(capacity)
+        self._cum_fees = np.zeros(capacity)
+        self._amounts = np.zeros(capacity)  # signed LP cash flow, for IRR
+
+        # NAV marks (kept separately - they are valuations, not cash)
+        self._n_nav = 0
+        self._nav_days = np.zeros(capacity, dtype=np.int64)
+        self._nav_values = np.zeros(capacity)
+
+        # Quarter-end checkpoints: quarter end day -> metrics dict
+        self._checkpoints: Dict[int, Dict[str, float]] = {}
+
+    # -------------------------------------------------------------------------
+    # Appending events
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _to_day(date) -> int:
+        return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64))
+
+    def _last_day(self) -> int:
+        last_cash = self._days[self._n - 1] if self._n else np.iinfo(np.int64).min
+        last_nav = self._nav_days[self._n_nav - 1] if self._n_nav else np.iinfo(np.int64).min
+        return max(last_cash, last_nav)
+
+    def _grow(self, names=('_days', '_cum_calls', '_cum_dists', '_cum_fees', '_amounts'),
+              n: Optional[int] = None):
+        n = self._n if n is None else n
+        for name in names:
+            old = getattr(self, name)
+            new = np.zeros(len(old) * 2, dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
+    def append(self, date, event_type: str, amount: float) -> None:
+        """
+        Append one event. Events must arrive in date order.
+
+        Parameters:
+        -----------
+        date : date-like
+            Event date
+        event_type : str
+            'call', 'distribution', 'fee' or 'nav'
+        amount : float
+            Cash amount (millions) or NAV value for 'nav' marks
+        """
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"event_type must be one of {EVENT_TYPES}")
+
+        day = self._to_day(date)
+        if day < self._last_day():
+            raise ValueError("Event log is append-only: events must be in date order")
+
+        # Checkpoints are only cached for days before the last event, and
+        # events can't be back-dated, so no checkpoint is invalidated here
+        if event_type == 'nav':
+            if self._n_nav == len(self._nav_days):
+                self._grow(('_nav_days', '_nav_values'), self._n_nav)
+            self._nav_days[self._n_nav] = day
+            self._nav_values[self._n_nav] = amount
+            self._n_nav += 1
+            return
+
+        if self._n == len(self._days):
+            self._grow()
+
+        i = self._n
+        prev = i - 1
+        self._days[i] = day
+        self._cum_calls[i] = (self._cum_calls[prev] if i else 0.0) + (amount if event_type == 'call' else 0.0)
+        self._cum_dists[i] = (self._cum_dists[prev] if i else 0.0) + (amount if event_type == 'distribution' else 0.0)
+        self._cum_fees[i] = (self._cum_fees[prev] if i else 0.0) + (amount if event_type == 'fee' else 0.0)
+        self._amounts[i] = amount if event_type == 'distribution' else -amount
+        self._n += 1
+
+    def extend(self, events: pd.DataFrame) -> None:
+        """
+        Append many events from a DataFrame with columns 'date', 'type', 'amount'.
+        """
+        for date, event_type, amount in events[['date', 'type', 'amount']].itertuples(index=False):
+            self.append(date, event_type, amount)
+
+    # -------------------------------------------------------------------------
+    # As-of queries
+    # -------------------------------------------------------------------------
+
+    def _totals_as_of(self, days: np.ndarray) -> Dict[str, np.ndarray]:
+        """Running totals and rolled-forward NAV for an array of dates (vectorized)."""
+        pos = np.searchsorted(self._days[:self._n], days, side='right') - 1
+        has_cash = pos >= 0
+        safe = np.maximum(pos, 0)
+
+        calls = np.where(has_cash, self._cum_calls[safe], 0.0)
+        dists = np.where(has_cash, self._cum_dists[safe], 0.0)
+        fees = np.where(has_cash, self._cum_fees[safe], 0.0)
+
+        # Latest NAV mark, rolled forward for calls / distributions since the mark
+        nav_days = self._nav_days[:self._n_nav]
+        nav_values = self._nav_values[:self._n_nav]
+        mark = np.searchsorted(nav_days, days, side='right') - 1
+        has_mark = mark >= 0
+        safe_mark = np.maximum(mark, 0)
+
+        if len(nav_days):
+            mark_pos = np.searchsorted(self._days[:self._n], nav_days[safe_mark], side='right') - 1
+            mark_calls = np.where(mark_pos >= 0, self._cum_calls[np.maximum(mark_pos, 0)], 0.0)
+            mark_dists = np.where(mark_pos >= 0, self._cum_dists[np.maximum(mark_pos, 0)], 0.0)
+            rolled = nav_values[safe_mark] + (calls - mark_calls) - (dists - mark_dists)
+        else:
+            rolled = np.zeros(len(days))
+
+        # Before the first mark, NAV is carried at cost
+        nav = np.where(has_mark, rolled, calls - dists)
+        nav = np.maximum(nav, 0.0)
+
+        return {'pos': pos, 'calls': calls, 'dists': dists, 'fees': fees, 'nav': nav}
+
+    def _irr_to_date(self, pos: int, day: int, nav: float) -> float:
+        """IRR of all cash flows up to event index `pos` plus NAV on `day`."""
+        if pos < 0:
+            return np.nan
+
+        amounts = np.append(self._amounts[:pos + 1], nav)
+        years = (np.append(self._days[:pos + 1], day) - self._days[0]) / 365.25
+
+        if not ((amounts < 0).any() and (amounts > 0).any()):
+            return np.nan
+
+        from scipy.optimize import brentq
+
+        def npv(rate):
+            return (amounts * (1 + rate) ** (-years)).sum()
+
+        # Bracket a sign change on a grid even in log(1 + rate), taking the
+        # root nearest 0% if the flows have several
+        grid = np.expm1(np.linspace(np.log(0.01), np.log(101.0), 121))
+        with np.errstate(over='ignore'):
+            values = (amounts[None, :] * (1 + grid[:, None]) ** (-years[None, :])).sum(axis=1)
+        brackets = np.flatnonzero(np.sign(values[:-1]) * np.sign(values[1:]) <= 0)
+        if len(brackets) == 0:
+            return np.nan
+
+        k = brackets[np.argmin(np.abs(np.log1p(grid[brackets]) + np.log1p(grid[brackets + 1])))]
+        # Round to the solver tolerance so a break-even fund reads 0, not -0
+        return round(brentq(npv, grid[k], grid[k + 1], xtol=1e-10), 10) + 0.0
+
+    def as_of(self, date, include_irr: bool = True) -> Dict[str, float]:
+        """
+        Fund metrics as of any date.
+
+        Multiples come from prefix sums (O(log n)). IRR needs the cash flows
+        themselves, so it is solved only when `include_irr` is True (quarter
+        ends hit the checkpoint cache instead).
+
+        Parameters:
+        -----------
+        date : date-like
+            As-of date
+        include_irr : bool
+            Whether to solve IRR-to-date
+
+        Returns:
+        --------
+        dict
+            Paid-in, distributions, NAV, DPI, RVPI, TVPI, net cash flow, IRR
+        """
+        day = self._to_day(date)
+        if day in self._checkpoints:
+            return dict(self._checkpoints[day])
+
+        totals = self._totals_as_of(np.array([day]))
+        paid_in = totals['calls'][0] + totals['fees'][0]
+        dists = totals['dists'][0]
+        nav = totals['nav'][0]
+
+        metrics = {
+            'paid_in': paid_in,
+            'distributions': dists,
+            'nav': nav,
+            'dpi': dists / paid_in if paid_in > 0 else 0.0,
+            'rvpi': nav / paid_in if paid_in > 0 else 0.0,
+            'tvpi': (dists + nav) / paid_in if paid_in > 0 else 0.0,
+            'net_cash_flow': dists - paid_in,
+            'irr': self._irr_to_date(int(totals['pos'][0]), day, nav) if include_irr else np.nan
+        }
+        return metrics
+
+    # -------------------------------------------------------------------------
+    # Quarterly time series
+    # -------------------------------------------------------------------------
+
+    def quarterly_report(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Quarter-end performance time series (DPI, RVPI, TVPI, IRR, J-curve).
+
+        Multiples for all quarters come from one vectorized prefix-sum lookup;
+        IRR-to-date is served from the checkpoint cache and only solved for
+        quarters not seen before. Only closed quarters (before the latest
+        event) are cached; the log is append-only, so they never go stale.
+
+        Parameters:
+        -----------
+        start, end : date-like, optional
+            Report window (defaults to first event through latest event)
+
+        Returns:
+        --------
+        pd.DataFrame
+            One row per quarter end
+        """
+        if self._n == 0:
+            raise RuntimeError("No cash events in the log")
+
+        first = pd.Timestamp(np.datetime64(int(self._days[0]), 'D'))
+        last = pd.Timestamp(np.datetime64(int(self._last_day()), 'D'))
+        quarter_ends = pd.date_range(
+            pd.Timestamp(start) if start is not None else first,
+            (pd.Timestamp(end) if end is not None else last) + pd.offsets.QuarterEnd(0),
+            freq='QE'
+        )
+        days = quarter_ends.values.astype('datetime64[D]').astype(np.int64)
+
+        totals = self._totals_as_of(days)
+        paid_in = totals['calls'] + totals['fees']
+        dists = totals['dists']
+        nav = totals['nav']
+        safe_paid = np.where(paid_in > 0, paid_in, np.nan)
+
+        irr = np.empty(len(days))
+        last_day = self._last_day()
+        for i, day in enumerate(days):
+            cached = self._checkpoints.get(int(day))
+            if cached is not None:
+                irr[i] = cached['irr']
+                continue
+            irr[i] = self._irr_to_date(int(totals['pos'][i]), int(day), float(nav[i]))
+            if day < last_day:
+                self._checkpoints[int(day)] = {
+                    'paid_in': paid_in[i],
+                    'distributions': dists[i],
+                    'nav': nav[i],
+                    'dpi': dists[i] / paid_in[i] if paid_in[i] > 0 else 0.0,
+                    'rvpi': nav[i] / paid_in[i] if paid_in[i] > 0 else 0.0,
+                    'tvpi': (dists[i] + nav[i]) / paid_in[i] if paid_in[i] > 0 else 0.0,
+                    'net_cash_flow': dists[i] - paid_in[i],
+                    'irr': irr[i]
+                }
+
+        report = pd.DataFrame({
+            'Paid_In': paid_in,
+            'Distributions': dists,
+            'NAV': nav,
+            'DPI': dists / safe_paid,
+            'RVPI': nav / safe_paid,
+            'TVPI': (dists + nav) / safe_paid,
+            'Net_Cash_Flow': dists - paid_in,   # J-curve
+            'IRR': irr
+        }, index=quarter_ends.to_period('Q'))
+        report.index.name = 'Quarter'
+
+        return report
+
+
+def example_fund_event_log():
+    """Quarterly history for PE Club Fund I built from an event log"""
+
+    print("\n" + "="*80)
+    print("FUND EVENT LOG - QUARTERLY PERFORMANCE HISTORY")
+    print("="*80)
+
+    log = FundEventLog("PE Club Fund I", committed_capital=500.0)
+
+    events = pd.DataFrame([
+        ('2019-03-15', 'call', 80.0), ('2019-03-31', 'fee', 2.5),
+        ('2019-09-10', 'call', 60.0), ('2019-09-30', 'fee', 2.5),
+        ('2019-12-31', 'nav', 145.0),
+        ('2020-04-20', 'call', 90.0), ('2020-06-30', 'fee', 2.5),
+        ('2020-12-31', 'nav', 230.0),
+        ('2021-02-15', 'call', 70.0), ('2021-06-30', 'fee', 2.5),
+        ('2021-12-31', 'nav', 360.0),
+        ('2022-05-01', 'call', 50.0), ('2022-09-30', 'distribution', 120.0),
+        ('2022-12-31', 'nav', 330.0),
+        ('2023-06-30', 'distribution', 95.0), ('2023-12-31', 'nav', 310.0),
+        ('2024-03-31', 'distribution', 140.0), ('2024-12-31', 'nav', 260.0),
+    ], columns=['date', 'type', 'amount'])
+    log.extend(events)
+
+    report = log.quarterly_report()
+
+    print(f"\nFund: {log.fund_name} (€{log.committed_capital:.0f}M committed)")
+    print(f"Events logged: {len(events)}")
+    print("\nQUARTERLY TIME SERIES:")
+    print(report.round(3).to_string())
+
+    snapshot = log.as_of('2023-08-15')
+    print(f"\nAS-OF 2023-08-15:")
+    print(f"  DPI:                      {snapshot['dpi']:.2f}x")
+    print(f"  TVPI:                     {snapshot['tvpi']:.2f}x")
+    print(f"  IRR-to-date:              {snapshot['irr']*100:.1f}%")
+
+    trough = report['Net_Cash_Flow'].idxmin()
+    print(f"\nJ-CURVE TROUGH:             {trough} (€{report['Net_Cash_Flow'].min():.0f}M)")
+
+    return log
+
+
+if __name__ == "__main__":
+    log = example_fund_event_log()
@@ -0,0 +1,391 @@
+"""
+Concurrent Fundamentals Fetcher for DCFValuationTool
+
+`DCFValuationTool.get_financial_data` returns one hard-coded dict. To value
+hundreds of tickers per run, this module fetches fundamentals concurrently
+from an HTTP API:
+
+- asyncio + one pooled HTTP client (connections are reused, keep-alive)
+- bounded concurrency (one semaphore per fetcher caps requests in flight,
+  across concurrent fetch_many() calls)
+- retry with exponential backoff + jitter on timeouts, 429 and 5xx
+  (honouring `Retry-After` in seconds or HTTP-date form, up to a cap)
+- request coalescing: duplicate tickers - in one list or across concurrent
+  calls - share a single in-flight request
+
+`StubFundamentalsServer` serves synthetic fundamentals on localhost (with
+configurable latency and transient failures), so the whole pipeline can be
+exercised without any external API.
+
+API contract: GET {base_url}/fundamentals/{TICKER} -> JSON with the keys of
+DCFValuationTool.get_financial_data() (plus optional 'company_name').
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """Raised when a ticker cannot be fetched after all retries."""
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header: delta-seconds ('120') or an
+    HTTP-date ('Wed, 21 Oct 2015 07:28:00 GMT'). None if absent or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AsyncFundamentalsFetcher:
+    """
+    Fetches fundamentals for many tickers concurrently.
+
+    Usage:
+        fetcher = AsyncFundamentalsFetcher('https://api.example.com')
+        data, errors = fetcher.fetch_all(['MSFT', 'AAPL', ...])
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_concurrency: int = 16,
+        max_retries: int = 3,
+        backoff: float = 0.2,
+        timeout: float = 10.0,
+        headers: Optional[Dict[str, str]] = None,
+        max_retry_after: float = 60.0
+    ):
+        """
+        Initialize the fetcher.
+
+        Parameters:
+        -----------
+        base_url : str
+            API root (requests go to {base_url}/fundamentals/{ticker})
+        max_concurrency : int
+            Maximum requests in flight (and pooled connections)
+        max_retries : int
+            Retries after the first attempt for transient failures
+        backoff : float
+            Base delay in seconds; attempt n waits backoff × 2^n (± jitter)
+        timeout : float
+            Per-request timeout in seconds
+        headers : dict, optional
+            Extra headers (e.g., API key)
+        max_retry_after : float
+            Longest wait in seconds honoured from a server's Retry-After
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.max_retry_after = max_retry_after
+
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self.stats = {'requests': 0, 'retries': 0, 'coalesced': 0, 'failed': 0}
+
+    def _limit(self) -> asyncio.Semaphore:
+        """The fetcher's concurrency limit, shared by all fetch_many() calls on this loop."""
+        # fetch_all() runs each call on a new event loop, and a semaphore
+        # cannot be shared across loops
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _get(self, client, ticker: str) -> Dict:
+        """One ticker with retry / backoff (runs at most once per in-flight ticker)."""
+        import httpx
+
+        url = f'{self.base_url}/fundamentals/{ticker}'
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with self._limit():
+                self.stats['requests'] += 1
+                try:
+                    response = await client.get(url)
+                    if response.status_code == 200:
+                        return response.json()
+                    if response.status_code not in RETRYABLE_STATUS:
+                        raise FetchError(f'{ticker}: HTTP {response.status_code}')
+                    error = f'HTTP {response.status_code}'
+                    retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                except (httpx.TransportError, httpx.TimeoutException) as exc:
+                    error = type(exc).__name__
+
+            if attempt == self.max_retries:
+                raise FetchError(f'{ticker}: {error} after {attempt + 1} attempts')
+
+            # Back off outside the semaphore so other tickers keep flowing
+            self.stats['retries'] += 1
+            delay = min(retry_after, self.max_retry_after) if retry_after is not None else \
+                self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+            await asyncio.sleep(delay)
+
+    def _coalesced(self, client, ticker: str) -> asyncio.Task:
+        """Return the in-flight task for a ticker, starting one if needed."""
+        task = self._in_flight.get(ticker)
+        if task is not None:
+            self.stats['coalesced'] += 1
+            return task
+
+        task = asyncio.ensure_future(self._get(client, ticker))
+        self._in_flight[ticker] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(ticker, None))
+        return task
+
+    async def fetch_many(self, tickers: Iterable[str], client=None) -> Tuple[Dict, Dict]:
+        """
+        Fetch fundamentals for all tickers.
+
+        Parameters:
+        -----------
+        tickers : iterable of str
+            Tickers (duplicates are fetched once)
+        client : httpx.AsyncClient, optional
+            Shared client; one is created (and closed) if omitted
+
+        Returns:
+        --------
+        tuple
+            ({ticker: data}, {ticker: error message})
+        """
+        import httpx
+
+        tickers = [t.upper() for t in tickers]
+        own_client = client is None
+        if own_client:
+            limits = httpx.Limits(max_connections=self.max_concurrency,
+                                  max_keepalive_connections=self.max_concurrency)
+            client = httpx.AsyncClient(limits=limits, timeout=self.timeout, headers=self.headers)
+
+        try:
+            tasks = {t: self._coalesced(client, t) for t in dict.fromkeys(tickers)}
+            self.stats['coalesced'] += len(tickers) - len(tasks)
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            if own_client:
+                await client.aclose()
+
+        data, errors = {}, {}
+        for ticker, result in zip(tasks, results):
+            if isinstance(result, BaseException):
+                errors[ticker] = str(result)
+                self.stats['failed'] += 1
+            else:
+                data[ticker] = result
+        return data, errors
+
+    def fetch_all(self, tickers: Iterable[str]) -> Tuple[Dict, Dict]:
+        """Synchronous wrapper around fetch_many() for scripts and notebooks."""
+        return asyncio.run(self.fetch_many(tickers))
+
+
+def value_universe(fundamentals: Dict[str, Dict]) -> pd.DataFrame:
+    """
+    Base-case DCF valuation for every fetched ticker.
+
+    Parameters:
+    -----------
+    fundamentals : dict
+        {ticker: financial data} as returned by fetch_many()
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per ticker, ranked by upside
+    """
+    from solutions import DCFValuationTool
+
+    table = pd.DataFrame.from_dict(fundamentals, orient='index')
+    return DCFValuationTool.value_universe(table)
+
+
+# =============================================================================
+# LOCAL STUB SERVER
+# =============================================================================
+
+def synthetic_fundamentals(ticker: str) -> Dict[str, float]:
+    """Deterministic fundamentals for a ticker (same keys as get_financial_data)."""
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    revenue = float(rng.lognormal(np.log(20_000), 1.0))
+    margin = float(rng.uniform(0.10, 0.45))
+    shares = float(rng.uniform(200, 8_000))
+    ev_multiple = float(rng.uniform(8, 25))
+    net_debt = revenue * margin * float(rng.uniform(-0.5, 2.5))
+    price = (revenue * margin * ev_multiple - net_debt) / shares
+
+    return {
+        'company_name': f'{ticker} Holdings',
+        'current_price': round(price, 2),
+        'shares_outstanding': round(shares, 1),
+        'market_cap': round(price * shares, 0),
+        'revenue_latest': round(revenue, 0),
+        'ebitda_latest': round(revenue * margin, 0),
+        'revenue_cagr_3y': round(float(rng.uniform(0.0, 0.25)), 3),
+        'ebitda_margin': round(margin, 3),
+        'fcf_conversion': round(float(rng.uniform(0.5, 0.95)), 3),
+        'capex_pct_revenue': round(float(rng.uniform(0.02, 0.15)), 3),
+        'net_debt': round(net_debt, 0),
+        'beta': round(float(rng.uniform(0.6, 1.6)), 2),
+        'tax_rate': 0.21
+    }
+
+
+class StubFundamentalsServer:
+    """
+    Local HTTP server for the fundamentals API.
+
+    Usage:
+        with StubFundamentalsServer(latency=0.05, failure_rate=0.1) as server:
+            data, errors = AsyncFundamentalsFetcher(server.url).fetch_all(tickers)
+    """
+
+    def __init__(self, latency: float = 0.02, failure_rate: float = 0.0,
+                 unknown_tickers: Iterable[str] = ()):
+        """
+        Parameters:
+        -----------
+        latency : float
+            Seconds each response is delayed
+        failure_rate : float
+            Share of tickers whose FIRST request returns 503 (transient)
+        unknown_tickers : iterable of str
+            Tickers answered with 404 (permanent failure)
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.unknown_tickers = set(unknown_tickers)
+        self.request_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: Dict):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                ticker = self.path.rstrip('/').split('/')[-1].upper()
+                with stub._lock:
+                    count = stub.request_counts.get(ticker, 0) + 1
+                    stub.request_counts[ticker] = count
+                time.sleep(stub.latency)
+
+                if not self.path.startswith('/fundamentals/') or ticker in stub.unknown_tickers:
+                    self._send(404, {'error': f'unknown ticker {ticker}'})
+                elif count == 1 and random.Random(ticker).random() < stub.failure_rate:
+                    self._send(503, {'error': 'temporarily unavailable'})
+                else:
+                    self._send(200, synthetic_fundamentals(ticker))
+
+        return Handler
+
+    def start(self) -> 'StubFundamentalsServer':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def example_fundamentals_fetcher(n_tickers: int = 300):
+    """Fetch and value 300 tickers (with duplicates and failures) from a stub API"""
+    print("\n" + "="*80)
+    print("CONCURRENT FUNDAMENTALS FETCHER + BATCH DCF VALUATION")
+    print("="*80)
+
+    tickers = [f'T{i:04d}' for i in range(n_tickers)]
+    requested: List[str] = tickers + tickers[:50] + ['MSFT', 'msft', 'NOPE']
+
+    with StubFundamentalsServer(latency=0.05, failure_rate=0.10,
+                                unknown_tickers=['NOPE']) as server:
+        fetcher = AsyncFundamentalsFetcher(server.url, max_concurrency=32, backoff=0.05)
+
+        start = time.perf_counter()
+        data, errors = fetcher.fetch_all(requested)
+        elapsed = time.perf_counter() - start
+        server_requests = sum(server.request_counts.values())
+
+    print(f"\nTickers Requested:          {len(requested):,} ({len(set(t.upper() for t in requested)):,} unique)")
+    print(f"Fetched:                    {len(data):,}")
+    print(f"Failed:                     {len(errors):,} {list(errors.values())}")
+    print(f"HTTP Requests (server):     {server_requests:,}")
+    print(f"Retries / Coalesced:        {fetcher.stats['retries']} / {fetcher.stats['coalesced']}")
+    print(f"Fetch Time:                 {elapsed:.2f}s "
+          f"(sequential ≈ {server_requests * 0.05:.1f}s)")
+
+    start = time.perf_counter()
+    valuations = value_universe(data)
+    print(f"Valuation Time:             {time.perf_counter() - start:.2f}s")
+
+    print(f"\nTOP 5 BY UPSIDE:")
+    print(valuations.head(5)[['ticker', 'wacc', 'value_per_share', 'current_price',
+                              'upside', 'recommendation']].round(3).to_string(index=False))
+    print(f"\nRecommendations: {valuations['recommendation'].value_counts().to_dict()}")
+
+    return valuations
+
+
+if __name__ == "__main__":
+    valuations = example_fundamentals_fetcher()
@@ -0,0 +1,444 @@
+"""
+Shared Memoization Cache for Model Evaluations
+
+Sensitivity tables, scenario runs and reports keep re-evaluating identical
+assumption sets: LBOModel.display_summary() rebuilds Sources & Uses and the
+returns it has already computed, every scenario run recomputes the BASE case,
+and a seeded Monte Carlo run gives the same 10,000 rows every time. This
+cache stores each result under a canonical hash of the inputs that produced it:
+
+- canonical_key(): type-tagged encoding of scalars, sequences, dicts, NumPy
+  arrays and pandas objects; 5, 5.0 and np.float64(5) hash the same, dict
+  order does not matter, -0.0 equals 0.0, and integers past 2**53 (scalars
+  or arrays) keep their exact value
+- memory tier: LRU of the most recent results (by entry count)
+- disk tier (optional): pickles under disk_dir, evicted least recently used
+  first once their total size exceeds disk_max_bytes; survives restarts and
+  is shared by processes pointing at the same directory
+- stats per namespace (hits, disk hits, misses), so it is visible which
+  evaluations actually repeat
+
+The models take the cache through a `cache` attribute (None = off) and call
+it via their _memo() helper, so no model module imports this file:
+
+    cache = ModelCache(disk_dir='.model_cache')
+    DCFModel.cache = LBOModel.cache = LBOModelMonteCarlo.cache = cache   # every instance
+    lbo.cache = cache                                                    # or one model
+
+Results are copied on the way in and out, so callers may modify what they
+get back. Bump `version` when model code changes, to orphan stale disk entries.
+"""
+
+import copy
+import hashlib
+import math
+import os
+import pickle
+import struct
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from numbers import Integral, Real
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+_MISSING = object()
+_EXACT_INT = 2 ** 53
+
+
+def _encode(value, update: Callable[[bytes], None]):
+    """Feed a type-tagged encoding of `value` to a hash (dict / set order ignored)"""
+    if value is None:
+        update(b'N')
+    elif isinstance(value, (bool, np.bool_)):
+        update(b'B1' if value else b'B0')
+    elif isinstance(value, Integral) and abs(int(value)) >= _EXACT_INT:
+        update(b'I' + str(int(value)).encode() + b';')
+    elif isinstance(value, Real):
+        number = float(value) + 0.0            # -0.0 -> 0.0
+        update(b'Fnan' if math.isnan(number) else b'F' + struct.pack('<d', number))
+    elif isinstance(value, str):
+        data = value.encode()
+        update(b'S' + struct.pack('<q', len(data)) + data)
+    elif isinstance(value, bytes):
+        update(b'Y' + struct.pack('<q', len(value)) + value)
+    elif isinstance(value, Enum):
+        _encode(f'{type(value).__name__}.{value.name}', update)
+    elif isinstance(value, (datetime, date, pd.Timestamp)):
+        _encode('T' + value.isoformat(), update)
+    elif isinstance(value, dict):
+        # Type name breaks ties between keys that canonicalise alike, never the values
+        items = sorted(((canonical_key('', k), repr(type(k)), v) for k, v in value.items()),
+                       key=lambda item: item[:2])
+        update(b'D' + struct.pack('<q', len(items)))
+        for key, _, item in items:
+            update(key.encode())
+            _encode(item, update)
+    elif isinstance(value, (set, frozenset)):
+        keys = sorted(canonical_key('', item) for item in value)
+        update(b'E' + struct.pack('<q', len(keys)) + ''.join(keys).encode())
+    elif isinstance(value, np.ndarray):
+        if value.dtype.kind in 'iu' and value.size and (value.max() >= _EXACT_INT
+                                                        or value.min() <= -_EXACT_INT):
+            # Past 2**53 float64 is lossy: hash the integers themselves
+            array = np.ascontiguousarray(value, dtype='<i8' if value.min() < 0 else '<u8')
+            update(b'Q' + array.dtype.str.encode()
+                   + struct.pack('<q', array.ndim) + struct.pack(f'<{array.ndim}q', *array.shape))
+            update(array.tobytes())
+        elif value.dtype.kind in 'iuf':
+            array = np.ascontiguousarray(value, dtype=np.float64) + 0.0
+            array[np.isnan(array)] = np.nan     # one NaN bit pattern
+            update(b'A' + struct.pack('<q', array.ndim) + struct.pack(f'<{array.ndim}q', *array.shape))
+            update(array.tobytes())
+        else:
+            update(b'A' + struct.pack('<q', value.ndim) + struct.pack(f'<{value.ndim}q', *value.shape))
+            _encode(value.ravel().tolist(), update)
+    elif isinstance(value, pd.DataFrame):
+        update(b'P')
+        _encode(list(value.columns), update)
+        _encode(value.index, update)
+        for column in value.columns:
+            _encode(value[column].to_numpy(), update)
+    elif isinstance(value, pd.Series):
+        update(b'R')
+        _encode(value.name, update)
+        _encode(value.index, update)
+        _encode(value.to_numpy(), update)
+    elif isinstance(value, pd.Index):
+        if isinstance(value, pd.RangeIndex):
+            _encode(('range', value.start, value.stop, value.step), update)
+        else:
+            _encode(value.to_numpy(), update)
+    elif isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, Real) and not isinstance(item, (bool, np.bool_))
+                         for item in value):
+            _encode(np.asarray(value), update)   # same key as the array
+            return
+        update(b'L' + struct.pack('<q', len(value)))
+        for item in value:
+            _encode(item, update)
+    else:
+        raise TypeError(f"Cannot build a cache key from {type(value).__name__}; "
+                        f"pass the inputs it depends on instead")
+
+
+def canonical_key(namespace: str, inputs: Any) -> str:
+    """
+    Cache key for `inputs` under `namespace`.
+
+    Parameters:
+    -----------
+    namespace : str
+        What is being computed, e.g. 'LBOModel.calculate_returns'
+    inputs : any
+        Scalars, strings, lists / tuples, dicts, NumPy arrays or pandas objects
+
+    Returns:
+    --------
+    str
+        '<namespace>:<32 hex digits>'
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _encode(inputs, digest.update)
+    return f'{namespace}:{digest.hexdigest()}'
+
+
+def _copy(value):
+    """Copy a cached result so the cache and the caller never share mutable state"""
+    if isinstance(value, (int, float, str, bytes, bool, type(None), np.generic)):
+        return value
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+class ModelCache:
+    """
+    Two-tier memo of model results keyed by canonical input hashes.
+
+    Usage:
+        cache = ModelCache(max_entries=4_096, disk_dir='.model_cache')
+        result = cache.get_or_compute('LBOModel.calculate_returns', inputs, compute)
+        cache.report()
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4_096,
+        disk_dir: Optional[Union[str, Path]] = None,
+        disk_max_bytes: int = 256 * 2**20,
+        version: str = '1'
+    ):
+        """
+        Parameters:
+        -----------
+        max_entries : int
+            Results held in memory (least recently used dropped first)
+        disk_dir : str or Path, optional
+            Directory of the disk tier (None = memory only)
+        disk_max_bytes : int
+            Disk tier size limit; eviction trims it to 80% of the limit
+        version : str
+            Mixed into every key; change it to invalidate old disk entries
+        """
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self.disk_max_bytes = disk_max_bytes
+        self.version = version
+
+        self._memory: 'OrderedDict[str, Any]' = OrderedDict()
+        self._namespaces: Dict[str, Dict[str, int]] = {}
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0,
+                      'evictions': 0, 'disk_writes': 0, 'disk_evictions': 0}
+
+        self._disk_bytes = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(f.stat().st_size for f in self.disk_dir.glob('*/*.pkl'))
+
+    def key(self, namespace: str, inputs: Any) -> str:
+        """canonical_key() including the cache version"""
+        return canonical_key(namespace, (self.version, inputs))
+
+    def _path(self, key: str) -> Path:
+        digest = key.rsplit(':', 1)[1]
+        return self.disk_dir / digest[:2] / f"{key.replace(':', '-')}.pkl"
+
+    def _count(self, namespace: str, outcome: str):
+        self.stats[outcome] += 1
+        counts = self._namespaces.setdefault(namespace, {'hits': 0, 'disk_hits': 0, 'misses': 0})
+        counts[outcome] += 1
+
+    def _remember(self, key: str, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _read_disk(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception:
+            # truncated / incompatible entry: drop it and recompute
+            path.unlink(missing_ok=True)
+            return _MISSING
+        os.utime(path)                          # mtime = last use, for eviction
+        return value
+
+    def _write_disk(self, key: str, value):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = tmp_path.stat().st_size
+        tmp_path.replace(path)
+        self._disk_bytes += size
+        self.stats['disk_writes'] += 1
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete least recently used entries until the tier is at 80% of its limit"""
+        entries = []
+        for path in self.disk_dir.glob('*/*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_max_bytes * 0.8
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.stats['disk_evictions'] += 1
+        self._disk_bytes = total
+
+    def get_or_compute(self, namespace: str, inputs: Any, compute: Callable[[], Any]):
+        """
+        Cached result for `inputs`, calling compute() only on a miss.
+
+        Parameters:
+        -----------
+        namespace : str
+            What is being computed (results of different namespaces never mix)
+        inputs : any
+            Everything the result depends on (see canonical_key)
+        compute : callable
+            Zero-argument function producing the result
+
+        Returns:
+        --------
+        any
+            A copy of the cached or freshly computed result
+        """
+        key = self.key(namespace, inputs)
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self._memory.move_to_end(key)
+            self._count(namespace, 'hits')
+            return _copy(value)
+
+        if self.disk_dir is not None:
+            value = self._read_disk(key)
+            if value is not _MISSING:
+                self._remember(key, value)
+                self._count(namespace, 'disk_hits')
+                return _copy(value)
+
+        self._count(namespace, 'misses')
+        value = compute()
+        self._remember(key, _copy(value))
+        if self.disk_dir is not None:
+            self._write_disk(key, value)
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups served from either tier"""
+        lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+        return (self.stats['hits'] + self.stats['disk_hits']) / lookups if lookups else 0.0
+
+    def report(self) -> pd.DataFrame:
+        """
+        Hits, disk hits, misses and hit rate per namespace.
+
+        Returns:
+        --------
+        pd.DataFrame
+            One row per namespace, most lookups first
+        """
+        table = pd.DataFrame.from_dict(self._namespaces, orient='index',
+                                       columns=['hits', 'disk_hits', 'misses'])
+        table.index.name = 'namespace'
+        lookups = table.sum(axis=1)
+        table['hit_rate'] = (table['hits'] + table['disk_hits']) / lookups
+        return table.loc[lookups.sort_values(ascending=False, kind='stable').index]
+
+    def clear(self, disk: bool = False):
+        """Drop the memory tier (and the disk tier with disk=True); stats are kept"""
+        self._memory.clear()
+        if disk and self.disk_dir is not None:
+            for path in self.disk_dir.glob('*/*.pkl'):
+                path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    def __len__(self):
+        return len(self._memory)
+
+
+def example_model_cache():
+    """Sensitivity grid, repeated scenario runs and a warm restart through one shared cache"""
+    import shutil
+    import tempfile
+    import time
+
+    from solutions import DCFValuationTool, LBOModelMonteCarlo
+
+    print("\n" + "="*80)
+    print("SHARED MODEL CACHE")
+    print("="*80)
+
+    # Key canonicalization
+    same = canonical_key('k', {'growth': [0.1, 0.1], 'years': 5}) == \
+        canonical_key('k', {'years': 5.0, 'growth': np.array([0.1, 0.1])})
+    print(f"\nKey ignores dict order and int/float/array spelling: {same}")
+
+    disk_dir = Path(tempfile.mkdtemp(prefix='model_cache_'))
+    cache = ModelCache(disk_dir=disk_dir)
+    LBOModelMonteCarlo.cache = cache
+    DCFValuationTool.cache = cache
+
+    deal = dict(company_name='European Software Company', entry_ebitda=50.0, entry_multiple=10.0,
+                senior_debt=300.0, mezz_debt=50.0, equity=175.0, holding_period=5)
+    growths = np.linspace(0.02, 0.14, 13)
+    exits = np.linspace(8.0, 14.0, 13)
+
+    def workload():
+        """A report session: MC run, base case, growth x exit grid, three scenario passes"""
+        lbo = LBOModelMonteCarlo(**deal)
+        mc = lbo.monte_carlo_simulation(iterations=10_000)
+        base = lbo.calculate_base_case()
+        grid = [[lbo.calculate_base_case(revenue_growth=g, exit_multiple=m)['irr'] for m in exits]
+                for g in growths]
+        for _ in range(3):
+            for growth, multiple in [(0.08, 11.0), (0.12, 13.0), (0.04, 9.0)]:
+                lbo.calculate_base_case(revenue_growth=growth, exit_multiple=multiple)
+        tool = DCFValuationTool('MSFT')
+        for _ in range(3):
+            projections = tool.project_cash_flows(100_000, [0.10] * 3 + [0.07] * 2,
+                                                  0.45, 0.21, 0.05, 0.10)
+            tool.calculate_dcf_valuation(projections, projections.iloc[-1]['FCF'], 0.03, 0.085,
+                                         20_000, 7_400)
+        return mc, base, np.array(grid)
+
+    LBOModelMonteCarlo.cache = DCFValuationTool.cache = None
+    start = time.perf_counter()
+    mc_ref, base_ref, grid_ref = workload()
+    uncached_s = time.perf_counter() - start
+    LBOModelMonteCarlo.cache = DCFValuationTool.cache = cache
+
+    timings = {}
+    for label in ['cold cache', 'warm cache']:
+        start = time.perf_counter()
+        mc, base, grid = workload()
+        timings[label] = time.perf_counter() - start
+
+    # New process pointing at the same directory: served from the disk tier
+    restarted = ModelCache(disk_dir=disk_dir)
+    LBOModelMonteCarlo.cache = DCFValuationTool.cache = restarted
+    start = time.perf_counter()
+    mc_disk, _, _ = workload()
+    timings['restart (disk tier)'] = time.perf_counter() - start
+
+    print(f"\n{'Session':<22}{'Time':>10}")
+    print(f"{'no cache':<22}{uncached_s * 1000:>8.0f}ms")
+    for label, seconds in timings.items():
+        print(f"{label:<22}{seconds * 1000:>8.0f}ms")
+
+    print(f"\nCached results identical: MC {mc.equals(mc_ref) and mc_disk.equals(mc_ref)}, "
+          f"base case {base == base_ref}, grid {np.array_equal(grid, grid_ref)}")
+
+    mc['irr'] = 0.0                      # callers get copies
+    print(f"Mutating a returned result leaves the cache intact: "
+          f"{LBOModelMonteCarlo(**deal).monte_carlo_simulation(iterations=10_000).equals(mc_ref)}")
+
+    print(f"\nFirst cache: hit rate {cache.hit_rate:.1%}, {len(cache)} entries, "
+          f"{cache.stats['disk_writes']} disk writes")
+    print(cache.report().to_string(float_format=lambda x: f'{x:.1%}'))
+    print(f"\nRestarted cache: {restarted.stats}")
+
+    # Disk tier size limit
+    small = ModelCache(max_entries=8, disk_dir=disk_dir / 'small', disk_max_bytes=2 * 2**20)
+    LBOModelMonteCarlo.cache = small
+    for seed_growth in np.linspace(0.05, 0.10, 6):
+        LBOModelMonteCarlo(**deal).monte_carlo_simulation(iterations=10_000,
+                                                          revenue_growth_mean=seed_growth)
+    entries = [f.stat().st_size for f in (disk_dir / 'small').glob('*/*.pkl')]
+    print(f"\n2 MB disk tier after six {entries[0] / 2**20:.1f} MB results: "
+          f"{sum(entries) / 2**20:.1f} MB on disk, {small.stats['disk_evictions']} evicted")
+
+    LBOModelMonteCarlo.cache = DCFValuationTool.cache = None
+    shutil.rmtree(disk_dir)
+    return cache
+
+
+if __name__ == "__main__":
+    cache = example_model_cache()
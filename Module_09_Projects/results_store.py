@@ -0,0 +1,432 @@
+"""
+Parquet Results Store for Valuation and Simulation Runs
+
+Every project prints its results and throws them away, so nothing can be
+compared across runs or charted over time. This store keeps model outputs
+as a partitioned Parquet dataset:
+
+    <root>/<kind>/model=<model>/date=<YYYY-MM-DD>/<run_id>-<n>.parquet
+
+- kind: the output table (projections, debt_schedule, mc_summary,
+  sensitivity, ...); each kind has its own columns
+- every row carries run_id, model, deal and timestamp
+- a run registry (<root>/runs) records each run's model, time and parameters
+
+Reads go through pyarrow with memory-mapped files and filters: model / date
+filters prune whole directories before any file is opened, and column
+filters (deal, run_id, ...) are checked against row-group min/max
+statistics, so a dashboard query over months of history touches only the
+partitions and row groups it needs. compact() rewrites a day's small per-run
+files as one file sorted by deal, which makes deal filters skip row groups.
+
+Usage:
+    store = ResultsStore('results')
+    with store.run('lbo_mc', params={'iterations': 10_000}) as run:
+        run.write('mc_summary', summarize_simulation(mc_results), deal='European Software')
+    store.read('mc_summary', filters=[('model', '=', 'lbo_mc'), ('date', '>=', '2025-01-01')])
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+KEY_COLUMNS = ['run_id', 'model', 'deal', 'timestamp']
+RUNS = 'runs'
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([('model', pa.string()), ('date', pa.string())]),
+                           flavor='hive')
+
+
+def summarize_simulation(results: pd.DataFrame, columns: Sequence[str] = ('irr', 'moic'),
+                         percentiles: Sequence[float] = (0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95),
+                         by: Optional[str] = None) -> pd.DataFrame:
+    """
+    Monte Carlo results -> one row per metric: iterations, mean, std, percentiles.
+
+    With `by` (e.g. 'deal'), one row per group and metric - a whole book of
+    simulations is summarized in one grouped pass.
+    """
+    names = [f'p{int(q * 100):02d}' for q in percentiles]
+    frames = []
+    for column in columns:
+        if by is None:
+            values = results[column]
+            stats = pd.DataFrame([[len(values), values.mean(), values.std()]
+                                  + list(values.quantile(list(percentiles)))],
+                                 columns=['iterations', 'mean', 'std'] + names)
+        else:
+            grouped = results.groupby(by, sort=True)[column]
+            stats = grouped.agg(iterations='count', mean='mean', std='std')
+            quantiles = grouped.quantile(list(percentiles)).unstack()
+            quantiles.columns = names
+            stats = stats.join(quantiles).reset_index()
+        frames.append(stats.assign(metric=column))
+    summary = pd.concat(frames, ignore_index=True)
+    leading = ([by] if by is not None else []) + ['metric']
+    return summary[leading + [c for c in summary.columns if c not in leading]]
+
+
+def tidy_grid(grid: pd.DataFrame, value_name: str = 'value') -> pd.DataFrame:
+    """Sensitivity grid (rows x columns) -> long rows: row_label, column_label, value"""
+    long = grid.stack().rename(value_name).reset_index()
+    long.columns = ['row_label', 'column_label', value_name]
+    long[['row_label', 'column_label']] = long[['row_label', 'column_label']].astype(str)
+    return long
+
+
+class ResultsRun:
+    """
+    One model run: buffers outputs per kind and writes them as Parquet files.
+
+    Created by ResultsStore.run(); use as a context manager so buffered rows
+    are flushed and the run is registered on exit.
+    """
+
+    def __init__(self, store: 'ResultsStore', model: str, params: Optional[Dict],
+                 timestamp: Optional[datetime], flush_rows: int):
+        self.store = store
+        self.model = model
+        self.params = params or {}
+        self.timestamp = pd.Timestamp(timestamp or datetime.now(timezone.utc))
+        if self.timestamp.tzinfo is None:
+            self.timestamp = self.timestamp.tz_localize('UTC')
+        self.run_id = f"{self.timestamp.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.flush_rows = flush_rows
+        self.rows: Dict[str, int] = {}
+        self._buffers: Dict[str, List[pd.DataFrame]] = {}
+        self._files: Dict[str, int] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(status='ok' if exc_type is None else 'failed')
+
+    def write(self, kind: str, frame: pd.DataFrame, deal: Optional[str] = None):
+        """
+        Add output rows of one kind.
+
+        Parameters:
+        -----------
+        kind : str
+            Output table, e.g. 'projections' or 'mc_summary'
+        frame : pd.DataFrame
+            Rows to store; a 'deal' column may be given instead of `deal`
+        deal : str, optional
+            Deal / company the rows belong to
+        """
+        if kind == RUNS:
+            raise ValueError(f"'{RUNS}' is reserved for the run registry")
+        # named index levels (e.g. 'year') become columns; a default RangeIndex is dropped
+        frame = frame.reset_index(drop=not any(frame.index.names))
+        if deal is not None:
+            frame = frame.assign(deal=deal)
+        elif 'deal' not in frame.columns:
+            frame = frame.assign(deal='')
+        frame = frame.assign(deal=frame['deal'].astype(str))
+
+        buffer = self._buffers.setdefault(kind, [])
+        buffer.append(frame)
+        self.rows[kind] = self.rows.get(kind, 0) + len(frame)
+        if sum(len(part) for part in buffer) >= self.flush_rows:
+            self._flush(kind)
+
+    def _flush(self, kind: str):
+        parts = self._buffers.pop(kind, [])
+        if not parts:
+            return
+        frame = pd.concat(parts, ignore_index=True)
+        n = self._files.get(kind, 0)
+        self._files[kind] = n + 1
+        self.store._write_file(kind, frame, self.run_id, self.model, self.timestamp,
+                               f'{self.run_id}-{n:04d}.parquet')
+
+    def close(self, status: str = 'ok'):
+        """Flush all buffers and register the run"""
+        for kind in list(self._buffers):
+            self._flush(kind)
+        record = pd.DataFrame([{
+            'status': status,
+            'params': json.dumps(self.params, default=str),
+            'outputs': json.dumps(self.rows),
+            'deal': ''
+        }])
+        self.store._write_file(RUNS, record, self.run_id, self.model, self.timestamp,
+                               f'{self.run_id}.parquet')
+
+
+class ResultsStore:
+    """Partitioned Parquet store of model outputs (see module docstring)"""
+
+    def __init__(self, root: Union[str, Path], row_group_size: int = 64_000):
+        """
+        Parameters:
+        -----------
+        root : str or Path
+            Store directory (created on first write)
+        row_group_size : int
+            Rows per Parquet row group - the unit that statistics can skip
+        """
+        self.root = Path(root)
+        self.row_group_size = row_group_size
+
+    def run(self, model: str, params: Optional[Dict] = None,
+            timestamp: Optional[datetime] = None, flush_rows: int = 200_000) -> ResultsRun:
+        """
+        Start a run.
+
+        Parameters:
+        -----------
+        model : str
+            Model type, e.g. 'dcf', 'lbo', 'lbo_mc' (a partition key)
+        params : dict, optional
+            Run parameters recorded in the run registry
+        timestamp : datetime, optional
+            Run time (default: now, UTC); sets the date partition
+        flush_rows : int
+            Buffered rows per kind before a file is written
+        """
+        return ResultsRun(self, model, params, timestamp, flush_rows)
+
+    def _write_file(self, kind: str, frame: pd.DataFrame, run_id: str, model: str,
+                    timestamp: pd.Timestamp, name: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        directory = self.root / kind / f'model={model}' / f"date={timestamp.strftime('%Y-%m-%d')}"
+        directory.mkdir(parents=True, exist_ok=True)
+        frame = frame.assign(run_id=run_id, timestamp=timestamp).sort_values('deal', kind='stable')
+        columns = ['run_id', 'deal', 'timestamp'] + \
+            [c for c in frame.columns if c not in KEY_COLUMNS]
+        table = pa.Table.from_pandas(frame[columns], preserve_index=False)
+        # write to a temporary name first so readers never see a partial file
+        tmp_path = directory / f'.{name}.tmp'
+        pq.write_table(table, tmp_path, row_group_size=self.row_group_size)
+        tmp_path.replace(directory / name)
+
+    def _schema(self, kind: str):
+        """
+        Union of every file's columns for one kind. Models (and model versions)
+        write different columns to the same kind, so no single file's schema
+        describes the dataset.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        discovered = ds.dataset(self.root / kind, format='parquet', partitioning=_partitioning(),
+                                exclude_invalid_files=False, ignore_prefixes=['.', '_'])
+        schemas = [fragment.physical_schema for fragment in discovered.get_fragments()]
+        return pa.unify_schemas(schemas + [_partitioning().schema], promote_options='default')
+
+    def _dataset(self, kind: str):
+        import pyarrow.dataset as ds
+
+        return ds.dataset(self.root / kind, schema=self._schema(kind), format='parquet',
+                          partitioning=_partitioning(), exclude_invalid_files=False,
+                          ignore_prefixes=['.', '_'])
+
+    def read(
+        self,
+        kind: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List] = None
+    ) -> pd.DataFrame:
+        """
+        Load matching rows of one output kind.
+
+        Parameters:
+        -----------
+        kind : str
+            Output table name
+        columns : list, optional
+            Columns to read (others are never decoded)
+        filters : list, optional
+            pyarrow DNF filters, e.g. [('model', '=', 'lbo'), ('date', '>=', '2025-01-01'),
+            ('deal', 'in', ['ACME'])]; partition keys prune directories, other
+            columns prune row groups
+
+        Returns:
+        --------
+        pd.DataFrame
+        """
+        import pyarrow.parquet as pq
+
+        path = self.root / kind
+        if not path.exists():
+            return pd.DataFrame(columns=columns or [])
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=True,
+                              schema=self._schema(kind), partitioning=_partitioning(),
+                              ignore_prefixes=['.', '_'])
+        return table.to_pandas()
+
+    def scan(
+        self,
+        kind: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List] = None,
+        batch_size: int = 100_000
+    ) -> Iterator[pd.DataFrame]:
+        """Like read(), but yields record batches - for aggregations over long histories"""
+        import pyarrow.parquet as pq
+
+        path = self.root / kind
+        if not path.exists():
+            return
+        expression = pq.filters_to_expression(filters) if filters else None
+        for batch in self._dataset(kind).to_batches(columns=columns, filter=expression,
+                                                    batch_size=batch_size):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def runs(self, filters: Optional[List] = None) -> pd.DataFrame:
+        """Run registry: run_id, model, date, timestamp, status, params, outputs"""
+        runs = self.read(RUNS, filters=filters)
+        return runs.drop(columns='deal', errors='ignore').sort_values('timestamp', ignore_index=True)
+
+    def kinds(self) -> List[str]:
+        """Output kinds present in the store"""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and p.name != RUNS)
+
+    def compact(self, kind: str, before: Optional[str] = None) -> int:
+        """
+        Merge each (model, date) partition's files into one file sorted by deal.
+
+        Per-run files are small and each spans every deal, so deal filters
+        cannot skip them; one sorted file per day has tight row-group ranges.
+        Run it on closed days (`before` = 'YYYY-MM-DD', exclusive) while no
+        run is writing to them.
+
+        Returns:
+        --------
+        int
+            Number of files removed
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        removed = 0
+        for directory in sorted((self.root / kind).glob('model=*/date=*')):
+            date = directory.name.split('=', 1)[1]
+            files = sorted(directory.glob('*.parquet'))
+            if len(files) < 2 or (before is not None and date >= before):
+                continue
+            table = pa.concat_tables([pq.read_table(f, memory_map=True) for f in files],
+                                     promote_options='default')
+            table = table.sort_by([('deal', 'ascending'), ('timestamp', 'ascending')])
+            tmp_path = directory / '.compacted.tmp'
+            pq.write_table(table, tmp_path, row_group_size=self.row_group_size)
+            tmp_path.replace(directory / f'compacted-{date}.parquet')
+            for f in files:
+                if f.name != f'compacted-{date}.parquet':
+                    f.unlink()
+                    removed += 1
+        return removed
+
+
+def example_results_store():
+    """Four months of nightly LBO runs, then dashboard queries against the store"""
+    import shutil
+    import tempfile
+    import time
+
+    print("\n" + "="*80)
+    print("PARQUET RESULTS STORE")
+    print("="*80)
+
+    root = Path(tempfile.mkdtemp(prefix='results_'))
+    store = ResultsStore(root)
+    rng = np.random.default_rng(42)
+    deals = np.array([f'DEAL-{i:03d}' for i in range(300)])
+    days = pd.date_range('2025-06-02', periods=120, freq='D', tz='UTC') + pd.Timedelta(hours=22)
+
+    # Nightly: base + downside projections and debt schedules for 300 deals,
+    # a Monte Carlo summary for 100 deals and one sensitivity grid
+    start = time.perf_counter()
+    ebitda0 = rng.uniform(20, 200, len(deals))
+    years = np.arange(1, 6)
+    for day in days:
+        drift = rng.normal(0, 0.01, len(deals))
+        for scenario, growth in [('base', 1.06), ('downside', 1.01)]:
+            with store.run('lbo', params={'scenario': scenario}, timestamp=day) as run:
+                ebitda = ebitda0[:, None] * (growth + drift[:, None]) ** years
+                run.write('projections', pd.DataFrame({
+                    'deal': np.repeat(deals, 5), 'scenario': scenario, 'year': np.tile(years, len(deals)),
+                    'ebitda': ebitda.ravel(), 'fcf': (ebitda * 0.45).ravel()}))
+                debt = ebitda0[:, None] * 5 * (1 - 0.12 * years)
+                run.write('debt_schedule', pd.DataFrame({
+                    'deal': np.repeat(deals, 5), 'scenario': scenario, 'year': np.tile(years, len(deals)),
+                    'total_debt': np.broadcast_to(debt, ebitda.shape).ravel()}))
+        with store.run('lbo_mc', params={'iterations': 1_000}, timestamp=day) as run:
+            irr = rng.normal(0.20 + drift[:100], 0.06, (1_000, 100))
+            simulations = pd.DataFrame({'deal': np.tile(deals[:100], 1_000), 'irr': irr.ravel(),
+                                        'moic': ((1 + irr) ** 5).ravel()})
+            run.write('mc_summary', summarize_simulation(simulations, by='deal'))
+            grid = pd.DataFrame(rng.normal(0.2, 0.05, (7, 7)),
+                                index=[f'{m:.1f}x' for m in np.arange(8, 11.5, 0.5)],
+                                columns=[f'{g:.0%}' for g in np.arange(0.02, 0.09, 0.01)])
+            run.write('sensitivity', tidy_grid(grid, 'irr'), deal='DEAL-000')
+    write_s = time.perf_counter() - start
+    size = sum(f.stat().st_size for f in root.rglob('*.parquet'))
+    print(f"\nWrote {len(store.runs()):,} runs over {len(days)} days in {write_s:.1f} s "
+          f"({sum(1 for _ in root.rglob('*.parquet')):,} files, {size / 1e6:.1f} MB)")
+    print(f"Kinds: {store.kinds()}")
+
+    # Dashboard query: one deal's median IRR over the last 30 days
+    filters = [('model', '=', 'lbo_mc'), ('date', '>=', '2025-08-31'),
+               ('deal', '=', 'DEAL-042'), ('metric', '=', 'irr')]
+
+    def timed(fn):
+        t = time.perf_counter()
+        out = fn()
+        return out, time.perf_counter() - t
+
+    history, pushdown_s = timed(
+        lambda: store.read('mc_summary', columns=['timestamp', 'p50'], filters=filters))
+
+    everything, full_s = timed(lambda: pd.concat(
+        pd.read_parquet(f).assign(model=f.parent.parent.name[6:], date=f.parent.name[5:])
+        for f in (root / 'mc_summary').rglob('*.parquet')))
+    full = everything[(everything['model'] == 'lbo_mc') & (everything['date'] >= '2025-08-31')
+                      & (everything['deal'] == 'DEAL-042') & (everything['metric'] == 'irr')]
+    print(f"\nDEAL-042 median IRR, last 30 days ({len(history)} rows):")
+    print(f"  Filtered read (pruning + pushdown): {pushdown_s * 1000:6.0f} ms, {len(history):>9,} rows materialized")
+    print(f"  Load everything, filter in pandas:  {full_s * 1000:6.0f} ms, {len(everything):>9,} rows materialized")
+    print(f"  Same rows: {np.allclose(np.sort(history['p50']), np.sort(full['p50']))}")
+
+    # Compact closed days: one sorted file per day, deal filters skip row groups
+    removed = store.compact('projections', before='2025-09-30')
+    deal_history, compact_s = timed(lambda: store.read(
+        'projections', columns=['timestamp', 'year', 'ebitda'],
+        filters=[('model', '=', 'lbo'), ('deal', '=', 'DEAL-007'), ('scenario', '=', 'base'),
+                 ('year', '=', 5)]))
+    print(f"\nCompacted projections ({removed} files merged); DEAL-007 year-5 EBITDA history "
+          f"({len(deal_history)} days) in {compact_s * 1000:.0f} ms")
+
+    # Streamed aggregation across all history
+    start = time.perf_counter()
+    total = sum(batch['total_debt'].sum() for batch in store.scan('debt_schedule', columns=['total_debt'],
+                                                                    filters=[('year', '=', 5)]))
+    print(f"Streamed aggregate over all debt schedules: {total:,.0f} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(f"\nLatest runs:")
+    print(store.runs().tail(4)[['run_id', 'model', 'date', 'status', 'outputs']].to_string(index=False))
+
+    shutil.rmtree(root)
+    return store
+
+
+if __name__ == "__main__":
+    store = example_results_store()
@@ -32,6 +32,9 @@ class LBOModelMonteCarlo:
     Combines traditional LBO modeling with probabilistic analysis.
     """
     
+    # Shared memo of results (e.g. model_cache.ModelCache); None computes directly
+    cache = None
+    
     def __init__(
         self,
         company_name: str,
@@ -74,6 +77,14 @@ class LBOModelMonteCarlo:
         self.entry_ev = entry_ebitda * entry_multiple
         self.total_debt = senior_debt + mezz_debt
         self.total_sources = senior_debt + mezz_debt + equity
+    
+    def _memo(self, name: str, inputs, compute):
+        """compute(), or the cached result for the same deal and inputs"""
+        if self.cache is None:
+            return compute()
+        deal = (self.entry_ebitda, self.entry_multiple, self.senior_debt, self.mezz_debt,
+                self.equity, self.holding_period)
+        return self.cache.get_or_compute(f'{type(self).__name__}.{name}', (deal, inputs), compute)
         
     def calculate_base_case(
         self,
@@ -101,6 +112,13 @@ class LBOModelMonteCarlo:
         dict
             Returns metrics (MOIC, IRR, exit values)
         """
+        return self._memo(
+            'calculate_base_case', (revenue_growth, ebitda_margin, exit_multiple, debt_paydown_pct),
+            lambda: self._base_case(revenue_growth, exit_multiple, debt_paydown_pct))
+    
+    def _base_case(self, revenue_growth: float, exit_multiple: float,
+                   debt_paydown_pct: float) -> Dict[str, float]:
+        """calculate_base_case() without the cache"""
         # Calculate exit EBITDA
         revenue_multiplier = (1 + revenue_growth) ** self.holding_period
         exit_ebitda = self.entry_ebitda * revenue_multiplier
@@ -127,6 +145,46 @@ class LBOModelMonteCarlo:
             'irr': irr
         }
     
+    @classmethod
+    def base_case_batch(cls, deals) -> pd.DataFrame:
+        """
+        calculate_base_case() for many deals at once.
+        
+        Parameters:
+        -----------
+        deals : mapping of str -> array
+            One value per deal (e.g. a deal_book.DealBatch): entry_ebitda,
+            senior_debt, mezz_debt, equity, holding_period, revenue_growth,
+            exit_multiple, debt_paydown_pct
+        
+        Returns:
+        --------
+        pd.DataFrame
+            One row per deal with the calculate_base_case() keys
+        """
+        def column(name):
+            return np.asarray(deals[name], dtype=np.float64)
+        
+        holding_period = column('holding_period')
+        equity = column('equity')
+        exit_ebitda = column('entry_ebitda') * (1 + column('revenue_growth')) ** holding_period
+        exit_ev = exit_ebitda * column('exit_multiple')
+        remaining_debt = (column('senior_debt') + column('mezz_debt')) * (1 - column('debt_paydown_pct'))
+        exit_equity_value = exit_ev - remaining_debt
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moic = np.where(equity > 0, exit_equity_value / equity, 0.0)
+            irr = np.where(moic > 0, np.abs(moic) ** (1 / holding_period) - 1, -1.0)
+        
+        return pd.DataFrame({
+            'exit_ebitda': exit_ebitda,
+            'exit_ev': exit_ev,
+            'remaining_debt': remaining_debt,
+            'exit_equity_value': exit_equity_value,
+            'moic': moic,
+            'irr': irr
+        })
+    
     def monte_carlo_simulation(
         self,
         iterations: int = 10_000,
@@ -162,8 +220,24 @@ class LBOModelMonteCarlo:
         Returns:
         --------
         pd.DataFrame
-            Simulation results with all scenarios
+            Simulation results with all scenarios (seeded, so identical
+            inputs give identical results)
         """
+        inputs = (iterations, revenue_growth_mean, revenue_growth_std, exit_multiple_mean,
+                  exit_multiple_std, ebitda_margin_mean, ebitda_margin_std)
+        return self._memo('monte_carlo_simulation', inputs, lambda: self._simulate(*inputs))
+    
+    def _simulate(
+        self,
+        iterations: int,
+        revenue_growth_mean: float,
+        revenue_growth_std: float,
+        exit_multiple_mean: float,
+        exit_multiple_std: float,
+        ebitda_margin_mean: float,
+        ebitda_margin_std: float
+    ) -> pd.DataFrame:
+        """monte_carlo_simulation() without the cache"""
         results = []
         np.random.seed(42)
         
@@ -295,11 +369,16 @@ class LBOModelMonteCarlo:
             print(f"   Risk/reward not attractive")
 
 
-def project_1_complete_lbo():
+def project_1_complete_lbo(results_store=None):
     """
     PROJECT 1: Complete LBO Model with Monte Carlo
     
     Real PE deal analysis with probabilistic outcomes!
+    
+    Parameters:
+    -----------
+    results_store : results_store.ResultsStore, optional
+        If given, the base case and Monte Carlo summary are recorded as a run
     """
     print("\n" + "█"*80)
     print("PROJECT 1: COMPLETE LBO MODEL WITH MONTE CARLO SIMULATION")
@@ -329,6 +408,14 @@ def project_1_complete_lbo():
     # Analyze results
     lbo.analyze_results(mc_results)
     
+    if results_store is not None:
+        from results_store import summarize_simulation
+        
+        with results_store.run('lbo_mc', params={'iterations': 10_000}) as run:
+            run.write('base_case', pd.DataFrame([lbo.calculate_base_case()]), deal=lbo.company_name)
+            run.write('mc_summary', summarize_simulation(mc_results), deal=lbo.company_name)
+        print(f"\nResults recorded as run {run.run_id}")
+    
     print(f"\n✅ Project 1 Complete! IC-ready analysis generated.")
     print(f"   This level of analysis separates you from 95% of analysts!\n")
     
@@ -347,7 +434,15 @@ class DCFValuationTool:
     Production-ready for PE Club deal analysis.
     """
     
-    def __init__(self, ticker: str):
+    # Base-case projection assumptions
+    REVENUE_GROWTH_RATES = [0.10, 0.10, 0.10, 0.07, 0.07]
+    NWC_PCT = 0.10
+    TERMINAL_GROWTH = 0.03
+    
+    # Shared memo of results (e.g. model_cache.ModelCache); None computes directly
+    cache = None
+    
+    def __init__(self, ticker: str, financial_data: Optional[Dict[str, float]] = None):
         """
         Initialize DCF model for a public company.
         
@@ -355,12 +450,19 @@ class DCFValuationTool:
         -----------
         ticker : str
             Stock ticker symbol (e.g., 'MSFT')
+        financial_data : dict, optional
+            Pre-fetched fundamentals (e.g., from fundamentals_fetcher.py);
+            same keys as get_financial_data()
         """
         self.ticker = ticker
+        self.financial_data = financial_data
         self.company_name = self._get_company_name()
         
     def _get_company_name(self) -> str:
         """Get company name (in production, use yfinance)."""
+        if self.financial_data and 'company_name' in self.financial_data:
+            return self.financial_data['company_name']
+        
         # Simulated data for demonstration
         company_names = {
             'MSFT': 'Microsoft Corporation',
@@ -382,6 +484,9 @@ class DCFValuationTool:
         dict
             Financial data (income statement, balance sheet, etc.)
         """
+        if self.financial_data is not None:
+            return self.financial_data
+        
         # Simulated data (in production, use yfinance)
         if self.ticker == 'MSFT':
             return {
@@ -461,6 +566,12 @@ class DCFValuationTool:
         
         return wacc
     
+    def _memo(self, name: str, inputs, compute):
+        """compute(), or the cached result for the same inputs"""
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(f'{type(self).__name__}.{name}', inputs, compute)
+    
     def project_cash_flows(
         self,
         revenue_start: float,
@@ -496,6 +607,21 @@ class DCFValuationTool:
         pd.DataFrame
             Projected cash flows
         """
+        inputs = (revenue_start, revenue_growth_rates, ebitda_margin, tax_rate, capex_pct,
+                  nwc_pct, da_pct)
+        return self._memo('project_cash_flows', inputs, lambda: self._project(*inputs))
+    
+    def _project(
+        self,
+        revenue_start: float,
+        revenue_growth_rates: List[float],
+        ebitda_margin: float,
+        tax_rate: float,
+        capex_pct: float,
+        nwc_pct: float,
+        da_pct: float
+    ) -> pd.DataFrame:
+        """project_cash_flows() without the cache"""
         projections = []
         revenue = revenue_start
         
@@ -575,6 +701,22 @@ class DCFValuationTool:
         dict
             Valuation summary
         """
+        inputs = (fcf_projections[['Year', 'FCF']], terminal_fcf, terminal_growth, wacc,
+                  net_debt, shares_outstanding)
+        return self._memo('calculate_dcf_valuation', inputs,
+                          lambda: self._value(fcf_projections, terminal_fcf, terminal_growth, wacc,
+                                              net_debt, shares_outstanding))
+    
+    def _value(
+        self,
+        fcf_projections: pd.DataFrame,
+        terminal_fcf: float,
+        terminal_growth: float,
+        wacc: float,
+        net_debt: float,
+        shares_outstanding: float
+    ) -> Dict[str, float]:
+        """calculate_dcf_valuation() without the cache"""
         # PV of cash flows
         pv_fcf = 0
         for _, row in fcf_projections.iterrows():
@@ -640,26 +782,17 @@ class DCFValuationTool:
         print(f"  Terminal Growth:          3.0%")
         
         # Project cash flows
-        growth_rates = [0.10, 0.10, 0.10, 0.07, 0.07]
-        projections = self.project_cash_flows(
-            revenue_start=data['revenue_latest'],
-            revenue_growth_rates=growth_rates,
-            ebitda_margin=data['ebitda_margin'],
-            tax_rate=data['tax_rate'],
-            capex_pct=data['capex_pct_revenue'],
-            nwc_pct=0.10
-        )
+        projections = self._base_case_projections(data)
         
         print(f"\nPROJECTED FREE CASH FLOWS:")
         for _, row in projections.iterrows():
             print(f"  Year {row['Year']:.0f}:                   ${row['FCF']:,.0f}M")
         
         # Calculate valuation
-        terminal_fcf = projections.iloc[-1]['FCF']
         valuation = self.calculate_dcf_valuation(
             fcf_projections=projections,
-            terminal_fcf=terminal_fcf,
-            terminal_growth=0.03,
+            terminal_fcf=projections.iloc[-1]['FCF'],
+            terminal_growth=self.TERMINAL_GROWTH,
             wacc=wacc,
             net_debt=data['net_debt'],
             shares_outstanding=data['shares_outstanding']
@@ -691,6 +824,206 @@ class DCFValuationTool:
         else:
             print(f"\n❌ SELL / AVOID")
             print(f"   Stock appears overvalued ({upside*100:.0f}% downside)")
+    
+    def _base_case_projections(self, data: Dict[str, float]) -> pd.DataFrame:
+        """Cash flow projections under the base-case assumptions."""
+        return self.project_cash_flows(
+            revenue_start=data['revenue_latest'],
+            revenue_growth_rates=self.REVENUE_GROWTH_RATES,
+            ebitda_margin=data['ebitda_margin'],
+            tax_rate=data['tax_rate'],
+            capex_pct=data['capex_pct_revenue'],
+            nwc_pct=self.NWC_PCT
+        )
+    
+    @staticmethod
+    def recommendation(upside: float) -> str:
+        """BUY above +20% upside, HOLD above 0%, otherwise SELL."""
+        if upside > 0.20:
+            return 'BUY'
+        elif upside > 0:
+            return 'HOLD'
+        return 'SELL'
+    
+    def valuation_summary(self) -> Dict[str, float]:
+        """
+        Base-case valuation without printing (used for batch runs).
+        
+        Returns:
+        --------
+        dict
+            WACC, enterprise / equity value, value per share, upside and
+            recommendation
+        """
+        data = self.get_financial_data()
+        wacc = self.calculate_wacc(beta=data['beta'], tax_rate=data['tax_rate'])
+        projections = self._base_case_projections(data)
+        
+        valuation = self.calculate_dcf_valuation(
+            fcf_projections=projections,
+            terminal_fcf=projections.iloc[-1]['FCF'],
+            terminal_growth=self.TERMINAL_GROWTH,
+            wacc=wacc,
+            net_debt=data['net_debt'],
+            shares_outstanding=data['shares_outstanding']
+        )
+        upside = (valuation['value_per_share'] - data['current_price']) / data['current_price']
+        
+        return {
+            'ticker': self.ticker,
+            'company_name': self.company_name,
+            'wacc': wacc,
+            'enterprise_value': valuation['enterprise_value'],
+            'equity_value': valuation['equity_value'],
+            'value_per_share': valuation['value_per_share'],
+            'current_price': data['current_price'],
+            'upside': upside,
+            'recommendation': self.recommendation(upside)
+        }
+    
+    @classmethod
+    def project_universe_cash_flows(
+        cls,
+        fundamentals: pd.DataFrame,
+        revenue_growth_rates: Optional[np.ndarray] = None,
+        nwc_pct: Optional[float] = None,
+        da_pct: float = 0.05
+    ) -> Dict[str, np.ndarray]:
+        """
+        project_cash_flows() for many companies at once.
+        
+        Parameters:
+        -----------
+        fundamentals : pd.DataFrame
+            One row per ticker with get_financial_data() columns
+        revenue_growth_rates : np.ndarray, optional
+            (n_years,) shared or (n_tickers × n_years) per-ticker growth rates
+            (defaults to REVENUE_GROWTH_RATES)
+        nwc_pct : float, optional
+            NWC change as % of revenue growth (defaults to NWC_PCT)
+        da_pct : float
+            D&A as % of revenue
+        
+        Returns:
+        --------
+        dict
+            (n_tickers × n_years) arrays: Revenue, EBITDA, D&A, EBIT, Tax,
+            NOPAT, CapEx, Δ NWC, FCF
+        """
+        growth = np.asarray(cls.REVENUE_GROWTH_RATES if revenue_growth_rates is None
+                            else revenue_growth_rates, dtype=np.float64)
+        growth = np.broadcast_to(np.atleast_2d(growth), (len(fundamentals), growth.shape[-1]))
+        nwc_pct = cls.NWC_PCT if nwc_pct is None else nwc_pct
+        
+        def column(name):
+            return fundamentals[name].to_numpy(dtype=np.float64)[:, None]
+        
+        revenue_start = column('revenue_latest')
+        revenue = revenue_start * np.cumprod(1 + growth, axis=1)
+        prev_revenue = np.hstack([revenue_start, revenue[:, :-1]])
+        
+        ebitda = revenue * column('ebitda_margin')
+        da = revenue * da_pct
+        ebit = ebitda - da
+        tax = ebit * column('tax_rate')
+        nopat = ebit - tax
+        capex = revenue * column('capex_pct_revenue')
+        delta_nwc = (revenue - prev_revenue) * nwc_pct
+        
+        return {
+            'Revenue': revenue,
+            'EBITDA': ebitda,
+            'D&A': da,
+            'EBIT': ebit,
+            'Tax': tax,
+            'NOPAT': nopat,
+            'CapEx': capex,
+            'Δ NWC': delta_nwc,
+            'FCF': nopat + da - capex - delta_nwc
+        }
+    
+    @classmethod
+    def value_universe(
+        cls,
+        fundamentals: pd.DataFrame,
+        revenue_growth_rates: Optional[np.ndarray] = None,
+        terminal_growth: Optional[float] = None,
+        risk_free_rate: float = 0.04,
+        market_risk_premium: float = 0.06,
+        cost_of_debt: float = 0.04,
+        debt_to_equity: float = 0.30
+    ) -> pd.DataFrame:
+        """
+        Base-case DCF for a whole universe as (n_tickers × n_years) arrays.
+        
+        Same math as valuation_summary(), without per-ticker loops.
+        
+        Parameters:
+        -----------
+        fundamentals : pd.DataFrame
+            One row per ticker ('ticker' column or index) with the
+            get_financial_data() columns
+        revenue_growth_rates : np.ndarray, optional
+            Shared (n_years,) or per-ticker (n_tickers × n_years) growth
+        terminal_growth : float, optional
+            Perpetuity growth (defaults to TERMINAL_GROWTH)
+        risk_free_rate, market_risk_premium, cost_of_debt, debt_to_equity : float
+            WACC inputs shared by all tickers (beta and tax rate per ticker);
+            ignored when fundamentals already has a per-ticker 'wacc' column
+            (e.g. from Module_04_DCF_Modeling/beta_service.py)
+        
+        Returns:
+        --------
+        pd.DataFrame
+            Valuation per ticker ranked by upside
+        """
+        terminal_growth = cls.TERMINAL_GROWTH if terminal_growth is None else terminal_growth
+        if 'ticker' not in fundamentals.columns:
+            fundamentals = fundamentals.rename_axis('ticker').reset_index()
+        
+        fcf = cls.project_universe_cash_flows(fundamentals, revenue_growth_rates)['FCF']
+        n_years = fcf.shape[1]
+        
+        # WACC (CAPM cost of equity, fixed capital structure)
+        if 'wacc' in fundamentals.columns:
+            wacc = fundamentals['wacc'].to_numpy(dtype=np.float64)
+        else:
+            beta = fundamentals['beta'].to_numpy(dtype=np.float64)
+            tax_rate = fundamentals['tax_rate'].to_numpy(dtype=np.float64)
+            equity_weight = 1 / (1 + debt_to_equity)
+            debt_weight = debt_to_equity / (1 + debt_to_equity)
+            wacc = (equity_weight * (risk_free_rate + beta * market_risk_premium)
+                    + debt_weight * cost_of_debt * (1 - tax_rate))
+        
+        discount = (1 + wacc[:, None]) ** -np.arange(1, n_years + 1)
+        pv_fcf = (fcf * discount).sum(axis=1)
+        terminal_value = fcf[:, -1] * (1 + terminal_growth) / (wacc - terminal_growth)
+        pv_terminal = terminal_value * discount[:, -1]
+        
+        enterprise_value = pv_fcf + pv_terminal
+        equity_value = enterprise_value - fundamentals['net_debt'].to_numpy(dtype=np.float64)
+        value_per_share = equity_value / fundamentals['shares_outstanding'].to_numpy(dtype=np.float64)
+        current_price = fundamentals['current_price'].to_numpy(dtype=np.float64)
+        upside = (value_per_share - current_price) / current_price
+        
+        results = pd.DataFrame({
+            'ticker': fundamentals['ticker'].to_numpy(),
+            'wacc': wacc,
+            'pv_fcf': pv_fcf,
+            'pv_terminal': pv_terminal,
+            'enterprise_value': enterprise_value,
+            'equity_value': equity_value,
+            'value_per_share': value_per_share,
+            'current_price': current_price,
+            'upside': upside,
+            'recommendation': np.select([upside > 0.20, upside > 0], ['BUY', 'HOLD'], 'SELL')
+        })
+        if 'company_name' in fundamentals.columns:
+            results.insert(1, 'company_name', fundamentals['company_name'].to_numpy())
+        
+        results = results.sort_values('upside', ascending=False, ignore_index=True)
+        results.insert(0, 'rank', np.arange(1, len(results) + 1))
+        return results
 
 
 def project_2_dcf_tool():
@@ -709,6 +1042,35 @@ def project_2_dcf_tool():
     # Generate report
     dcf.generate_valuation_report()
     
+    # Universe mode: value a whole coverage list in one vectorized pass
+    import time
+    rng = np.random.default_rng(42)
+    n_names = 5_000
+    revenue = rng.lognormal(np.log(20_000), 1.0, n_names)
+    margin = rng.uniform(0.10, 0.45, n_names)
+    shares = rng.uniform(200, 8_000, n_names)
+    net_debt = revenue * margin * rng.uniform(-0.5, 2.5, n_names)
+    universe = pd.DataFrame({
+        'ticker': [f'T{i:04d}' for i in range(n_names)],
+        'current_price': (revenue * margin * rng.uniform(8, 25, n_names) - net_debt) / shares,
+        'shares_outstanding': shares,
+        'revenue_latest': revenue,
+        'ebitda_margin': margin,
+        'capex_pct_revenue': rng.uniform(0.02, 0.15, n_names),
+        'net_debt': net_debt,
+        'beta': rng.uniform(0.6, 1.6, n_names),
+        'tax_rate': 0.21
+    })
+    
+    start = time.perf_counter()
+    ranked = DCFValuationTool.value_universe(universe)
+    elapsed = time.perf_counter() - start
+    
+    print(f"\nUNIVERSE MODE ({n_names:,} names in {elapsed*1000:.0f} ms):")
+    print(ranked.head(5)[['rank', 'ticker', 'wacc', 'value_per_share', 'current_price',
+                          'upside', 'recommendation']].round(3).to_string(index=False))
+    print(f"  Recommendations: {ranked['recommendation'].value_counts().to_dict()}")
+    
     print(f"\n✅ Project 2 Complete! Automated DCF valuation generated.")
     print(f"   In production, this pulls live data from APIs!\n")
     
@@ -777,13 +1139,15 @@ class MASynergyAnalyzer:
         self,
         identified_synergies: float,
         revenue_overlap_pct: float = 0.40,
-        geo_overlap_pct: float = 0.60
+        geo_overlap_pct: float = 0.60,
+        capture_model=None
     ) -> Dict[str, float]:
         """
         Use ML to predict realistic synergy capture.
         
-        In production: Trains Random Forest on historical deals
-        For demo: Uses simplified logic
+        With a trained `SynergyCaptureModel` (synergy_capture_model.py) the
+        Random Forest fitted on historical deals is used; without one, falls
+        back to simplified overlap / size logic.
         
         Parameters:
         -----------
@@ -793,23 +1157,35 @@ class MASynergyAnalyzer:
             Revenue overlap between companies
         geo_overlap_pct : float
             Geographic overlap
+        capture_model : SynergyCaptureModel, optional
+            Trained capture model (anything with a batch `predict(DataFrame)`)
         
         Returns:
         --------
         dict
             Predicted synergies and capture rate
         """
-        # Simplified ML prediction (in production, use trained model)
-        # Higher overlap = higher capture rate
-        base_capture_rate = 0.50
-        
-        overlap_boost = (revenue_overlap_pct + geo_overlap_pct) / 2 * 0.40
-        predicted_capture_rate = base_capture_rate + overlap_boost
-        
-        # Adjust for deal size (larger deals harder to integrate)
         size_ratio = self.target_revenue / self.acquirer_revenue
-        if size_ratio > 0.50:
-            predicted_capture_rate *= 0.90  # 10% haircut for large deals
+        
+        if capture_model is not None:
+            deal = pd.DataFrame([{
+                'revenue_overlap_pct': revenue_overlap_pct,
+                'geo_overlap_pct': geo_overlap_pct,
+                'size_ratio': size_ratio,
+                'synergy_pct_target_revenue': identified_synergies / self.target_revenue,
+                'target_ebitda_margin': self.target_ebitda / self.target_revenue
+            }])
+            predicted_capture_rate = float(capture_model.predict(deal)[0])
+        else:
+            # Simplified prediction: higher overlap = higher capture rate
+            base_capture_rate = 0.50
+            
+            overlap_boost = (revenue_overlap_pct + geo_overlap_pct) / 2 * 0.40
+            predicted_capture_rate = base_capture_rate + overlap_boost
+            
+            # Adjust for deal size (larger deals harder to integrate)
+            if size_ratio > 0.50:
+                predicted_capture_rate *= 0.90  # 10% haircut for large deals
         
         predicted_synergies = identified_synergies * predicted_capture_rate
         
@@ -898,9 +1274,105 @@ class MASynergyAnalyzer:
             'accretion_syn': accretion_syn,
             'total_shares': total_shares
         }
-    
-    def generate_analysis(self, identified_synergies: float = 200.0) -> None:
-        """Generate complete M&A analysis report."""
+
+    def accretion_dilution_grid(
+        self,
+        offer_prices: List[float],
+        stock_pcts: List[float],
+        synergy_captures: List[float],
+        interest_rates: List[float],
+        tax_rates: List[float],
+        identified_synergies: float = 200.0,
+        acquirer_share_price: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Accretion/dilution over a full 5-D deal grid in one vectorized call.
+
+        Same EPS build as calculate_accretion_dilution(), broadcast over
+        offer price × % stock × synergy capture × interest rate × tax rate.
+
+        Parameters:
+        -----------
+        offer_prices : list
+            Purchase prices to test (millions)
+        stock_pcts : list
+            Share of consideration paid in acquirer stock (rest is new debt)
+        synergy_captures : list
+            Share of identified synergies realized (e.g., 0.5 to 1.0)
+        interest_rates : list
+            Interest rates on acquisition debt
+        tax_rates : list
+            Corporate tax rates
+        identified_synergies : float
+            Management's identified synergies (millions)
+        acquirer_share_price : float, optional
+            Price at which new shares are issued. Defaults to the price implied
+            by the base deal (50% stock funding `shares_issued`).
+
+        Returns:
+        --------
+        pd.DataFrame
+            One row per grid point with pro forma EPS, accretion with and
+            without synergies, and breakeven synergies
+        """
+        if acquirer_share_price is None:
+            acquirer_share_price = self.purchase_price * 0.50 / self.shares_issued
+
+        # Axes shaped for broadcasting: (price, stock, capture, rate, tax)
+        price = np.asarray(offer_prices, dtype=float).reshape(-1, 1, 1, 1, 1)
+        stock_pct = np.asarray(stock_pcts, dtype=float).reshape(1, -1, 1, 1, 1)
+        capture = np.asarray(synergy_captures, dtype=float).reshape(1, 1, -1, 1, 1)
+        rate = np.asarray(interest_rates, dtype=float).reshape(1, 1, 1, -1, 1)
+        tax = np.asarray(tax_rates, dtype=float).reshape(1, 1, 1, 1, -1)
+
+        # Standalone acquirer (same assumptions as calculate_accretion_dilution)
+        acquirer_da = self.acquirer_ebitda * 0.25
+        acquirer_interest = self.acquirer_revenue * 0.025
+        acquirer_ebt = self.acquirer_ebitda - acquirer_da - acquirer_interest
+        acquirer_eps = acquirer_ebt * (1 - tax) / self.shares_acquirer
+
+        # Pro forma pre-tax income before synergies
+        target_da = self.target_ebitda * 0.25
+        target_interest = self.target_revenue * 0.025
+        additional_interest = price * (1 - stock_pct) * rate
+        proforma_ebt = (self.acquirer_ebitda + self.target_ebitda
+                        - acquirer_da - target_da
+                        - acquirer_interest - target_interest
+                        - additional_interest)
+
+        # Share count from stock consideration
+        total_shares = self.shares_acquirer + price * stock_pct / acquirer_share_price
+
+        synergies = identified_synergies * capture
+        proforma_eps_no_syn = proforma_ebt * (1 - tax) / total_shares
+        proforma_eps_syn = (proforma_ebt + synergies) * (1 - tax) / total_shares
+
+        accretion_no_syn = (proforma_eps_no_syn - acquirer_eps) / acquirer_eps
+        accretion_syn = (proforma_eps_syn - acquirer_eps) / acquirer_eps
+
+        # Pre-tax synergies that bring pro forma EPS back to standalone EPS
+        breakeven_synergies = np.maximum(
+            acquirer_eps * total_shares / (1 - tax) - proforma_ebt, 0.0)
+
+        shape = np.broadcast_shapes(price.shape, stock_pct.shape, capture.shape,
+                                    rate.shape, tax.shape)
+        index = pd.MultiIndex.from_product(
+            [offer_prices, stock_pcts, synergy_captures, interest_rates, tax_rates],
+            names=['offer_price', 'stock_pct', 'synergy_capture', 'interest_rate', 'tax_rate']
+        )
+
+        return pd.DataFrame({
+            'acquirer_eps': np.broadcast_to(acquirer_eps, shape).ravel(),
+            'proforma_eps_no_syn': np.broadcast_to(proforma_eps_no_syn, shape).ravel(),
+            'proforma_eps_syn': np.broadcast_to(proforma_eps_syn, shape).ravel(),
+            'accretion_no_syn': np.broadcast_to(accretion_no_syn, shape).ravel(),
+            'accretion_syn': np.broadcast_to(accretion_syn, shape).ravel(),
+            'breakeven_synergies': np.broadcast_to(breakeven_synergies, shape).ravel(),
+            'total_shares': np.broadcast_to(total_shares, shape).ravel()
+        }, index=index)
+
+    def generate_analysis(self, identified_synergies: float = 200.0, capture_model=None) -> None:
+        """Generate complete M&A analysis report (optionally with a trained capture model)."""
         print("\n" + "="*80)
         print(f"M&A SYNERGY ANALYSIS: {self.acquirer_name} + {self.target_name}")
         print("="*80)
@@ -920,10 +1392,14 @@ class MASynergyAnalyzer:
         print(f"  New Shares Issued:        {self.shares_issued:.0f}M")
         
         # ML synergy prediction
-        synergies = self.predict_synergy_capture(identified_synergies)
+        synergies = self.predict_synergy_capture(identified_synergies,
+                                                 capture_model=capture_model)
         
         print(f"\nMACHINE LEARNING SYNERGY PREDICTION:")
-        print(f"  Model: Random Forest (trained on historical M&A deals)")
+        if capture_model is not None:
+            print(f"  Model: Random Forest (trained on historical M&A deals)")
+        else:
+            print(f"  Model: Overlap / size heuristic (no trained model supplied)")
         print(f"\n  Identified Synergies:     €{synergies['identified']:.0f}M")
         print(f"  ML-Predicted Synergies:   €{synergies['predicted']:.0f}M")
         print(f"  Implied Capture Rate:     {synergies['capture_rate']*100:.0f}%")
@@ -988,7 +1464,23 @@ def project_3_ma_analyzer():
     
     # Generate analysis
     ma.generate_analysis(identified_synergies=200.0)
-    
+
+    # Board view: full deal surface in one vectorized call
+    grid = ma.accretion_dilution_grid(
+        offer_prices=[1000, 1100, 1200, 1300, 1400, 1500, 1600],
+        stock_pcts=[0.0, 0.25, 0.50, 0.75, 1.0],
+        synergy_captures=[0.4, 0.6, 0.8, 1.0, 1.2],
+        interest_rates=[0.04, 0.045, 0.05, 0.06],
+        tax_rates=[0.21, 0.25, 0.30]
+    )
+
+    print(f"\nACCRETION SURFACE ({len(grid):,} scenarios):")
+    print(f"  Accretive with synergies: {(grid['accretion_syn'] > 0).mean()*100:.0f}% of scenarios")
+    surface = grid.xs((0.045, 0.25), level=['interest_rate', 'tax_rate'])
+    surface = surface.xs(1.0, level='synergy_capture')['accretion_syn'].unstack('stock_pct')
+    print(f"\n  Accretion w/ syn (rows: offer price, cols: % stock; 100% capture, 4.5%, 25% tax):")
+    print((surface * 100).round(1).to_string())
+
     print(f"\n✅ Project 3 Complete! Board-ready M&A analysis with ML.")
     print(f"   This addresses #1 M&A pitfall: overestimating synergies!\n")
     
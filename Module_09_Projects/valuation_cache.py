@@ -0,0 +1,330 @@
+"""
+Incremental Repricing Cache for a Live DCF Watchlist
+
+Intraday, only prices move for most of the coverage list, yet a full DCF
+recomputes projections, WACC and terminal value every time. This cache splits
+the valuation by what each input affects:
+
+    fundamentals  -> equity value          (expensive: full DCF)
+    shares        -> value per share       (one division)
+    price         -> upside, recommendation (one subtraction)
+
+Each ticker's equity value is cached under a hash of its fundamental inputs:
+- price / share updates touch only the affected tickers' cheap columns
+- fundamental updates re-hash the rows and re-run the DCF only for tickers
+  whose hash changed (re-sending an unchanged full refresh costs no DCFs)
+- changing the shared valuation assumptions invalidates everything
+
+State is kept as NumPy arrays addressed through a ticker index, so a tick of
+thousands of prices is a handful of vectorized operations.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from solutions import DCFValuationTool
+
+
+# Inputs that change equity value (price and shares only rescale it)
+FUNDAMENTAL_COLUMNS = [
+    'revenue_latest',
+    'ebitda_margin',
+    'capex_pct_revenue',
+    'net_debt',
+    'beta',
+    'tax_rate'
+]
+
+
+class ValuationCache:
+    """
+    Cached intrinsic values with price-only and per-ticker repricing.
+
+    Usage:
+        cache = ValuationCache()
+        cache.load(fundamentals)              # full DCF once
+        cache.update_prices({'MSFT': 381.2})  # upside / recommendation only
+        cache.update_fundamentals(changed)    # DCF only where inputs changed
+        cache.snapshot()                      # ranked watchlist
+    """
+
+    def __init__(self, **valuation_assumptions):
+        """
+        Initialize an empty cache.
+
+        Parameters:
+        -----------
+        **valuation_assumptions
+            Passed to DCFValuationTool.value_universe (e.g., terminal_growth,
+            risk_free_rate); see set_assumptions()
+        """
+        self.assumptions = dict(valuation_assumptions)
+        self.fundamentals = pd.DataFrame(columns=FUNDAMENTAL_COLUMNS)
+        self.tickers = pd.Index([], name='ticker')
+
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.equity_value = np.empty(0)
+        self.shares = np.empty(0)
+        self.price = np.empty(0)
+        self.value_per_share = np.empty(0)
+        self.upside = np.empty(0)
+        self.recommendation = np.empty(0, dtype=object)
+
+        self.stats = {'dcf_runs': 0, 'repriced': 0, 'unchanged_skipped': 0}
+
+    @staticmethod
+    def _hash(fundamentals: pd.DataFrame) -> np.ndarray:
+        """One uint64 per row over the fundamental inputs."""
+        return pd.util.hash_pandas_object(
+            fundamentals[FUNDAMENTAL_COLUMNS].astype(np.float64), index=False).to_numpy().copy()
+
+    def _positions(self, tickers) -> np.ndarray:
+        positions = self.tickers.get_indexer(pd.Index(tickers))
+        if (positions < 0).any():
+            missing = list(pd.Index(tickers)[positions < 0][:5])
+            raise KeyError(f"Tickers not in cache (load them first): {missing}")
+        return positions
+
+    def _revalue(self, positions: np.ndarray):
+        """Full DCF for the given rows (the only expensive step)."""
+        if len(positions) == 0:
+            return
+        rows = self.fundamentals.iloc[positions].rename_axis('ticker').reset_index()
+        rows['shares_outstanding'] = self.shares[positions]
+        rows['current_price'] = self.price[positions]
+
+        valued = DCFValuationTool.value_universe(rows, **self.assumptions)
+        # value_universe ranks its output; map back to the requested rows
+        order = pd.Index(valued['ticker']).get_indexer(rows['ticker'])
+        self.equity_value[positions] = valued['equity_value'].to_numpy()[order]
+        self.stats['dcf_runs'] += len(positions)
+        self._reprice(positions)
+
+    def _reprice(self, positions: np.ndarray):
+        """Per-share value, upside and recommendation (cheap)."""
+        self.value_per_share[positions] = self.equity_value[positions] / self.shares[positions]
+        upside = (self.value_per_share[positions] - self.price[positions]) / self.price[positions]
+        self.upside[positions] = upside
+        self.recommendation[positions] = np.select([upside > 0.20, upside > 0],
+                                                   ['BUY', 'HOLD'], 'SELL')
+        self.stats['repriced'] += len(positions)
+
+    def load(self, fundamentals: pd.DataFrame) -> 'ValuationCache':
+        """
+        Value a full coverage list (replaces any cached state).
+
+        Parameters:
+        -----------
+        fundamentals : pd.DataFrame
+            'ticker' column (or index) plus FUNDAMENTAL_COLUMNS,
+            'shares_outstanding' and 'current_price'
+        """
+        if 'ticker' in fundamentals.columns:
+            fundamentals = fundamentals.set_index('ticker')
+        n = len(fundamentals)
+
+        self.tickers = pd.Index(fundamentals.index, name='ticker')
+        self.fundamentals = fundamentals[FUNDAMENTAL_COLUMNS].astype(np.float64).copy()
+        self.hashes = self._hash(self.fundamentals)
+        self.shares = fundamentals['shares_outstanding'].to_numpy(dtype=np.float64).copy()
+        self.price = fundamentals['current_price'].to_numpy(dtype=np.float64).copy()
+        self.equity_value = np.full(n, np.nan)
+        self.value_per_share = np.full(n, np.nan)
+        self.upside = np.full(n, np.nan)
+        self.recommendation = np.empty(n, dtype=object)
+
+        self._revalue(np.arange(n))
+        return self
+
+    def update_prices(self, prices) -> int:
+        """
+        Apply a price tick: recompute upside and recommendation only.
+
+        Parameters:
+        -----------
+        prices : dict or pd.Series
+            {ticker: price}
+
+        Returns:
+        --------
+        int
+            Number of tickers repriced
+        """
+        prices = pd.Series(prices, dtype=np.float64)
+        positions = self._positions(prices.index)
+        self.price[positions] = prices.to_numpy()
+        self._reprice(positions)
+        return len(positions)
+
+    def update_shares(self, shares) -> int:
+        """Apply share count changes (buybacks / issuance): per-share values only."""
+        shares = pd.Series(shares, dtype=np.float64)
+        positions = self._positions(shares.index)
+        self.shares[positions] = shares.to_numpy()
+        self._reprice(positions)
+        return len(positions)
+
+    def update_fundamentals(self, updates: pd.DataFrame) -> int:
+        """
+        Merge new fundamentals; re-run the DCF only where inputs changed.
+
+        Rows may carry a subset of FUNDAMENTAL_COLUMNS (missing values keep
+        the cached input). Unknown tickers are added (they need all
+        fundamental columns plus shares and price). 'shares_outstanding' and
+        'current_price' columns are applied as cheap updates.
+
+        Returns:
+        --------
+        int
+            Number of tickers whose DCF was recomputed
+        """
+        if 'ticker' in updates.columns:
+            updates = updates.set_index('ticker')
+
+        new_tickers = updates.index.difference(self.tickers)
+        if len(new_tickers):
+            self._append(updates.loc[new_tickers])
+
+        existing = updates.index.intersection(self.tickers).difference(new_tickers)
+        positions = self._positions(existing)
+
+        columns = [c for c in FUNDAMENTAL_COLUMNS if c in updates.columns]
+        merged = self.fundamentals.iloc[positions].copy()
+        merged.update(updates.loc[existing, columns].astype(np.float64))
+
+        new_hashes = self._hash(merged)
+        changed = new_hashes != self.hashes[positions]
+        self.stats['unchanged_skipped'] += int((~changed).sum())
+
+        changed_positions = positions[changed]
+        self.fundamentals.iloc[changed_positions] = merged.to_numpy()[changed]
+        self.hashes[changed_positions] = new_hashes[changed]
+
+        for column, target in (('shares_outstanding', self.shares), ('current_price', self.price)):
+            if column in updates.columns:
+                values = updates.loc[existing, column].to_numpy(dtype=np.float64)
+                has_value = ~np.isnan(values)
+                target[positions[has_value]] = values[has_value]
+
+        self._revalue(changed_positions)
+        if 'shares_outstanding' in updates.columns or 'current_price' in updates.columns:
+            self._reprice(positions[~changed])
+
+        return len(changed_positions) + len(new_tickers)
+
+    def _append(self, rows: pd.DataFrame):
+        """Add new tickers to the cache and value them."""
+        start = len(self.tickers)
+        n = len(rows)
+        self.tickers = self.tickers.append(pd.Index(rows.index, name='ticker'))
+        self.fundamentals = pd.concat([self.fundamentals,
+                                       rows[FUNDAMENTAL_COLUMNS].astype(np.float64)])
+        self.hashes = np.concatenate([self.hashes, self._hash(rows)])
+        self.shares = np.concatenate([self.shares, rows['shares_outstanding'].to_numpy(dtype=np.float64)])
+        self.price = np.concatenate([self.price, rows['current_price'].to_numpy(dtype=np.float64)])
+        self.equity_value = np.concatenate([self.equity_value, np.full(n, np.nan)])
+        self.value_per_share = np.concatenate([self.value_per_share, np.full(n, np.nan)])
+        self.upside = np.concatenate([self.upside, np.full(n, np.nan)])
+        self.recommendation = np.concatenate([self.recommendation, np.empty(n, dtype=object)])
+        self._revalue(np.arange(start, start + n))
+
+    def set_assumptions(self, **valuation_assumptions):
+        """Change shared DCF assumptions: every cached equity value is invalid."""
+        self.assumptions.update(valuation_assumptions)
+        self._revalue(np.arange(len(self.tickers)))
+
+    def snapshot(self, top_n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Current watchlist ranked by upside.
+
+        Returns:
+        --------
+        pd.DataFrame
+            Equity value, value per share, price, upside and recommendation
+        """
+        table = pd.DataFrame({
+            'equity_value': self.equity_value,
+            'shares_outstanding': self.shares,
+            'value_per_share': self.value_per_share,
+            'current_price': self.price,
+            'upside': self.upside,
+            'recommendation': self.recommendation
+        }, index=self.tickers).sort_values('upside', ascending=False)
+        return table.head(top_n) if top_n else table
+
+
+def example_valuation_cache(n_names: int = 10_000):
+    """Live watchlist of 10,000 names with price ticks and fundamental updates"""
+    import time
+
+    print("\n" + "="*80)
+    print("INCREMENTAL REPRICING CACHE - LIVE DCF WATCHLIST")
+    print("="*80)
+
+    rng = np.random.default_rng(42)
+    revenue = rng.lognormal(np.log(20_000), 1.0, n_names)
+    margin = rng.uniform(0.10, 0.45, n_names)
+    shares = rng.uniform(200, 8_000, n_names)
+    net_debt = revenue * margin * rng.uniform(-0.5, 2.5, n_names)
+    coverage = pd.DataFrame({
+        'ticker': [f'T{i:05d}' for i in range(n_names)],
+        'current_price': (revenue * margin * rng.uniform(8, 25, n_names) - net_debt) / shares,
+        'shares_outstanding': shares,
+        'revenue_latest': revenue,
+        'ebitda_margin': margin,
+        'capex_pct_revenue': rng.uniform(0.02, 0.15, n_names),
+        'net_debt': net_debt,
+        'beta': rng.uniform(0.6, 1.6, n_names),
+        'tax_rate': 0.21
+    })
+
+    cache = ValuationCache()
+    start = time.perf_counter()
+    cache.load(coverage)
+    print(f"\nInitial load ({n_names:,} DCFs):      {(time.perf_counter() - start)*1000:.1f} ms")
+
+    # Price ticks: 20% of names move each tick
+    tick_times = []
+    for _ in range(20):
+        movers = rng.choice(n_names, n_names // 5, replace=False)
+        ticks = pd.Series(cache.price[movers] * np.exp(rng.normal(0, 0.002, len(movers))),
+                          index=cache.tickers[movers])
+        start = time.perf_counter()
+        cache.update_prices(ticks)
+        tick_times.append(time.perf_counter() - start)
+    print(f"Price tick ({n_names // 5:,} names):          {np.mean(tick_times)*1000:.2f} ms avg")
+
+    # Full fundamentals refresh where only 25 companies actually reported
+    refresh = coverage.copy()
+    reporters = rng.choice(n_names, 25, replace=False)
+    refresh.loc[reporters, 'revenue_latest'] *= 1.05
+    refresh = refresh.drop(columns=['current_price', 'shares_outstanding'])
+    dcf_before = cache.stats['dcf_runs']
+
+    start = time.perf_counter()
+    recomputed = cache.update_fundamentals(refresh)
+    print(f"Fundamentals refresh ({n_names:,} rows): {(time.perf_counter() - start)*1000:.1f} ms, "
+          f"{recomputed} DCFs rerun ({cache.stats['dcf_runs'] - dcf_before} total)")
+
+    # Buyback at one name: per-share values only
+    cache.update_shares({'T00000': cache.shares[0] * 0.95})
+
+    print(f"\nCache stats: {cache.stats}")
+    print(f"\nTOP 5 WATCHLIST:")
+    print(cache.snapshot(5).round(3).to_string())
+
+    # Consistency check against a full recompute
+    full = DCFValuationTool.value_universe(
+        coverage.assign(revenue_latest=refresh['revenue_latest'],
+                        current_price=cache.price, shares_outstanding=cache.shares))
+    full = full.set_index('ticker').loc[cache.tickers]
+    print(f"\nMax |Δ value/share| vs full recompute: "
+          f"{np.abs(full['value_per_share'].to_numpy() - cache.value_per_share).max():.2e}")
+
+    return cache
+
+
+if __name__ == "__main__":
+    cache = example_valuation_cache()